@@ -12,6 +12,7 @@ from .routers.v1.favourites import api_favourites
 from .routers.v1.health import api_health
 from .routers.v1.items import api_items
 from .routers.v1.items import api_lineage_provenance
+from .routers.v1.ops import api_ops
 
 
 def api_registry(app: FastAPI):
@@ -23,3 +24,4 @@ def api_registry(app: FastAPI):
     app.include_router(api_favourites.router, prefix='/v1/favourite', tags=['Favourites'])
     app.include_router(api_favourites.router_bulk, prefix='/v1/favourites', tags=['Favourites'])
     app.include_router(api_lineage_provenance.router, prefix='/v1/lineage', tags=['Lineage and provenance'])
+    app.include_router(api_ops.router, prefix='/v1/ops', tags=['Operations'])
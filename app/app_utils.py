@@ -5,41 +5,32 @@
 # You may not use this file except in compliance with the License.
 
 import base64
-import math
-import re
+from collections.abc import Iterator
+from collections.abc import Sequence
+from functools import lru_cache
 
 from sqlalchemy_utils import Ltree
 
+# Item listings decode the same handful of folder names on every row, so recently used labels are memoized.
+LTREE_LABEL_CACHE_SIZE = 65536
 
+
+@lru_cache(maxsize=LTREE_LABEL_CACHE_SIZE)
 def encode_label_for_ltree(raw_string: str) -> str:
-    base32_string = str(base64.b32encode(raw_string.encode('utf-8')), 'utf-8')
-    return re.sub('=', '', base32_string)
+    return base64.b32encode(raw_string.encode('utf-8')).decode('ascii').rstrip('=')
 
 
 def encode_path_for_ltree(raw_path: str) -> str:
-    labels = raw_path.split('/')
-    path = ''
-    for label in labels:
-        path += f'{encode_label_for_ltree(label)}.'
-    return path[:-1]
+    return '.'.join(map(encode_label_for_ltree, raw_path.split('/')))
 
 
+@lru_cache(maxsize=LTREE_LABEL_CACHE_SIZE)
 def decode_label_from_ltree(encoded_string: str) -> str:
-    missing_padding = math.ceil(len(encoded_string) / 8) * 8 - len(encoded_string)
-    if missing_padding:
-        encoded_string += '=' * missing_padding
-    utf8_string = base64.b32decode(encoded_string.encode('utf-8')).decode('utf-8')
-    return utf8_string
+    return base64.b32decode(encoded_string + '=' * (-len(encoded_string) % 8)).decode('utf-8')
 
 
-def decode_path_from_ltree(encoded_path: str) -> str:
-    if type(encoded_path) == Ltree:
-        encoded_path = str(encoded_path)
-    labels = encoded_path.split('.')
-    path = ''
-    for label in labels:
-        path += f'{decode_label_from_ltree(label)}/'
-    return path[:-1]
+def decode_path_from_ltree(encoded_path: str | Ltree) -> str:
+    return '/'.join(map(decode_label_from_ltree, str(encoded_path).split('.')))
 
 
 def get_zone_label(zone: int) -> str:
@@ -51,3 +42,8 @@ def construct_display_path(container_code: str, zone: str, encoded_path: str) ->
     decoded_path = decode_path_from_ltree(encoded_path)
     display_path = f'{container_code}/{get_zone_label(zone)}/{decoded_path}'
     return display_path
+
+
+def split_into_chunks(sequence: Sequence, chunk_size: int) -> Iterator[Sequence]:
+    for start in range(0, len(sequence), chunk_size):
+        yield sequence[start : start + chunk_size]
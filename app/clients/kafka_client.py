@@ -4,21 +4,33 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+import asyncio
 from datetime import datetime
 from datetime import timezone
 from functools import lru_cache
 from io import BytesIO
 from pathlib import Path
 
-from fastapi_sqlalchemy import db
 from fastavro import schema
 from fastavro import schemaless_writer
 from kafka import KafkaProducer
 from kafka.errors import KafkaError
+from kafka.errors import KafkaTimeoutError
+from kafka.future import Future
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import ConfigClass
+from app.dependencies.db import get_db_engine
 from app.logger import logger
-from app.models.sql_attribute_templates import AttributeTemplateModel
+from app.routers.v1.attribute_templates.template_cache import attribute_template_cache
+
+
+class SerializationError(ValueError):
+    """Raised when an item cannot be encoded with the metadata.items schema, so retrying it cannot succeed."""
+
+
+class AttributeTemplateLookupError(Exception):
+    """Raised when the attribute template of an item cannot be loaded, which may succeed on a retry."""
 
 
 class KafkaProducerClient:
@@ -35,7 +47,12 @@ class KafkaProducerClient:
         """
         if not self.producer:
             try:
-                self.producer = KafkaProducer(bootstrap_servers=[ConfigClass.KAFKA_URL])
+                self.producer = KafkaProducer(
+                    bootstrap_servers=[ConfigClass.KAFKA_URL],
+                    linger_ms=ConfigClass.KAFKA_LINGER_MS,
+                    batch_size=ConfigClass.KAFKA_BATCH_SIZE,
+                    compression_type=ConfigClass.KAFKA_COMPRESSION_TYPE,
+                )
             except Exception as e:
                 logger.exception(f'Kafka connection error {e}')
                 self.producer = None
@@ -64,16 +81,15 @@ class KafkaProducerClient:
             logger.exception('Error loading avro schema')
             raise e
 
-    def _get_attribute_template(self, template_id) -> dict:
+    async def _get_attribute_template(self, template_id) -> dict:
         """
         Summary:
                 function for querying attribute template by template id.
         """
-        query = db.session.query(AttributeTemplateModel).filter_by(id=template_id)
-        template = query.first().to_dict()
-        return template
+        async with AsyncSession(await get_db_engine()) as db:
+            return await attribute_template_cache.get(db, template_id)
 
-    def _format_item(self, item: dict) -> dict:
+    async def _format_item(self, item: dict) -> dict:
         """
         Summary:
             function for formatting item date and template name fields before serialization.
@@ -89,44 +105,109 @@ class KafkaProducerClient:
 
             if formatted['extended']['extra']['attributes']:
                 attr = formatted['extended']['extra']['attributes']
-                template = self._get_attribute_template(template_id=list(attr.keys())[0])
-                formatted['extended']['template_name'] = template['name']
-                formatted['extended']['template_id'] = template['id']
+                template_id = list(attr.keys())[0]
+                try:
+                    template = await self._get_attribute_template(template_id=template_id)
+                except Exception as e:
+                    raise AttributeTemplateLookupError(f'Error loading attribute template {template_id}') from e
+                if template:
+                    formatted['extended']['template_name'] = template['name']
+                    formatted['extended']['template_id'] = template['id']
+                else:
+                    logger.warning(f'Attribute template {template_id} of item {item.get("id")} no longer exists')
             return formatted
 
         except Exception as e:
-            logger.exception(f'Error for formatting item: {item["id"]}')
+            logger.exception(f'Error for formatting item: {item.get("id")}')
             raise e
 
-    def _serialize_msg(self, item: dict) -> bytes:
+    async def _serialize_msg(self, item: dict) -> bytes:
         """
         Summary:
             function for avro-serialization of item.
+            Any failure other than the attribute template lookup is raised as a SerializationError,
+            since the same payload will fail the same way on every retry.
         """
         try:
             bio = BytesIO()
-            message = self._format_item(item)
+            message = await self._format_item(item)
             schemaless_writer(bio, self.schema, message)
             serialized_message = bio.getvalue()
             logger.info(f'Successfully serialized metadata item: {item["id"]}')
             return serialized_message
-        except ValueError as ve:
-            logger.exception(f'Error of avro serialization for item: {item["id"]}')
-            raise ve
+        except AttributeTemplateLookupError:
+            raise
+        except Exception as e:
+            logger.exception(f'Error of avro serialization for item: {item.get("id")}')
+            raise SerializationError(f'{type(e).__name__}: {e}') from e
 
-    def send(self, item: dict) -> None:
+    @staticmethod
+    def _collect_delivery_errors(futures: list[tuple[int, Future]], errors: list[Exception | None]) -> None:
+        """
+        Summary:
+            function for recording the delivery errors of flushed send futures at the position of their message.
+        """
+        for position, future in futures:
+            if not future.is_done:
+                errors[position] = KafkaTimeoutError(f'Delivery of message {position} timed out')
+            elif future.failed():
+                errors[position] = future.exception
+
+    @staticmethod
+    def _log_errors(items: list[dict], errors: list[Exception | None]) -> int:
+        """
+        Summary:
+            function for logging the messages that could not be sent.
+        Return:
+            number of messages that could not be sent
+        """
+        failed = 0
+        for item, error in zip(items, errors):
+            if error:
+                failed += 1
+                logger.error(f'Error sending metadata event to Kafka for item {item.get("id")}: {error}')
+        return failed
+
+    async def send(self, item: dict) -> None:
         """
         Summary:
             function for sending message to kafka topic.
         """
+        errors = await self.send_many([item])
+        if errors[0]:
+            raise errors[0]
+
+    async def send_many(self, items: list[dict]) -> list[Exception | None]:
+        """
+        Summary:
+            function for sending a batch of messages to kafka topic with a single flush.
+            Serialization and delivery errors are collected per message instead of being raised.
+        Return:
+            list of errors in the order of the items, None for every message that was delivered
+        """
+        errors = [None] * len(items)
+        if not items:
+            return errors
+        futures = []
+        for position, item in enumerate(items):
+            try:
+                serialized_msg = await self._serialize_msg(item)
+            except Exception as e:
+                errors[position] = e
+                continue
+            try:
+                futures.append((position, self.producer.send(ConfigClass.KAFKA_TOPIC, serialized_msg)))
+            except Exception as e:
+                errors[position] = e
         try:
-            serialized_msg = self._serialize_msg(item)
-            self.producer.send(ConfigClass.KAFKA_TOPIC, serialized_msg)
-            self.producer.flush()
-            logger.info(f'Sent Kafka message to topic: {ConfigClass.KAFKA_TOPIC}')
-        except KafkaError as ke:
-            logger.exception('Error sending metadata event to Kafka')
-            raise ke
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.producer.flush, ConfigClass.KAFKA_FLUSH_TIMEOUT)
+        except KafkaError:
+            logger.exception('Timed out flushing metadata events to Kafka')
+        self._collect_delivery_errors(futures, errors)
+        failed = self._log_errors(items, errors)
+        logger.info(f'Sent {len(items) - failed} of {len(items)} Kafka messages to topic: {ConfigClass.KAFKA_TOPIC}')
+        return errors
 
 
 kafka_client = KafkaProducerClient()
@@ -24,6 +24,17 @@ class Settings(BaseSettings):
 
     KAFKA_URL: str = 'kafka:29099'
     KAFKA_TOPIC: str = 'metadata.items'
+    KAFKA_LINGER_MS: int = 5
+    KAFKA_BATCH_SIZE: int = 65536
+    KAFKA_COMPRESSION_TYPE: str | None = None
+    KAFKA_FLUSH_TIMEOUT: int = 30
+
+    OUTBOX_RELAY_ENABLED: bool = True
+    OUTBOX_RELAY_BATCH_SIZE: int = 500
+    OUTBOX_RELAY_POLL_INTERVAL: float = 1.0
+    OUTBOX_RELAY_CLAIM_TIMEOUT: float = 300.0
+    OUTBOX_RELAY_RETRY_DELAY: float = 30.0
+    OUTBOX_RELAY_MAX_ATTEMPTS: int = 50
 
     AUTH_HOST: str = 'http://fakeauth'
 
@@ -32,6 +43,11 @@ class Settings(BaseSettings):
     OPSDB_UTILITY_HOST: str = 'db'
     OPSDB_UTILITY_PORT: str = '5432'
     OPSDB_UTILITY_NAME: str = 'metadata'
+    OPSDB_POOL_SIZE: int = 10
+    OPSDB_POOL_MAX_OVERFLOW: int = 20
+    OPSDB_POOL_TIMEOUT: int = 30
+    OPSDB_POOL_RECYCLE: int = 1800
+    OPSDB_ECHO_SQL_QUERIES: bool = False
 
     METADATA_SCHEMA = str = 'metadata'
 
@@ -40,11 +56,27 @@ class Settings(BaseSettings):
     MAX_ATTRIBUTE_LENGTH = 100
     MAX_COLLECTIONS = 10
 
+    BULK_INSERT_CHUNK_SIZE: int = 1000
+    LINEAGE_GRAPH_MAX_DEPTH: int = 10
+    ITEMS_EXPORT_BATCH_SIZE: int = 1000
+
+    PERMISSION_CACHE_SIZE: int = 10000
+    PERMISSION_CACHE_TTL: int = 60
+    IDENTITY_CACHE_SIZE: int = 10000
+    IDENTITY_CACHE_TTL: int = 300
+    ATTRIBUTE_TEMPLATE_CACHE_SIZE: int = 1000
+    ATTRIBUTE_TEMPLATE_CACHE_TTL: int = 300
+
     GREENROOM_ZONE_VALUE: int = 0
     CORE_ZONE_VALUE: int = 1
     RSA_PUBLIC_KEY = ''
 
     DELETED_ITEMS_RETENTION_DAYS: int = 30
+    EMPTY_TRASH_CHUNK_SIZE: int = 500
+    PURGE_EXPIRED_ITEMS_ENABLED: bool = True
+    PURGE_EXPIRED_ITEMS_BATCH_SIZE: int = 100
+    PURGE_EXPIRED_ITEMS_THROTTLE: float = 1.0
+    PURGE_EXPIRED_ITEMS_INTERVAL: float = 3600.0
 
     class Config:
         env_file = '.env'
@@ -60,6 +92,11 @@ class Settings(BaseSettings):
             f'{self.OPSDB_UTILITY_PASSWORD}@{self.OPSDB_UTILITY_HOST}'
             f':{self.OPSDB_UTILITY_PORT}/{self.OPSDB_UTILITY_NAME}'
         )
+        self.SQLALCHEMY_ASYNC_DATABASE_URI = (
+            f'postgresql+asyncpg://{self.OPSDB_UTILITY_USERNAME}:'
+            f'{self.OPSDB_UTILITY_PASSWORD}@{self.OPSDB_UTILITY_HOST}'
+            f':{self.OPSDB_UTILITY_PORT}/{self.OPSDB_UTILITY_NAME}'
+        )
 
 
 @lru_cache(1)
@@ -0,0 +1,56 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from collections.abc import AsyncGenerator
+
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import ConfigClass
+
+
+class GetDBEngine:
+    """Create a FastAPI callable dependency for SQLAlchemy single AsyncEngine instance."""
+
+    def __init__(self) -> None:
+        self.instance = None
+
+    async def __call__(self) -> AsyncEngine:
+        """Return an instance of AsyncEngine class."""
+
+        if not self.instance:
+            self.instance = create_async_engine(
+                ConfigClass.SQLALCHEMY_ASYNC_DATABASE_URI,
+                pool_size=ConfigClass.OPSDB_POOL_SIZE,
+                max_overflow=ConfigClass.OPSDB_POOL_MAX_OVERFLOW,
+                pool_timeout=ConfigClass.OPSDB_POOL_TIMEOUT,
+                pool_recycle=ConfigClass.OPSDB_POOL_RECYCLE,
+                pool_pre_ping=True,
+                echo=ConfigClass.OPSDB_ECHO_SQL_QUERIES,
+            )
+        return self.instance
+
+    async def dispose(self) -> None:
+        """Close all pooled connections of the engine if it was created."""
+
+        if self.instance:
+            await self.instance.dispose()
+            self.instance = None
+
+
+get_db_engine = GetDBEngine()
+
+
+async def get_db_session(engine: AsyncEngine = Depends(get_db_engine)) -> AsyncGenerator[AsyncSession, None]:
+    """Yield an AsyncSession bound to the shared engine and close it when the request is done."""
+
+    session = AsyncSession(bind=engine, expire_on_commit=False)
+    try:
+        yield session
+    finally:
+        await session.close()
@@ -7,9 +7,11 @@
 from common import configure_logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi_sqlalchemy import DBSessionMiddleware
 
 from app.clients.kafka_client import get_kafka_client
+from app.dependencies.db import get_db_engine
+from app.workers.outbox_relay import outbox_relay
+from app.workers.purge_expired_items import expired_items_purger
 
 from .api_registry import api_registry
 from .config import ConfigClass
@@ -25,8 +27,6 @@ def create_app():
 
     configure_logging(ConfigClass.LOGGING_LEVEL, ConfigClass.LOGGING_FORMAT)
 
-    app.add_middleware(DBSessionMiddleware, db_url=ConfigClass.SQLALCHEMY_DATABASE_URI)
-
     app.add_middleware(
         CORSMiddleware,
         allow_origins='*',
@@ -35,16 +35,32 @@ def create_app():
         allow_headers=['*'],
     )
 
+    @app.on_event('startup')
+    async def startup_event():
+        """
+        Summary:
+            startup event to launch the relay publishing outbox events to kafka
+            and the purger deleting items kept in the trash past the retention period.
+        """
+
+        if ConfigClass.OUTBOX_RELAY_ENABLED:
+            outbox_relay.start(await get_db_engine(), get_kafka_client)
+        if ConfigClass.PURGE_EXPIRED_ITEMS_ENABLED:
+            expired_items_purger.start(await get_db_engine())
+
     @app.on_event('shutdown')
-    def shutdown_event():
+    async def shutdown_event():
         """
         Summary:
-            shutdown event to gracefully close the
-            kafka producer.
+            shutdown event to gracefully stop the outbox relay and the purger and close the
+            kafka producer and the database connection pool.
         """
 
+        await expired_items_purger.stop()
+        await outbox_relay.stop()
         client = get_kafka_client()
         client.close_connection()
+        await get_db_engine.dispose()
 
     api_registry(app)
 
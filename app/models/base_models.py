@@ -7,7 +7,9 @@
 from enum import Enum
 
 from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
+from pydantic import Field
 
 
 class EAPIResponseCode(Enum):
@@ -25,8 +27,9 @@ class APIResponse(BaseModel):
     code: EAPIResponseCode = EAPIResponseCode.success
     error_msg: str = ''
     page: int = 0
-    total: int = 1
-    num_of_pages: int = 1
+    total: int | None = 1
+    num_of_pages: int | None = 1
+    next_cursor: str | None = None
     result = []
 
     def json_response(self) -> JSONResponse:
@@ -34,6 +37,12 @@ class APIResponse(BaseModel):
         data['code'] = self.code.value
         return JSONResponse(status_code=self.code.value, content=data)
 
+    def orjson_response(self) -> ORJSONResponse:
+        """Serialize with orjson, skipping the recursive copy made by dict(); meant for large list results."""
+        data = {name: getattr(self, name) for name in self.__fields__}
+        data['code'] = self.code.value
+        return ORJSONResponse(status_code=self.code.value, content=data)
+
     def set_error_msg(self, error_msg):
         self.error_msg = error_msg
 
@@ -41,8 +50,18 @@ class APIResponse(BaseModel):
         self.code = code
 
 
+class PaginationCount(str, Enum):
+    EXACT = 'exact'
+    ESTIMATED = 'estimated'
+    NONE = 'none'
+
+
 class PaginationRequest(BaseModel):
     page: int = 0
     page_size: int = 25
     order: str = 'asc'
     sorting: str = 'created_time'
+    cursor: str | None = Field(
+        None, description='Opaque keyset cursor; pass an empty value for the first page and next_cursor afterwards'
+    )
+    count: PaginationCount = PaginationCount.EXACT
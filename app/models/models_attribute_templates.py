@@ -11,17 +11,17 @@ from pydantic import Field
 from pydantic import validator
 
 from .base_models import APIResponse
+from .base_models import PaginationRequest
 
 
 class GETTemplate(BaseModel):
     id: UUID
 
 
-class GETTemplates(BaseModel):
+class GETTemplates(PaginationRequest):
     project_code: str
     name: str | None
     page_size: int = 10
-    page: int = 0
 
 
 class GETTemplateResponse(APIResponse):
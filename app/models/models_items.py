@@ -16,6 +16,7 @@ from app.config import ConfigClass
 from app.models.models_lineage_provenance import TransformationType
 
 from .base_models import APIResponse
+from .base_models import PaginationCount
 from .base_models import PaginationRequest
 
 
@@ -65,12 +66,22 @@ class GETItemByLocation(BaseModel):
     status: ItemStatus
 
 
-class GETItemsByIDs(BaseModel):
+class FieldsRequest(BaseModel):
+    """Sparse fieldset selection shared by the item listing requests."""
+
+    fields: str | None = Field(
+        None,
+        description='Comma separated response fields, e.g. name,type,size,last_updated_time; id is always returned',
+    )
+
+
+class GETItemsByIDs(FieldsRequest):
     page_size: int = 10
     page: int = 0
+    count: PaginationCount = PaginationCount.EXACT
 
 
-class GETItemsByLocation(PaginationRequest):
+class GETItemsByLocation(PaginationRequest, FieldsRequest):
     container_code: str | None
     zone: int | None
     recursive: bool = False
@@ -91,6 +102,22 @@ class GETItemsByLocation(PaginationRequest):
         anystr_strip_whitespace = True
 
 
+class GETMarkedItems(PaginationRequest, FieldsRequest):
+    pass
+
+
+class GETItemsExport(FieldsRequest):
+    container_code: str
+    container_type: ContainerType = ContainerType.PROJECT
+    zone: int | None
+    status: ItemStatus = ItemStatus.ACTIVE
+    parent_path: str | None = Field(None, description='Only export items below this folder')
+    compress: bool = Field(False, description='Gzip the NDJSON stream')
+
+    class Config:
+        anystr_strip_whitespace = True
+
+
 class GETItemResponse(APIResponse):
     result: dict = Field(
         {},
@@ -10,6 +10,8 @@ from uuid import UUID
 from pydantic import BaseModel
 from pydantic import Field
 
+from app.config import ConfigClass
+
 from .base_models import APIResponse
 
 
@@ -27,6 +29,62 @@ class GETLineageProvenance(BaseModel):
     item_id: UUID
 
 
+class LineageDirection(str, Enum):
+    """Enum contains the directions a lineage graph can be traversed in."""
+
+    UPSTREAM = 'upstream'
+    DOWNSTREAM = 'downstream'
+    BOTH = 'both'
+
+
+class GETLineageGraph(BaseModel):
+    item_id: UUID
+    depth: int = Field(3, ge=1, le=ConfigClass.LINEAGE_GRAPH_MAX_DEPTH)
+    direction: LineageDirection = LineageDirection.BOTH
+
+
+class GETLineageGraphResponse(APIResponse):
+    result: dict = Field(
+        {},
+        example={
+            'nodes': [
+                {'id': 'ecbe5a8a-4324-4350-9af2-a444fbf55066', 'provenance': []},
+                {
+                    'id': 'df77c805-e824-46e7-a465-5837eae26d89',
+                    'provenance': [
+                        {
+                            'id': 'af682935-63f1-4f77-b111-441043165163',
+                            'lineage_id': '176c729a-b85a-494c-94ac-e86e78b054fa',
+                            'snapshot_time': '2023-03-22 15:10:58.774891',
+                            'parent': None,
+                            'parent_path': 'user/test_folder',
+                            'restore_path': None,
+                            'status': 'REGISTERED',
+                            'type': 'file',
+                            'zone': 1,
+                            'name': 'official.webm',
+                            'size': 0,
+                            'owner': 'ryan64',
+                            'container_code': 'test_container',
+                            'container_type': 'project',
+                        }
+                    ],
+                },
+            ],
+            'edges': [
+                {
+                    'id': '176c729a-b85a-494c-94ac-e86e78b054fa',
+                    'tfrm_type': 'COPY_TO_ZONE',
+                    'consumes': ['ecbe5a8a-4324-4350-9af2-a444fbf55066'],
+                    'produces': ['df77c805-e824-46e7-a465-5837eae26d89'],
+                    'direction': 'downstream',
+                    'depth': 1,
+                }
+            ],
+        },
+    )
+
+
 class GETLineageProvenanceResponse(APIResponse):
     result: dict = Field(
         {},
@@ -79,3 +137,38 @@ class GETLineageProvenanceResponse(APIResponse):
             },
         },
     )
+
+
+class GETLineageProvenanceBatchResponse(APIResponse):
+    result: dict = Field(
+        {},
+        example={
+            'df77c805-e824-46e7-a465-5837eae26d89': {
+                'lineage': {
+                    '991fe983-855e-4581-b0c9-e511642161a1': {
+                        'tfrm_type': 'ARCHIVE',
+                        'consumes': ['df77c805-e824-46e7-a465-5837eae26d89'],
+                        'produces': None,
+                    },
+                },
+                'provenance': {
+                    'df77c805-e824-46e7-a465-5837eae26d89': {
+                        'id': 'af682935-63f1-4f77-b111-441043165163',
+                        'lineage_id': '991fe983-855e-4581-b0c9-e511642161a1',
+                        'snapshot_time': '2023-03-22 15:10:58.774891',
+                        'parent': None,
+                        'parent_path': 'user/test_folder',
+                        'restore_path': None,
+                        'status': 'ARCHIVED',
+                        'type': 'file',
+                        'zone': 1,
+                        'name': 'official.webm',
+                        'size': 0,
+                        'owner': 'ryan64',
+                        'container_code': 'test_container',
+                        'container_type': 'project',
+                    },
+                },
+            },
+        },
+    )
@@ -9,12 +9,12 @@ from datetime import datetime
 from datetime import timezone
 
 from sqlalchemy import Column
-from sqlalchemy import DateTime
 from sqlalchemy import String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declarative_base
 
 from app.config import ConfigClass
+from app.models.sql_types import UTCDateTime
 
 Base = declarative_base()
 
@@ -26,8 +26,8 @@ class CollectionsModel(Base):
     name = Column(String(), nullable=False)
     container_code = Column(String(), nullable=False)
     owner = Column(String(), nullable=False)
-    created_time = Column(DateTime(), default=datetime.utcnow, nullable=False)
-    last_updated_time = Column(DateTime(), default=datetime.utcnow, nullable=False)
+    created_time = Column(UTCDateTime(), default=datetime.utcnow, nullable=False)
+    last_updated_time = Column(UTCDateTime(), default=datetime.utcnow, nullable=False)
 
     def __init__(self, name, container_code, owner, id_=None, last_updated_time=None):
         self.id = id_ if id_ else uuid.uuid4()
@@ -6,9 +6,9 @@
 
 import uuid
 
-from sqlalchemy import JSON
 from sqlalchemy import Column
 from sqlalchemy import ForeignKey
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declarative_base
 
@@ -23,7 +23,7 @@ class ExtendedModel(Base):
     __tablename__ = 'extended'
     id = Column(UUID(as_uuid=True), unique=True, primary_key=True)
     item_id = Column(UUID(as_uuid=True), ForeignKey(ItemModel.id), unique=True)
-    extra = Column(JSON())
+    extra = Column(JSONB())
 
     __table_args__ = ({'schema': ConfigClass.METADATA_SCHEMA},)
 
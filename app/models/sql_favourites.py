@@ -9,13 +9,14 @@ from datetime import datetime
 
 from sqlalchemy import Boolean
 from sqlalchemy import Column
-from sqlalchemy import DateTime
 from sqlalchemy import ForeignKey
+from sqlalchemy import Index
 from sqlalchemy import String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declarative_base
 
 from app.config import ConfigClass
+from app.models.sql_types import UTCDateTime
 
 from .sql_collections import CollectionsModel
 from .sql_items import ItemModel
@@ -29,10 +30,13 @@ class FavouritesModel(Base):
     user = Column(String())
     item_id = Column(UUID(as_uuid=True), ForeignKey(ItemModel.id), unique=True)
     collection_id = Column(UUID(as_uuid=True), ForeignKey(CollectionsModel.id), unique=True)
-    created_time = Column(DateTime(), default=datetime.utcnow, nullable=False)
+    created_time = Column(UTCDateTime(), default=datetime.utcnow, nullable=False)
     pinned = Column(Boolean(), nullable=False)
 
-    __table_args__ = ({'schema': ConfigClass.METADATA_SCHEMA},)
+    __table_args__ = (
+        Index('favourites_user_idx', 'user'),
+        {'schema': ConfigClass.METADATA_SCHEMA},
+    )
 
     def __init__(self, user, item_id, collection_id, pinned):
         self.id = uuid.uuid4()
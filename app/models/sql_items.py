@@ -9,7 +9,6 @@ from datetime import datetime
 from sqlalchemy import BIGINT
 from sqlalchemy import Boolean
 from sqlalchemy import Column
-from sqlalchemy import DateTime
 from sqlalchemy import Enum
 from sqlalchemy import Index
 from sqlalchemy import Integer
@@ -21,6 +20,7 @@ from sqlalchemy_utils import LtreeType
 from app.app_utils import decode_path_from_ltree
 from app.config import ConfigClass
 from app.models.models_items import ItemStatus
+from app.models.sql_types import UTCDateTime
 
 Base = declarative_base()
 
@@ -41,9 +41,9 @@ class ItemModel(Base):
     container_type = Column(Enum('project', 'dataset', name='container_enum', create_type=False), nullable=False)
     deleted = Column(Boolean(), default=False, nullable=False)
     deleted_by = Column(String())
-    deleted_at = Column(DateTime(), default=None)
-    created_time = Column(DateTime(), default=datetime.utcnow, nullable=False)
-    last_updated_time = Column(DateTime(), default=datetime.utcnow, nullable=False)
+    deleted_at = Column(UTCDateTime(), default=None)
+    created_time = Column(UTCDateTime(), default=datetime.utcnow, nullable=False)
+    last_updated_time = Column(UTCDateTime(), default=datetime.utcnow, nullable=False)
 
     __table_args__ = (
         Index(
@@ -55,6 +55,35 @@ class ItemModel(Base):
             unique=True,
             postgresql_where=Column('type') == 'name_folder',
         ),
+        Index('items_parent_path_gist', 'parent_path', postgresql_using='gist'),
+        Index('items_restore_path_gist', 'restore_path', postgresql_using='gist'),
+        Index(
+            'items_search_created_time_idx',
+            'container_code',
+            'zone',
+            'status',
+            'type',
+            'created_time',
+            'id',
+            postgresql_where=Column('deleted').is_(False),
+        ),
+        Index(
+            'items_search_name_idx',
+            'container_code',
+            'zone',
+            'status',
+            'type',
+            'name',
+            'id',
+            postgresql_where=Column('deleted').is_(False),
+        ),
+        Index(
+            'items_trash_idx',
+            'deleted_by',
+            'deleted_at',
+            postgresql_where=Column('deleted').is_(True),
+        ),
+        Index('items_name_trgm_idx', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
         {'schema': ConfigClass.METADATA_SCHEMA},
     )
 
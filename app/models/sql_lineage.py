@@ -6,9 +6,10 @@
 
 import uuid
 
-from sqlalchemy import ARRAY
 from sqlalchemy import Column
 from sqlalchemy import Enum
+from sqlalchemy import Index
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declarative_base
 
@@ -27,7 +28,11 @@ class LineageModel(Base):
     produces = Column(ARRAY(UUID(as_uuid=True)))
     tfrm_type = Column(Enum(TransformationType, name='tfrm_type_enum', create_type=False), nullable=False)
 
-    __table_args__ = ({'schema': ConfigClass.METADATA_SCHEMA},)
+    __table_args__ = (
+        Index('lineage_consumes_gin', 'consumes', postgresql_using='gin'),
+        Index('lineage_produces_gin', 'produces', postgresql_using='gin'),
+        {'schema': ConfigClass.METADATA_SCHEMA},
+    )
 
     def __init__(self, consumes, produces, tfrm_type):
         self.id = uuid.uuid4()
@@ -0,0 +1,74 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from datetime import datetime
+
+from sqlalchemy import BIGINT
+from sqlalchemy import Column
+from sqlalchemy import Integer
+from sqlalchemy import String
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.declarative import declarative_base
+
+from app.config import ConfigClass
+from app.models.sql_types import UTCDateTime
+
+Base = declarative_base()
+
+
+class OutboxModel(Base):
+    """Model for the outbox of item events waiting to be relayed to Kafka."""
+
+    __tablename__ = 'items_outbox'
+    id = Column(BIGINT(), primary_key=True, autoincrement=True)
+    item_id = Column(UUID(as_uuid=True), nullable=False)
+    payload = Column(JSONB(), nullable=False)
+    created_time = Column(UTCDateTime(), default=datetime.utcnow, nullable=False)
+    claimed_time = Column(UTCDateTime())
+    attempts = Column(Integer(), default=0, server_default='0', nullable=False)
+
+    __table_args__ = ({'schema': ConfigClass.METADATA_SCHEMA},)
+
+    def __init__(self, item_id, payload):
+        self.item_id = item_id
+        self.payload = payload
+
+    def to_dict(self) -> dict:
+        """Return model properties as dict."""
+        return {
+            'id': self.id,
+            'item_id': str(self.item_id),
+            'payload': self.payload,
+            'created_time': str(self.created_time),
+        }
+
+
+class OutboxDeadLetterModel(Base):
+    """Model for the outbox events that could not be relayed to Kafka and were set aside."""
+
+    __tablename__ = 'items_outbox_dead_letter'
+    id = Column(BIGINT(), primary_key=True, autoincrement=False)
+    item_id = Column(UUID(as_uuid=True), nullable=False)
+    payload = Column(JSONB(), nullable=False)
+    attempts = Column(Integer(), nullable=False)
+    error = Column(String(), nullable=False)
+    created_time = Column(UTCDateTime(), nullable=False)
+    failed_time = Column(UTCDateTime(), default=datetime.utcnow, nullable=False)
+
+    __table_args__ = ({'schema': ConfigClass.METADATA_SCHEMA},)
+
+    def to_dict(self) -> dict:
+        """Return model properties as dict."""
+        return {
+            'id': self.id,
+            'item_id': str(self.item_id),
+            'payload': self.payload,
+            'attempts': self.attempts,
+            'error': self.error,
+            'created_time': str(self.created_time),
+            'failed_time': str(self.failed_time),
+        }
@@ -9,9 +9,9 @@ from datetime import datetime
 
 from sqlalchemy import BIGINT
 from sqlalchemy import Column
-from sqlalchemy import DateTime
 from sqlalchemy import Enum
 from sqlalchemy import ForeignKey
+from sqlalchemy import Index
 from sqlalchemy import Integer
 from sqlalchemy import String
 from sqlalchemy.dialects.postgresql import UUID
@@ -23,6 +23,7 @@ from app.config import ConfigClass
 from app.models.models_items import ItemStatus
 from app.models.sql_items import ItemModel
 from app.models.sql_lineage import LineageModel
+from app.models.sql_types import UTCDateTime
 
 Base = declarative_base()
 
@@ -34,7 +35,7 @@ class ProvenanceModel(Base):
     id = Column(UUID(as_uuid=True), unique=True, primary_key=True)
     lineage_id = Column(UUID(as_uuid=True), ForeignKey(LineageModel.id))
     item_id = Column(UUID(as_uuid=True), ForeignKey(ItemModel.id))
-    snapshot_time = Column(DateTime(), default=datetime.utcnow, nullable=False)
+    snapshot_time = Column(UTCDateTime(), default=datetime.utcnow, nullable=False)
     parent = Column(UUID(as_uuid=True))
     parent_path = Column(LtreeType())
     restore_path = Column(LtreeType())
@@ -47,7 +48,10 @@ class ProvenanceModel(Base):
     container_code = Column(String(), nullable=False)
     container_type = Column(Enum('project', 'dataset', name='container_enum', create_type=False), nullable=False)
 
-    __table_args__ = ({'schema': ConfigClass.METADATA_SCHEMA},)
+    __table_args__ = (
+        Index('provenance_item_id_idx', 'item_id'),
+        {'schema': ConfigClass.METADATA_SCHEMA},
+    )
 
     def __init__(
         self,
@@ -30,9 +30,9 @@ class StorageModel(Base):
     __table_args__ = ({'schema': ConfigClass.METADATA_SCHEMA},)
 
     def __init__(self, item_id, upload_id, location_uri, version):
-        self.id = (uuid.uuid4(),)
-        self.item_id = (item_id,)
-        self.location_uri = (location_uri,)
+        self.id = uuid.uuid4()
+        self.item_id = item_id
+        self.location_uri = location_uri
         self.version = version
         self.upload_id = upload_id
 
@@ -0,0 +1,59 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+
+from common import has_permission
+
+from app.cache import TTLCache
+from app.config import ConfigClass
+
+permission_cache = TTLCache('permissions', ConfigClass.PERMISSION_CACHE_SIZE, ConfigClass.PERMISSION_CACHE_TTL)
+
+
+async def cached_has_permission(
+    project_code: str, resource: str, zone: str, operation: str, current_identity: dict
+) -> bool:
+    """Check a permission with the auth service, reusing recent decisions for the same user and project."""
+    key = (current_identity['username'], project_code, resource, zone, operation)
+    decision = permission_cache.get(key)
+    if decision is None:
+        decision = await has_permission(
+            ConfigClass.AUTH_SERVICE, project_code, resource, zone, operation, current_identity
+        )
+        permission_cache.set(key, decision)
+    return decision
+
+
+async def get_file_view_permissions(
+    project_code: str, current_identity: dict, zones: list[str]
+) -> dict[str, str | None]:
+    """Return the broadest file view resource granted in each zone: file_any, file_in_own_namefolder or None.
+
+    Zones are checked concurrently, and the name folder check only runs for zones without file_any.
+    """
+    file_any = await asyncio.gather(
+        *[cached_has_permission(project_code, 'file_any', zone, 'view', current_identity) for zone in zones]
+    )
+    permissions = {zone: 'file_any' if allowed else None for zone, allowed in zip(zones, file_any)}
+    restricted_zones = [zone for zone, resource in permissions.items() if not resource]
+    own_namefolder = await asyncio.gather(
+        *[
+            cached_has_permission(project_code, 'file_in_own_namefolder', zone, 'view', current_identity)
+            for zone in restricted_zones
+        ]
+    )
+    for zone, allowed in zip(restricted_zones, own_namefolder):
+        if allowed:
+            permissions[zone] = 'file_in_own_namefolder'
+    return permissions
+
+
+def invalidate_permissions(username: str | None = None, project_code: str | None = None) -> None:
+    """Drop cached decisions for a user, a project or both, e.g. after a role change; no arguments clears all."""
+    permission_cache.invalidate(
+        lambda key: (username is None or key[0] == username) and (project_code is None or key[1] == project_code)
+    )
@@ -4,31 +4,174 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+import base64
+import json
 from collections.abc import Callable
+from datetime import datetime
+from enum import Enum
+from typing import Any
+from uuid import UUID
 
 from pydantic import BaseModel
+from sqlalchemy import and_
+from sqlalchemy import false
+from sqlalchemy import func
+from sqlalchemy import or_
+from sqlalchemy import select
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm.attributes import InstrumentedAttribute
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.expression import ClauseElement
+from sqlalchemy.sql.expression import ColumnElement
+from sqlalchemy.sql.expression import Executable
+from sqlalchemy_utils import Ltree
+from sqlalchemy_utils import LtreeType
 
 from app.logger import logger
 from app.models.base_models import APIResponse
 from app.models.base_models import EAPIResponseCode
-from app.models.sql_items import Base
+from app.models.base_models import PaginationCount
+from app.routers.router_exceptions import BadRequestException
 
+# Ordered (column, descending) pairs that uniquely identify a row's position in a result set.
+Keyset = list[tuple[InstrumentedAttribute, bool]]
 
-def paginate(
-    params: BaseModel, api_response: APIResponse, query: Base, expand_func: Callable = None, **kwargs
+
+class Explain(Executable, ClauseElement):
+    """Wraps a select in ``EXPLAIN (FORMAT JSON)`` to read the planner's row estimate."""
+
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(Explain, 'postgresql')
+def _compile_explain(element: Explain, compiler, **kwargs) -> str:
+    return f'EXPLAIN (FORMAT JSON) {compiler.process(element.statement, **kwargs)}'
+
+
+def _encode_cursor_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, UUID):
+        return str(value)
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def _decode_cursor_value(column: InstrumentedAttribute, value: Any) -> Any:
+    if value is None:
+        return None
+    if isinstance(column.type, LtreeType):
+        return Ltree(value)
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    return python_type(value)
+
+
+def _keyset_value(row: Row, column: InstrumentedAttribute) -> Any:
+    """Read a keyset column from a row of ORM entities or, for column-projected queries, from the row itself."""
+    for entity in row:
+        if isinstance(entity, column.class_):
+            return getattr(entity, column.key)
+    return row._mapping[column]
+
+
+def encode_cursor(keyset: Keyset, row: Row) -> str:
+    values = [_encode_cursor_value(_keyset_value(row, column)) for column, _ in keyset]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(keyset: Keyset, cursor: str) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(keyset):
+            raise ValueError('Cursor does not match the requested ordering')
+        return [_decode_cursor_value(column, value) for (column, _), value in zip(keyset, values)]
+    except (AttributeError, TypeError, ValueError):
+        raise BadRequestException('Invalid pagination cursor')
+
+
+def _after(column: InstrumentedAttribute, value: Any, descending: bool) -> ColumnElement:
+    """Rows strictly past value in one keyset column, using postgres' default NULLS LAST/FIRST for ASC/DESC."""
+
+    if descending:
+        return column.isnot(None) if value is None else column < value
+    if value is None:
+        return false()
+    return or_(column > value, column.is_(None)) if column.expression.nullable else column > value
+
+
+def _equal(column: InstrumentedAttribute, value: Any) -> ColumnElement:
+    return column.is_(None) if value is None else column == value
+
+
+def keyset_filter(keyset: Keyset, values: list) -> ColumnElement:
+    conditions = []
+    for position, (column, descending) in enumerate(keyset):
+        preceding = [_equal(keyset[i][0], values[i]) for i in range(position)]
+        conditions.append(and_(*preceding, _after(column, values[position], descending)))
+    return or_(*conditions)
+
+
+async def count_query_results(db: AsyncSession, query: Select, count: PaginationCount) -> int | None:
+    query = query.order_by(None)
+    if count == PaginationCount.NONE:
+        return None
+    if count == PaginationCount.ESTIMATED:
+        plan = await db.scalar(Explain(query))
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+    return await db.scalar(select(func.count()).select_from(query.subquery()))
+
+
+async def paginate(
+    db: AsyncSession,
+    params: BaseModel,
+    api_response: APIResponse,
+    query: Select,
+    expand_func: Callable = None,
+    keyset: Keyset | None = None,
+    **kwargs,
 ) -> APIResponse:
-    total = query.count()
-    query = query.limit(params.page_size).offset(params.page * params.page_size)
-    entities = query.all()
+    """Page through query results.
+
+    Pages are addressed by offset unless the caller supplies a keyset and the request carries a cursor (empty for the
+    first page), in which case rows are fetched after the cursor position and next_cursor is set when more remain.
+    """
+
+    total = await count_query_results(db, query, params.count)
+    use_cursor = keyset is not None and params.cursor is not None
+    if use_cursor:
+        query = query.order_by(None).order_by(*[column.desc() if desc else column.asc() for column, desc in keyset])
+        if params.cursor:
+            query = query.where(keyset_filter(keyset, decode_cursor(keyset, params.cursor)))
+        query = query.limit(params.page_size + 1)
+    else:
+        query = query.limit(params.page_size).offset(params.page * params.page_size)
+    rows = (await db.execute(query)).all()
+    if use_cursor and len(rows) > params.page_size:
+        rows = rows[: params.page_size]
+        api_response.next_cursor = encode_cursor(keyset, rows[-1])
     results = []
-    for entity in entities:
+    for row in rows:
         if expand_func:
-            entity_dict = expand_func(entity, kwargs)
-            results.append(entity_dict)
+            results.append(expand_func(row, kwargs))
         else:
-            results.append(entity.to_dict())
+            results.append(row[0].to_dict())
     api_response.page = params.page
-    api_response.num_of_pages = int(int(total) / int(params.page_size)) + 1
+    api_response.num_of_pages = None if total is None else int(int(total) / int(params.page_size)) + 1
     api_response.total = total
     api_response.result = results
 
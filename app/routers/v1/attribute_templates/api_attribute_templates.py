@@ -10,7 +10,9 @@ from fastapi import APIRouter
 from fastapi import Depends
 from fastapi import Query
 from fastapi_utils.cbv import cbv
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.dependencies.db import get_db_session
 from app.logger import logger
 from app.models.base_models import EAPIResponseCode
 from app.models.models_attribute_templates import DELETETemplate
@@ -22,6 +24,7 @@ from app.models.models_attribute_templates import POSTTemplate
 from app.models.models_attribute_templates import POSTTemplateResponse
 from app.models.models_attribute_templates import PUTTemplate
 from app.models.models_attribute_templates import PUTTemplateResponse
+from app.routers.router_exceptions import BadRequestException
 from app.routers.router_exceptions import EntityNotFoundException
 from app.routers.router_utils import set_api_response_error
 
@@ -36,11 +39,13 @@ router = APIRouter()
 
 @cbv(router)
 class APIAttributeTemplates:
+    db: AsyncSession = Depends(get_db_session)
+
     @router.get('/{id}/', response_model=GETTemplateResponse, summary='Get an attribute template')
     async def get_attribute_template(self, params: GETTemplate = Depends(GETTemplate)):
         try:
             api_response = GETTemplateResponse()
-            get_template_by_id(params, api_response)
+            await get_template_by_id(self.db, params, api_response)
         except Exception as e:
             logger.exception(f'Error when get_attribute_template {str(e)}')
             set_api_response_error(
@@ -52,7 +57,9 @@ class APIAttributeTemplates:
     async def get_attribute_templates(self, params: GETTemplates = Depends(GETTemplates)):
         try:
             api_response = GETTemplateResponse()
-            get_templates_by_project_code(params, api_response)
+            await get_templates_by_project_code(self.db, params, api_response)
+        except BadRequestException as e:
+            set_api_response_error(api_response, str(e), EAPIResponseCode.bad_request)
         except Exception as e:
             logger.exception(f'Error when get_attribute_templates {str(e)}')
             set_api_response_error(
@@ -64,7 +71,7 @@ class APIAttributeTemplates:
     async def create_attribute_template(self, data: POSTTemplate):
         try:
             api_response = POSTTemplateResponse()
-            create_template(data, api_response)
+            await create_template(self.db, data, api_response)
         except Exception as e:
             logger.exception(f'Error when create_attribute_template {str(e)}')
             set_api_response_error(api_response, 'Failed to create attribute template', EAPIResponseCode.internal_error)
@@ -74,7 +81,7 @@ class APIAttributeTemplates:
     async def update_attribute_template(self, data: PUTTemplate, id_: UUID = Query(None, alias='id')):
         try:
             api_response = PUTTemplateResponse()
-            update_template(id_, data, api_response)
+            await update_template(self.db, id_, data, api_response)
         except EntityNotFoundException:
             set_api_response_error(api_response, f'Failed to get template with id {id_}', EAPIResponseCode.not_found)
         except Exception as e:
@@ -86,7 +93,7 @@ class APIAttributeTemplates:
     async def delete_attribute_template(self, params: DELETETemplate = Depends(DELETETemplate)):
         try:
             api_response = DELETETemplateResponse()
-            delete_template_by_id(params, api_response)
+            await delete_template_by_id(self.db, params, api_response)
         except EntityNotFoundException:
             set_api_response_error(
                 api_response, f'Failed to get template with id {params.id}', EAPIResponseCode.not_found
@@ -6,7 +6,8 @@
 
 from uuid import UUID
 
-from fastapi_sqlalchemy import db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.base_models import APIResponse
 from app.models.models_attribute_templates import DELETETemplate
@@ -18,18 +19,20 @@ from app.models.models_attribute_templates import PUTTemplate
 from app.models.sql_attribute_templates import AttributeTemplateModel
 from app.routers.router_exceptions import EntityNotFoundException
 from app.routers.router_utils import paginate
+from app.routers.v1.attribute_templates.template_cache import attribute_template_cache
 
 
-def get_template_by_id(params: GETTemplate, api_response: APIResponse):
-    template_query = db.session.query(AttributeTemplateModel).filter_by(id=params.id)
-    api_response.result = template_query.first().to_dict()
+async def get_template_by_id(db: AsyncSession, params: GETTemplate, api_response: APIResponse):
+    template_query = select(AttributeTemplateModel).filter_by(id=params.id)
+    api_response.result = (await db.execute(template_query)).scalars().first().to_dict()
 
 
-def get_templates_by_project_code(params: GETTemplates, api_response: APIResponse):
-    template_query = db.session.query(AttributeTemplateModel).filter_by(project_code=params.project_code)
+async def get_templates_by_project_code(db: AsyncSession, params: GETTemplates, api_response: APIResponse):
+    template_query = select(AttributeTemplateModel).filter_by(project_code=params.project_code)
     if params.name:
         template_query = template_query.filter_by(name=params.name)
-    paginate(params, api_response, template_query, None)
+    keyset = [(AttributeTemplateModel.name, False), (AttributeTemplateModel.id, False)]
+    await paginate(db, params, api_response, template_query, None, keyset)
 
 
 def format_attributes_for_json(attributes: POSTTemplateAttributes) -> list[dict]:
@@ -46,35 +49,39 @@ def format_attributes_for_json(attributes: POSTTemplateAttributes) -> list[dict]
     return json_attributes
 
 
-def create_template(data: POSTTemplate, api_response: APIResponse):
+async def create_template(db: AsyncSession, data: POSTTemplate, api_response: APIResponse):
     template_model_data = {
         'name': data.name,
         'project_code': data.project_code,
         'attributes': format_attributes_for_json(data.attributes),
     }
     template = AttributeTemplateModel(**template_model_data)
-    db.session.add(template)
-    db.session.commit()
-    db.session.refresh(template)
+    db.add(template)
+    await db.commit()
+    await db.refresh(template)
     api_response.result = template.to_dict()
 
 
-def update_template(template_id: UUID, data: PUTTemplate, api_response: APIResponse):
-    template = db.session.query(AttributeTemplateModel).filter_by(id=template_id).first()
+async def update_template(db: AsyncSession, template_id: UUID, data: PUTTemplate, api_response: APIResponse):
+    template_query = select(AttributeTemplateModel).filter_by(id=template_id)
+    template = (await db.execute(template_query)).scalars().first()
     if not template:
         raise EntityNotFoundException()
     template.name = data.name
     template.project_code = data.project_code
     template.attributes = format_attributes_for_json(data.attributes)
-    db.session.commit()
-    db.session.refresh(template)
+    await db.commit()
+    attribute_template_cache.invalidate(template.id)
+    await db.refresh(template)
     api_response.result = template.to_dict()
 
 
-def delete_template_by_id(params: DELETETemplate, api_response: APIResponse):
-    template = db.session.query(AttributeTemplateModel).filter_by(id=params.id).first()
+async def delete_template_by_id(db: AsyncSession, params: DELETETemplate, api_response: APIResponse):
+    template_query = select(AttributeTemplateModel).filter_by(id=params.id)
+    template = (await db.execute(template_query)).scalars().first()
     if not template:
         raise EntityNotFoundException()
-    db.session.delete(template)
-    db.session.commit()
+    await db.delete(template)
+    await db.commit()
+    attribute_template_cache.invalidate(params.id)
     api_response.total = 0
@@ -0,0 +1,76 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from collections.abc import Iterable
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache import TTLCache
+from app.config import ConfigClass
+from app.models.sql_attribute_templates import AttributeTemplateModel
+from app.routers.v1.attribute_templates.validators import AttributeTemplateValidator
+
+
+class AttributeTemplateCache:
+    """In-process cache of attribute templates and their compiled validators, invalidated by bumping a version.
+
+    Entries are keyed by (template id, version), so a lookup that read the row before an update or delete can only
+    store its result under the superseded version, which is never read again.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self._templates = TTLCache('attribute_templates', max_size, ttl)
+        self._versions: dict[UUID, int] = {}
+
+    def _key(self, template_id: UUID) -> tuple[UUID, int]:
+        return template_id, self._versions.get(template_id, 0)
+
+    async def get(self, db: AsyncSession, template_id: UUID | str) -> dict | None:
+        templates = await self.get_many(db, [template_id])
+        return templates.get(UUID(str(template_id)))
+
+    async def get_many(self, db: AsyncSession, template_ids: Iterable[UUID | str]) -> dict[UUID, dict]:
+        """Return the requested templates that exist, loading the ones not cached with a single query."""
+        entries = await self._get_entries(db, template_ids)
+        return {template_id: template for template_id, (template, _) in entries.items()}
+
+    async def get_validators(
+        self, db: AsyncSession, template_ids: Iterable[UUID | str]
+    ) -> dict[UUID, AttributeTemplateValidator]:
+        """Return compiled validators of the requested templates that exist."""
+        entries = await self._get_entries(db, template_ids)
+        return {template_id: validator for template_id, (_, validator) in entries.items()}
+
+    async def _get_entries(
+        self, db: AsyncSession, template_ids: Iterable[UUID | str]
+    ) -> dict[UUID, tuple[dict, AttributeTemplateValidator]]:
+        keys = {UUID(str(template_id)): None for template_id in template_ids}
+        entries = {}
+        for template_id in keys:
+            keys[template_id] = self._key(template_id)
+            entry = self._templates.get(keys[template_id])
+            if entry is not None:
+                entries[template_id] = entry
+        missing_ids = [template_id for template_id in keys if template_id not in entries]
+        if missing_ids:
+            template_query = select(AttributeTemplateModel).where(AttributeTemplateModel.id.in_(missing_ids))
+            for template in (await db.execute(template_query)).scalars():
+                template_dict = template.to_dict()
+                entries[template.id] = (template_dict, AttributeTemplateValidator(template_dict))
+                self._templates.set(keys[template.id], entries[template.id])
+        return entries
+
+    def invalidate(self, template_id: UUID | str) -> None:
+        template_id = UUID(str(template_id))
+        self._versions[template_id] = self._versions.get(template_id, 0) + 1
+        self._templates.invalidate(lambda key: key[0] == template_id)
+
+
+attribute_template_cache = AttributeTemplateCache(
+    ConfigClass.ATTRIBUTE_TEMPLATE_CACHE_SIZE, ConfigClass.ATTRIBUTE_TEMPLATE_CACHE_TTL
+)
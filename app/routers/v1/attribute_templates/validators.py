@@ -0,0 +1,51 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from collections.abc import Iterable
+from uuid import UUID
+
+
+class AttributeTemplateValidator:
+    """Attribute template compiled once into the name and option sets used to check attribute dicts."""
+
+    def __init__(self, template: dict):
+        attributes = template['attributes'] or []
+        self.names = frozenset(attribute['name'] for attribute in attributes)
+        self.required = frozenset(attribute['name'] for attribute in attributes if not attribute['optional'])
+        self.options = {
+            attribute['name']: frozenset(attribute['options']) for attribute in attributes if attribute.get('options')
+        }
+
+    def validate(self, attributes: dict | None) -> list[str]:
+        """Return every reason the attributes do not match the template; an empty list means they are valid."""
+        attributes = attributes or {}
+        errors = [f'Missing required attribute {name}' for name in sorted(self.required.difference(attributes))]
+        for name, value in attributes.items():
+            if name not in self.names:
+                errors.append(f'Unknown attribute {name}')
+            elif not isinstance(value, str):
+                errors.append(f'Attribute {name} must be a string')
+            elif name in self.options and value not in self.options[name]:
+                errors.append(f'Attribute {name} must be one of the template options')
+        return errors
+
+
+def validate_attributes(
+    attributes: dict | None, template_id: UUID | None, validators: dict[UUID, AttributeTemplateValidator]
+) -> list[str]:
+    if not template_id:
+        return ['Attributes require an attribute template'] if attributes else []
+    validator = validators.get(template_id)
+    if not validator:
+        return [f'Attribute template {template_id} does not exist']
+    return validator.validate(attributes)
+
+
+def validate_attributes_batch(
+    items: Iterable[tuple[dict | None, UUID | None]], validators: dict[UUID, AttributeTemplateValidator]
+) -> list[list[str]]:
+    """Validate many (attributes, template id) pairs against compiled templates, returning errors per item."""
+    return [validate_attributes(attributes, template_id, validators) for attributes, template_id in items]
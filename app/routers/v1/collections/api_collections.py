@@ -10,7 +10,9 @@ from fastapi import APIRouter
 from fastapi import Depends
 from fastapi import Query
 from fastapi_utils.cbv import cbv
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.dependencies.db import get_db_session
 from app.logger import logger
 from app.models.base_models import EAPIResponseCode
 from app.models.models_collections import DELETECollectionItems
@@ -48,13 +50,15 @@ router_bulk = APIRouter()
 
 @cbv(router)
 class APICollections:
+    db: AsyncSession = Depends(get_db_session)
+
     @router.get(
         '/search/', response_model=GETCollectionResponse, summary='Get collections that belong to a user per project'
     )
     async def get_collections(self, params: GETCollection = Depends(GETCollection)):
         try:
             api_response = GETCollectionResponse()
-            get_user_collections(params, api_response)
+            await get_user_collections(self.db, params, api_response)
         except BadRequestException as e:
             set_api_response_error(api_response, str(e), EAPIResponseCode.bad_request)
         except Exception as e:
@@ -72,7 +76,7 @@ class APICollections:
     ):
         try:
             api_response = GETCollectionItemsResponse()
-            await get_items_per_collection(params, api_response, current_identity)
+            await get_items_per_collection(self.db, params, api_response, current_identity)
         except BadRequestException as e:
             set_api_response_error(api_response, str(e), EAPIResponseCode.bad_request)
         except EntityNotFoundException as e:
@@ -80,13 +84,13 @@ class APICollections:
         except Exception as e:
             logger.exception(f'Error when get_collection_items {str(e)}')
             set_api_response_error(api_response, 'Failed to get items from collection', EAPIResponseCode.internal_error)
-        return api_response.json_response()
+        return api_response.orjson_response()
 
     @router.get('/{id}/', response_model=GETCollectionResponse, summary='Get collection by id')
     async def get_collections_id(self, params: GETCollectionID = Depends(GETCollectionID)):
         try:
             api_response = GETCollectionResponse()
-            get_collections_by_id(params, api_response)
+            await get_collections_by_id(self.db, params, api_response)
         except EntityNotFoundException as e:
             set_api_response_error(api_response, str(e), EAPIResponseCode.not_found)
         except Exception as e:
@@ -100,7 +104,7 @@ class APICollections:
     async def create_new_collection(self, data: POSTCollection):
         try:
             api_response = POSTCollectionResponse()
-            create_collection(data, api_response)
+            await create_collection(self.db, data, api_response)
         except BadRequestException as e:
             set_api_response_error(api_response, str(e), EAPIResponseCode.bad_request)
         except DuplicateRecordException as e:
@@ -116,7 +120,7 @@ class APICollections:
     async def update_collection_name(self, data: PUTCollections):
         try:
             api_response = PUTCollectionResponse()
-            update_collection(data, api_response)
+            await update_collection(self.db, data, api_response)
         except BadRequestException as e:
             set_api_response_error(api_response, str(e), EAPIResponseCode.bad_request)
         except EntityNotFoundException as e:
@@ -132,7 +136,7 @@ class APICollections:
     async def remove_collection(self, id_: UUID = Query(None, alias='id')):
         try:
             api_response = DELETECollectionResponse()
-            remove_collection(id_, api_response)
+            await remove_collection(self.db, id_, api_response)
         except EntityNotFoundException as e:
             set_api_response_error(api_response, str(e), EAPIResponseCode.not_found)
         except Exception as e:
@@ -144,7 +148,7 @@ class APICollections:
     async def add_items_to_collection(self, data: POSTCollectionItems):
         try:
             api_response = POSTCollectionItemsResponse()
-            add_items(data, api_response)
+            await add_items(self.db, data, api_response)
         except EntityNotFoundException as e:
             set_api_response_error(api_response, str(e), EAPIResponseCode.not_found)
         except Exception as e:
@@ -158,7 +162,7 @@ class APICollections:
     async def remove_items_from_collection(self, data: DELETECollectionItems):
         try:
             api_response = DELETECollectionItemsResponse()
-            remove_items(data)
+            await remove_items(self.db, data)
         except EntityNotFoundException as e:
             set_api_response_error(api_response, str(e), EAPIResponseCode.not_found)
         except Exception as e:
@@ -10,7 +10,9 @@ from datetime import timezone
 from operator import or_
 from uuid import UUID
 
-from fastapi_sqlalchemy import db
+from sqlalchemy import delete
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import ConfigClass
 from app.models.base_models import APIResponse
@@ -33,14 +35,17 @@ from app.routers.router_exceptions import EntityNotFoundException
 from app.routers.router_utils import paginate
 from app.routers.v1.collections.permissions_collections import collection_query_permissions
 from app.routers.v1.items.utils import combine_collection_tables
-from app.routers.v1.items.utils import combine_item_tables
+from app.routers.v1.items.utils import combine_item_row
+from app.routers.v1.items.utils import select_item_rows
 
 from .utils import validate_collection
 
 
-def check_collection_consistency(id_: UUID, container_code: str = None, owner: str = None) -> int:
-    collection_query = db.session.query(CollectionsModel).filter(CollectionsModel.id == id_)
-    collection = collection_query.first()
+async def check_collection_consistency(
+    db: AsyncSession, id_: UUID, container_code: str = None, owner: str = None
+) -> int:
+    collection_query = select(CollectionsModel).where(CollectionsModel.id == id_)
+    collection = (await db.execute(collection_query)).scalars().first()
     if not collection:
         return 404
     if container_code and collection.container_code != container_code:
@@ -50,7 +55,7 @@ def check_collection_consistency(id_: UUID, container_code: str = None, owner: s
     return 200
 
 
-def get_user_collections(params: GETCollection, api_response: APIResponse):
+async def get_user_collections(db: AsyncSession, params: GETCollection, api_response: APIResponse):
     try:
         custom_sort = getattr(CollectionsModel, params.sorting).asc()
         if params.order == 'desc':
@@ -59,9 +64,9 @@ def get_user_collections(params: GETCollection, api_response: APIResponse):
         raise BadRequestException(f'Cannot sort by {params.sorting}')
 
     collection_query = (
-        db.session.query(CollectionsModel, FavouritesModel)
+        select(CollectionsModel, FavouritesModel)
         .outerjoin(FavouritesModel)
-        .filter(
+        .where(
             CollectionsModel.owner == params.owner,
             CollectionsModel.container_code == params.container_code,
             or_(FavouritesModel.user == params.owner, FavouritesModel.id.is_(None)),
@@ -69,12 +74,12 @@ def get_user_collections(params: GETCollection, api_response: APIResponse):
         .order_by(custom_sort)
     )
 
-    paginate(params, api_response, collection_query, combine_collection_tables)
+    await paginate(db, params, api_response, collection_query, combine_collection_tables)
 
 
-def get_collections_by_id(params: GETCollectionID, api_response: APIResponse):
-    collection_query = db.session.query(CollectionsModel).filter(CollectionsModel.id == params.id)
-    collection_result = collection_query.first()
+async def get_collections_by_id(db: AsyncSession, params: GETCollectionID, api_response: APIResponse):
+    collection_query = select(CollectionsModel).where(CollectionsModel.id == params.id)
+    collection_result = (await db.execute(collection_query)).scalars().first()
     if collection_result:
         api_response.result = collection_result.to_dict()
         api_response.total = 1
@@ -82,8 +87,10 @@ def get_collections_by_id(params: GETCollectionID, api_response: APIResponse):
         raise EntityNotFoundException(f'Collection id {params.id} does not exist')
 
 
-async def get_items_per_collection(params: GETCollectionItems, api_response: APIResponse, current_identity: dict):
-    collection = validate_collection(collection_id=params.id)
+async def get_items_per_collection(
+    db: AsyncSession, params: GETCollectionItems, api_response: APIResponse, current_identity: dict
+):
+    collection = await validate_collection(db, collection_id=params.id)
 
     try:
         custom_sort = getattr(ItemModel, params.sorting).asc()
@@ -93,9 +100,12 @@ async def get_items_per_collection(params: GETCollectionItems, api_response: API
         raise BadRequestException(f'Cannot sort by {params.sorting}')
 
     item_query = (
-        db.session.query(ItemModel, StorageModel, ExtendedModel, FavouritesModel)
-        .outerjoin(StorageModel, ExtendedModel, ItemsCollectionsModel, FavouritesModel)
-        .filter(
+        select_item_rows()
+        .outerjoin(StorageModel)
+        .outerjoin(ExtendedModel)
+        .outerjoin(ItemsCollectionsModel)
+        .outerjoin(FavouritesModel)
+        .where(
             ItemsCollectionsModel.collection_id == params.id,
             ItemModel.status == params.status,
             or_(FavouritesModel.user == collection.owner, FavouritesModel.id.is_(None)),
@@ -108,14 +118,16 @@ async def get_items_per_collection(params: GETCollectionItems, api_response: API
         item_query,
     )
 
-    paginate(params, api_response, item_query, combine_item_tables)
+    descending = params.order == 'desc'
+    keyset = [(ItemModel.type, False), (getattr(ItemModel, params.sorting), descending), (ItemModel.id, descending)]
+    await paginate(db, params, api_response, item_query, combine_item_row, keyset)
 
 
-def create_collection(data: POSTCollection, api_response: APIResponse):
-    collection_query = db.session.query(CollectionsModel).filter(
+async def create_collection(db: AsyncSession, data: POSTCollection, api_response: APIResponse):
+    collection_query = select(CollectionsModel).where(
         CollectionsModel.owner == data.owner, CollectionsModel.container_code == data.container_code
     )
-    collection_result = collection_query.all()
+    collection_result = (await db.execute(collection_query)).scalars().all()
     if len(collection_result) == ConfigClass.MAX_COLLECTIONS:
         raise BadRequestException(f'Cannot create more than {ConfigClass.MAX_COLLECTIONS} collections')
     elif data.name in (collection.name for collection in collection_result):
@@ -123,20 +135,20 @@ def create_collection(data: POSTCollection, api_response: APIResponse):
     else:
         model_data = {'id_': data.id, 'owner': data.owner, 'container_code': data.container_code, 'name': data.name}
         collection = CollectionsModel(**model_data)
-        db.session.add(collection)
-        db.session.commit()
-        db.session.refresh(collection)
+        db.add(collection)
+        await db.commit()
+        await db.refresh(collection)
         api_response.result = collection.to_dict()
         api_response.total = 1
 
 
-def update_collection(data: PUTCollections, api_response: APIResponse):
+async def update_collection(db: AsyncSession, data: PUTCollections, api_response: APIResponse):
     collections = {c.id: c.name for c in data.collections}
 
-    query = db.session.query(CollectionsModel).filter(
+    query = select(CollectionsModel).where(
         CollectionsModel.owner == data.owner, CollectionsModel.container_code == data.container_code
     )
-    query_result = query.all()
+    query_result = (await db.execute(query)).scalars().all()
     exist_collections = {c.id: c.name for c in query_result}
 
     for c_id in collections:
@@ -146,7 +158,7 @@ def update_collection(data: PUTCollections, api_response: APIResponse):
             raise DuplicateRecordException(f'Collection name: {collections[c_id]} already exists')
 
     for collection in data.collections:
-        db.session.merge(
+        await db.merge(
             CollectionsModel(
                 id_=collection.id,
                 name=collection.name,
@@ -155,34 +167,36 @@ def update_collection(data: PUTCollections, api_response: APIResponse):
                 last_updated_time=datetime.now(timezone.utc),
             )
         )
-        db.session.commit()
+        await db.commit()
 
     result = json.loads(data.json())
     api_response.result = result
     api_response.total = len(data.collections)
 
 
-def add_items(data: POSTCollectionItems, api_response: APIResponse):
-    validate_collection(collection_id=data.id)
+async def add_items(db: AsyncSession, data: POSTCollectionItems, api_response: APIResponse):
+    await validate_collection(db, collection_id=data.id)
     for item_id in data.item_ids:
-        db.session.merge(ItemsCollectionsModel(collection_id=data.id, item_id=item_id))
-    db.session.commit()
+        await db.merge(ItemsCollectionsModel(collection_id=data.id, item_id=item_id))
+    await db.commit()
     result = json.loads(data.json())
     api_response.result = result
     api_response.total = len(data.item_ids)
 
 
-def remove_items(data: DELETECollectionItems):
-    validate_collection(collection_id=data.id)
-    db.session.query(ItemsCollectionsModel).filter(
-        ItemsCollectionsModel.collection_id == data.id, ItemsCollectionsModel.item_id.in_(data.item_ids)
-    ).delete(synchronize_session=False)
+async def remove_items(db: AsyncSession, data: DELETECollectionItems):
+    await validate_collection(db, collection_id=data.id)
+    await db.execute(
+        delete(ItemsCollectionsModel).where(
+            ItemsCollectionsModel.collection_id == data.id, ItemsCollectionsModel.item_id.in_(data.item_ids)
+        )
+    )
 
-    db.session.commit()
+    await db.commit()
 
 
-def remove_collection(collection_id: UUID, api_response: APIResponse):
-    validate_collection(collection_id=collection_id)
-    db.session.query(CollectionsModel).filter(CollectionsModel.id == collection_id).delete()
-    db.session.commit()
+async def remove_collection(db: AsyncSession, collection_id: UUID, api_response: APIResponse):
+    await validate_collection(db, collection_id=collection_id)
+    await db.execute(delete(CollectionsModel).where(CollectionsModel.id == collection_id))
+    await db.commit()
     api_response.total = 0
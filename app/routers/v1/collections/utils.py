@@ -6,15 +6,16 @@
 
 from uuid import UUID
 
-from fastapi_sqlalchemy import db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.sql_collections import CollectionsModel
 from app.routers.router_exceptions import EntityNotFoundException
 
 
-def validate_collection(collection_id: UUID) -> CollectionsModel:
-    collection_query = db.session.query(CollectionsModel).filter(CollectionsModel.id == collection_id)
-    collection_result = collection_query.first()
+async def validate_collection(db: AsyncSession, collection_id: UUID) -> CollectionsModel:
+    collection_query = select(CollectionsModel).where(CollectionsModel.id == collection_id)
+    collection_result = (await db.execute(collection_query)).scalars().first()
     if not collection_result:
         raise EntityNotFoundException(f'Collection {collection_id} does not exist')
     return collection_result
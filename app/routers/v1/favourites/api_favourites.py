@@ -7,7 +7,9 @@
 from fastapi import APIRouter
 from fastapi import Depends
 from fastapi_utils.cbv import cbv
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.dependencies.db import get_db_session
 from app.models.base_models import EAPIResponseCode
 from app.models.models_favourites import DELETEFavourite
 from app.models.models_favourites import DELETEFavouriteResponse
@@ -37,11 +39,13 @@ router_bulk = APIRouter()
 
 @cbv(router)
 class APIFavourites:
+    db: AsyncSession = Depends(get_db_session)
+
     @router.post('/', response_model=POSTFavouriteResponse, summary='Favourite an entity')
     async def create_favourite(self, data: POSTFavourite):
         try:
             api_response = POSTFavouriteResponse()
-            api_response.result = create_favourite(data)
+            api_response.result = await create_favourite(self.db, data)
         except UnauthorizedException as e:
             set_api_response_error(api_response, str(e), EAPIResponseCode.forbidden)
         except BadRequestException as e:
@@ -58,7 +62,9 @@ class APIFavourites:
     async def pin_favourite(self, user: str, params: PATCHFavourite = Depends(PATCHFavourite)):
         try:
             api_response = PATCHFavouriteResponse()
-            api_response.result = pin_unpin_favourite_by_user_and_entity_id(user, params.id, params.type, params.pinned)
+            api_response.result = await pin_unpin_favourite_by_user_and_entity_id(
+                self.db, user, params.id, params.type, params.pinned
+            )
         except EntityNotFoundException as e:
             set_api_response_error(api_response, str(e), EAPIResponseCode.not_found)
         except Exception:
@@ -69,7 +75,7 @@ class APIFavourites:
     async def delete_favourite(self, params: DELETEFavourite = Depends(DELETEFavourite)):
         try:
             api_response = DELETEFavouriteResponse()
-            delete_favourite_by_user_and_entity_id(params.id, params.user, params.type, api_response)
+            await delete_favourite_by_user_and_entity_id(self.db, params.id, params.user, params.type, api_response)
         except EntityNotFoundException as e:
             set_api_response_error(api_response, str(e), EAPIResponseCode.not_found)
         except Exception:
@@ -79,11 +85,13 @@ class APIFavourites:
 
 @cbv(router_bulk)
 class APIFavouritesBulk:
+    db: AsyncSession = Depends(get_db_session)
+
     @router_bulk.get('/{user}/', response_model=GETFavouriteResponse, summary='Get all favourites for a user')
     async def get_favourites(self, params: GETFavourite = Depends(GETFavourite)):
         try:
             api_response = GETFavouriteResponse()
-            get_favourites_by_user(params, api_response)
+            await get_favourites_by_user(self.db, params, api_response)
         except BadRequestException as e:
             set_api_response_error(api_response, str(e), EAPIResponseCode.bad_request)
         except Exception:
@@ -96,7 +104,7 @@ class APIFavouritesBulk:
     async def pin_favourites(self, data: PATCHFavourites, user: str):
         try:
             api_response = PATCHFavouriteResponse()
-            bulk_pin_unpin_favourites(user, data, api_response)
+            await bulk_pin_unpin_favourites(self.db, user, data, api_response)
         except EntityNotFoundException as e:
             set_api_response_error(api_response, str(e), EAPIResponseCode.not_found)
         except Exception:
@@ -107,7 +115,7 @@ class APIFavouritesBulk:
     async def delete_favourites(self, data: DELETEFavourites, user: str):
         try:
             api_response = DELETEFavouriteResponse()
-            bulk_delete_favourites(user, data, api_response)
+            await bulk_delete_favourites(self.db, user, data, api_response)
         except EntityNotFoundException as e:
             set_api_response_error(api_response, str(e), EAPIResponseCode.not_found)
         except Exception:
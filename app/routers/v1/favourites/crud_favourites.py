@@ -6,9 +6,13 @@
 
 from uuid import UUID
 
-from fastapi_sqlalchemy import db
+from sqlalchemy import delete
 from sqlalchemy import or_
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.app_utils import split_into_chunks
+from app.config import ConfigClass
 from app.models.base_models import APIResponse
 from app.models.models_favourites import DELETEFavourites
 from app.models.models_favourites import GETFavourite
@@ -30,7 +34,7 @@ from app.routers.v1.items import crud_items
 from ...router_utils import paginate
 
 
-def get_favourites_by_user(params: GETFavourite, api_response: APIResponse):
+async def get_favourites_by_user(db: AsyncSession, params: GETFavourite, api_response: APIResponse):
     try:
         custom_sort = getattr(FavouritesModel, params.sorting).asc()
         if params.order == 'desc':
@@ -38,22 +42,29 @@ def get_favourites_by_user(params: GETFavourite, api_response: APIResponse):
     except Exception:
         raise BadRequestException(f'Cannot sort by {params.sorting}')
     favourites_query = (
-        db.session.query(FavouritesModel, ItemModel, CollectionsModel)
-        .outerjoin(ItemModel, CollectionsModel)
-        .filter(
+        select(FavouritesModel, ItemModel, CollectionsModel)
+        .outerjoin(ItemModel)
+        .outerjoin(CollectionsModel)
+        .where(
             FavouritesModel.user == params.user,
             or_(ItemModel.status == ItemStatus.ACTIVE, CollectionsModel.id is not None),
         )
         .order_by(FavouritesModel.pinned.desc(), custom_sort)
     )
-    paginate(params, api_response, favourites_query, combine_favourites_query_result)
+    descending = params.order == 'desc'
+    keyset = [
+        (FavouritesModel.pinned, True),
+        (getattr(FavouritesModel, params.sorting), descending),
+        (FavouritesModel.id, descending),
+    ]
+    await paginate(db, params, api_response, favourites_query, combine_favourites_query_result, keyset)
 
 
-def create_favourite(data: POSTFavourite) -> dict:
+async def create_favourite(db: AsyncSession, data: POSTFavourite) -> dict:
     input_validation = (
-        crud_items.check_item_consistency(data.id, data.zone, data.container_code)
+        await crud_items.check_item_consistency(db, data.id, data.zone, data.container_code)
         if data.type == 'item'
-        else crud_collections.check_collection_consistency(data.id, data.container_code, data.user)
+        else await crud_collections.check_collection_consistency(db, data.id, data.container_code, data.user)
     )
     if input_validation == 403:
         raise UnauthorizedException(f'{data.user} does not own {data.type} {data.id}')
@@ -68,8 +79,8 @@ def create_favourite(data: POSTFavourite) -> dict:
         'pinned': False,
     }
     model = ItemModel if favourite_model_data['item_id'] else CollectionsModel
-    entity_exists_query = db.session.query(model).filter(model.id == data.id)
-    entity = entity_exists_query.first()
+    entity_exists_query = select(model).where(model.id == data.id)
+    entity = (await db.execute(entity_exists_query)).scalars().first()
     if type(entity) == ItemModel:
         if entity.status != ItemStatus.ACTIVE:
             raise BadRequestException('Cannot favourite an archived or incompleted item')
@@ -79,38 +90,42 @@ def create_favourite(data: POSTFavourite) -> dict:
         raise EntityNotFoundException(f'{data.type.capitalize()} {data.id} not found')
     favourite = FavouritesModel(**favourite_model_data)
     try:
-        db.session.add(favourite)
-        db.session.commit()
-        db.session.refresh(favourite)
+        db.add(favourite)
+        await db.commit()
+        await db.refresh(favourite)
     except Exception:
+        await db.rollback()
         raise DuplicateRecordException
     return create_favourite_response(favourite, entity)
 
 
-def pin_unpin_favourite_by_user_and_entity_id(user: str, id_: UUID, type_: str, pinned: bool):
+async def pin_unpin_favourite_by_user_and_entity_id(db: AsyncSession, user: str, id_: UUID, type_: str, pinned: bool):
     favourite_query = (
-        db.session.query(FavouritesModel, ItemModel, CollectionsModel)
-        .outerjoin(ItemModel, CollectionsModel)
-        .filter(
+        select(FavouritesModel, ItemModel, CollectionsModel)
+        .outerjoin(ItemModel)
+        .outerjoin(CollectionsModel)
+        .where(
             FavouritesModel.item_id == id_ if type_ == 'item' else FavouritesModel.collection_id == id_,
             FavouritesModel.user == user,
         )
     )
-    favourites_result = favourite_query.first()
+    favourites_result = (await db.execute(favourite_query)).first()
     if not favourites_result:
         raise EntityNotFoundException(f'{type_.capitalize()} {id} not found')
     favourites_result[0].pinned = pinned
-    db.session.commit()
-    db.session.refresh(favourites_result[0])
+    await db.commit()
+    await db.refresh(favourites_result[0])
     return combine_favourites_query_result(favourites_result)
 
 
-def bulk_pin_unpin_favourites(user: str, data: PATCHFavourites, api_response: APIResponse):
+async def bulk_pin_unpin_favourites(db: AsyncSession, user: str, data: PATCHFavourites, api_response: APIResponse):
     results = []
     for favourite in data.favourites:
         try:
             results.append(
-                pin_unpin_favourite_by_user_and_entity_id(user, favourite.id, favourite.type, favourite.pinned)
+                await pin_unpin_favourite_by_user_and_entity_id(
+                    db, user, favourite.id, favourite.type, favourite.pinned
+                )
             )
         except EntityNotFoundException as e:
             raise e
@@ -118,29 +133,28 @@ def bulk_pin_unpin_favourites(user: str, data: PATCHFavourites, api_response: AP
     api_response.total = len(results)
 
 
-def delete_favourites_for_all_users(ids: list[str], type_: str):
-    favourite_query = db.session.query(FavouritesModel).filter(
-        FavouritesModel.item_id.in_(ids) if type_ == 'item' else FavouritesModel.collection_id.in_(ids)
-    )
-    favourites = favourite_query.all()
-    for favourite in favourites:
-        db.session.delete(favourite)
-        db.session.commit()
+async def delete_favourites_for_all_users(db: AsyncSession, ids: list[UUID], type_: str):
+    """Delete every user's favourites of the given entities in the caller's transaction, without committing."""
+    column = FavouritesModel.item_id if type_ == 'item' else FavouritesModel.collection_id
+    for chunk in split_into_chunks(ids, ConfigClass.BULK_INSERT_CHUNK_SIZE):
+        await db.execute(delete(FavouritesModel).where(column.in_(chunk)).execution_options(synchronize_session=False))
 
 
-def delete_favourite_by_user_and_entity_id(id_: UUID, user: str, type_: str, api_response: APIResponse):
-    favourite_query = db.session.query(FavouritesModel).filter(
+async def delete_favourite_by_user_and_entity_id(
+    db: AsyncSession, id_: UUID, user: str, type_: str, api_response: APIResponse
+):
+    favourite_query = select(FavouritesModel).where(
         FavouritesModel.item_id == id_ if type_ == 'item' else FavouritesModel.collection_id == id_,
         FavouritesModel.user == user,
     )
-    favourite = favourite_query.first()
+    favourite = (await db.execute(favourite_query)).scalars().first()
     if not favourite:
         raise EntityNotFoundException(f'{type_.capitalize()} {id_} not found')
-    db.session.delete(favourite)
-    db.session.commit()
+    await db.delete(favourite)
+    await db.commit()
     api_response.total = 0
 
 
-def bulk_delete_favourites(user: str, data: DELETEFavourites, api_response: APIResponse):
+async def bulk_delete_favourites(db: AsyncSession, user: str, data: DELETEFavourites, api_response: APIResponse):
     for favourite in data.favourites:
-        delete_favourite_by_user_and_entity_id(favourite.id, user, favourite.type, api_response)
+        await delete_favourite_by_user_and_entity_id(db, favourite.id, user, favourite.type, api_response)
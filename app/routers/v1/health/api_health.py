@@ -7,12 +7,14 @@
 from fastapi import APIRouter
 from fastapi import Depends
 from fastapi import Response
-from fastapi_sqlalchemy import db
 from fastapi_utils.cbv import cbv
 from kafka.errors import KafkaConnectionError
 from kafka.errors import NoBrokersAvailable
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.clients.kafka_client import get_kafka_client
+from app.dependencies.db import get_db_session
 from app.logger import logger
 from app.models.sql_attribute_templates import AttributeTemplateModel
 from app.models.sql_extended import ExtendedModel
@@ -22,14 +24,17 @@ from app.models.sql_items_collections import ItemsCollectionsModel
 from app.models.sql_storage import StorageModel
 
 
-def opsdb_check() -> bool:
+async def opsdb_check(db: AsyncSession = Depends(get_db_session)) -> bool:
     try:
-        db.session.query(ItemModel).first()
-        db.session.query(ExtendedModel).first()
-        db.session.query(AttributeTemplateModel).first()
-        db.session.query(StorageModel).first()
-        db.session.query(ItemsCollectionsModel).first()
-        db.session.query(FavouritesModel).first()
+        for model in [
+            ItemModel,
+            ExtendedModel,
+            AttributeTemplateModel,
+            StorageModel,
+            ItemsCollectionsModel,
+            FavouritesModel,
+        ]:
+            await db.execute(select(model).limit(1))
     except Exception:
         logger.exception('An exception occurred while performing database query.')
         return False
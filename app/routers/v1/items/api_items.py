@@ -10,10 +10,13 @@ from fastapi import APIRouter
 from fastapi import Depends
 from fastapi import Query
 from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
+from fastapi.responses import StreamingResponse
 from fastapi_utils.cbv import cbv
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.clients.kafka_client import KafkaProducerClient
-from app.clients.kafka_client import get_kafka_client
+from app.dependencies.db import get_db_session
+from app.models.base_models import APIResponse
 from app.models.base_models import EAPIResponseCode
 from app.models.models_items import DELETEItem
 from app.models.models_items import DELETEItemResponse
@@ -22,6 +25,8 @@ from app.models.models_items import GETItemByLocation
 from app.models.models_items import GETItemResponse
 from app.models.models_items import GETItemsByIDs
 from app.models.models_items import GETItemsByLocation
+from app.models.models_items import GETItemsExport
+from app.models.models_items import GETMarkedItems
 from app.models.models_items import PATCHItem
 from app.models.models_items import PATCHItemResponse
 from app.models.models_items import POSTItem
@@ -36,7 +41,10 @@ from app.routers.router_exceptions import BadRequestException
 from app.routers.router_exceptions import DuplicateRecordException
 from app.routers.router_exceptions import EntityNotFoundException
 from app.routers.router_utils import set_api_response_error
+from app.routers.v1.items.crud_export import get_items_export_query
+from app.routers.v1.items.crud_export import stream_items_ndjson
 from app.routers.v1.items.utils import combine_item_tables
+from app.routers.v1.items.utils import parse_item_fields
 
 from .crud_items import archive_item_by_id
 from .crud_items import bequeath_to_children
@@ -44,6 +52,7 @@ from .crud_items import create_item
 from .crud_items import create_items
 from .crud_items import delete_item_by_id
 from .crud_items import delete_items_by_ids
+from .crud_items import empty_trash
 from .crud_items import get_item_by_id
 from .crud_items import get_item_by_location
 from .crud_items import get_items_by_ids
@@ -51,6 +60,7 @@ from .crud_items import get_items_by_location
 from .crud_items import get_marked_items_by_username
 from .crud_items import mark_delete_item_by_id
 from .crud_items import mark_restore_item_by_id
+from .crud_items import set_items_deleted_mark
 from .crud_items import update_item
 from .crud_items import update_items
 from .dependencies import jwt_required
@@ -61,11 +71,13 @@ router_bulk = APIRouter()
 
 @cbv(router)
 class APIItems:
+    db: AsyncSession = Depends(get_db_session)
+
     @router.get('/{id}/', response_model=GETItemResponse, summary='Get an item by ID or check if an item exists')
     async def get_item(self, params: GETItem = Depends()) -> JSONResponse:
         try:
             api_response = GETItemResponse()
-            api_response.result = combine_item_tables(get_item_by_id(params.id))
+            api_response.result = combine_item_tables(await get_item_by_id(self.db, params.id))
         except Exception:
             set_api_response_error(api_response, f'Failed to get item with id {params.id}', EAPIResponseCode.not_found)
         return api_response.json_response()
@@ -74,18 +86,16 @@ class APIItems:
     async def get_item_by_location(self, params: GETItemByLocation = Depends()) -> JSONResponse:
         try:
             api_response = GETItemResponse()
-            api_response.result = get_item_by_location(params)
+            api_response.result = await get_item_by_location(self.db, params)
         except Exception:
             set_api_response_error(api_response, 'Failed to get item', EAPIResponseCode.not_found)
         return api_response.json_response()
 
     @router.post('/', response_model=POSTItemResponse, summary='Create a new item')
-    async def create_item(
-        self, data: POSTItem, kafka_client: KafkaProducerClient = Depends(get_kafka_client)
-    ) -> JSONResponse:
+    async def create_item(self, data: POSTItem) -> JSONResponse:
         try:
             api_response = POSTItemResponse()
-            api_response.result = create_item(data, kafka_client)
+            api_response.result = await create_item(self.db, data)
         except BadRequestException as e:
             set_api_response_error(api_response, str(e), EAPIResponseCode.bad_request)
         except DuplicateRecordException:
@@ -99,11 +109,10 @@ class APIItems:
         self,
         data: PUTItem,
         id_: UUID = Query(None, alias='id'),
-        kafka_client: KafkaProducerClient = Depends(get_kafka_client),
     ) -> JSONResponse:
         try:
             api_response = PUTItemResponse()
-            api_response.result = update_item(id_, data, kafka_client)
+            api_response.result = await update_item(self.db, id_, data)
         except BadRequestException as e:
             set_api_response_error(api_response, str(e), EAPIResponseCode.bad_request)
         except EntityNotFoundException:
@@ -113,12 +122,10 @@ class APIItems:
         return api_response.json_response()
 
     @router.patch('/', response_model=PATCHItemResponse, summary='Move an item to or out of the trash')
-    async def trash_item(
-        self, params: PATCHItem = Depends(), kafka_client: KafkaProducerClient = Depends(get_kafka_client)
-    ) -> JSONResponse:
+    async def trash_item(self, params: PATCHItem = Depends()) -> JSONResponse:
         try:
             api_response = PATCHItemResponse()
-            archive_item_by_id(params, kafka_client, api_response)
+            await archive_item_by_id(self.db, params, api_response)
         except BadRequestException as e:
             set_api_response_error(api_response, str(e), EAPIResponseCode.bad_request)
         except EntityNotFoundException:
@@ -128,12 +135,10 @@ class APIItems:
         return api_response.json_response()
 
     @router.delete('/', response_model=DELETEItemResponse, summary='Permanently delete an item')
-    async def delete_item(
-        self, params: DELETEItem = Depends(), kafka_client: KafkaProducerClient = Depends(get_kafka_client)
-    ) -> JSONResponse:
+    async def delete_item(self, params: DELETEItem = Depends()) -> JSONResponse:
         try:
             api_response = DELETEItemResponse()
-            delete_item_by_id(params.id, kafka_client, api_response)
+            await delete_item_by_id(self.db, params.id, api_response)
         except EntityNotFoundException:
             set_api_response_error(api_response, f'Failed to get item with id {params.id}', EAPIResponseCode.not_found)
         except Exception:
@@ -146,7 +151,7 @@ class APIItems:
     ) -> JSONResponse:
         try:
             api_response = DELETEItemResponse()
-            mark_delete_item_by_id(id_, current_identity['username'])
+            await mark_delete_item_by_id(self.db, id_, current_identity['username'])
         except EntityNotFoundException:
             set_api_response_error(api_response, f'Failed to get item with id {id_}', EAPIResponseCode.not_found)
         except Exception:
@@ -159,7 +164,7 @@ class APIItems:
     ) -> JSONResponse:
         try:
             api_response = PUTItemResponse()
-            mark_restore_item_by_id(id_)
+            await mark_restore_item_by_id(self.db, id_)
         except EntityNotFoundException:
             set_api_response_error(api_response, f'Failed to get item with id {id_}', EAPIResponseCode.not_found)
         except Exception:
@@ -169,35 +174,59 @@ class APIItems:
 
 @cbv(router_bulk)
 class APIItemsBulk:
+    db: AsyncSession = Depends(get_db_session)
+
     @router_bulk.get('/batch/', response_model=GETItemResponse, summary='Get many items by IDs')
-    async def get_items_by_ids(self, ids: list[UUID] = Query(None), params: GETItemsByIDs = Depends()) -> JSONResponse:
+    async def get_items_by_ids(
+        self, ids: list[UUID] = Query(None), params: GETItemsByIDs = Depends()
+    ) -> ORJSONResponse:
         try:
             api_response = GETItemResponse()
-            get_items_by_ids(params, ids, api_response)
+            await get_items_by_ids(self.db, params, ids, api_response)
+        except BadRequestException as e:
+            set_api_response_error(api_response, str(e), EAPIResponseCode.bad_request)
         except Exception:
             set_api_response_error(api_response, 'Failed to get item', EAPIResponseCode.not_found)
-        return api_response.json_response()
+        return api_response.orjson_response()
 
     @router_bulk.get('/search/', response_model=GETItemResponse, summary='Get all items by location')
     async def get_items_by_location(
         self, params: GETItemsByLocation = Depends(), current_identity: dict = Depends(jwt_required)
-    ) -> JSONResponse:
+    ) -> ORJSONResponse:
         try:
             api_response = GETItemResponse()
-            await get_items_by_location(params, api_response, current_identity)
+            await get_items_by_location(self.db, params, api_response, current_identity)
         except BadRequestException as e:
             set_api_response_error(api_response, str(e), EAPIResponseCode.bad_request)
         except Exception:
             set_api_response_error(api_response, 'Failed to get item', EAPIResponseCode.not_found)
-        return api_response.json_response()
+        return api_response.orjson_response()
+
+    @router_bulk.get('/export/', summary='Stream all items of a container as NDJSON')
+    async def export_items(
+        self, params: GETItemsExport = Depends(), current_identity: dict = Depends(jwt_required)
+    ) -> StreamingResponse | JSONResponse:
+        try:
+            fields = parse_item_fields(params.fields)
+            item_query = await get_items_export_query(params, fields, current_identity)
+        except BadRequestException as e:
+            api_response = APIResponse()
+            set_api_response_error(api_response, str(e), EAPIResponseCode.bad_request)
+            return api_response.json_response()
+        headers = {'Content-Disposition': f'attachment; filename="{params.container_code}.ndjson"'}
+        if params.compress:
+            headers['Content-Encoding'] = 'gzip'
+        return StreamingResponse(
+            stream_items_ndjson(self.db, item_query, fields, params.compress),
+            media_type='application/x-ndjson',
+            headers=headers,
+        )
 
     @router_bulk.post('/batch/', response_model=POSTItemResponse, summary='Create many new items')
-    async def create_items(
-        self, data: POSTItems, kafka_client: KafkaProducerClient = Depends(get_kafka_client)
-    ) -> JSONResponse:
+    async def create_items(self, data: POSTItems) -> JSONResponse:
         try:
             api_response = POSTItemResponse()
-            create_items(data, kafka_client, api_response)
+            await create_items(self.db, data, api_response)
         except BadRequestException as e:
             set_api_response_error(api_response, str(e), EAPIResponseCode.bad_request)
         except DuplicateRecordException:
@@ -211,26 +240,25 @@ class APIItemsBulk:
         self,
         data: PUTItems,
         ids: list[UUID] = Query(None),
-        kafka_client: KafkaProducerClient = Depends(get_kafka_client),
     ) -> JSONResponse:
         try:
             api_response = PUTItemResponse()
             if len(data.items) != len(ids):
                 raise BadRequestException('Number of IDs does not match number of update data')
-            update_items(ids, data, kafka_client, api_response)
+            await update_items(self.db, ids, data, api_response)
         except BadRequestException as e:
             set_api_response_error(api_response, str(e), EAPIResponseCode.bad_request)
+        except EntityNotFoundException as e:
+            set_api_response_error(api_response, str(e), EAPIResponseCode.not_found)
         except Exception as e:
             set_api_response_error(api_response, f'Failed to update items: {e}', EAPIResponseCode.internal_error)
         return api_response.json_response()
 
     @router_bulk.delete('/batch/', response_model=DELETEItemResponse, summary='Permanently delete many items by IDs')
-    async def delete_items_by_ids(
-        self, ids: list[UUID] = Query(None), kafka_client: KafkaProducerClient = Depends(get_kafka_client)
-    ) -> JSONResponse:
+    async def delete_items_by_ids(self, ids: list[UUID] = Query(None)) -> JSONResponse:
         try:
             api_response = DELETEItemResponse()
-            delete_items_by_ids(ids, kafka_client, api_response)
+            await delete_items_by_ids(self.db, ids, api_response)
         except Exception:
             set_api_response_error(api_response, 'Failed to delete items', EAPIResponseCode.not_found)
         return api_response.json_response()
@@ -241,22 +269,50 @@ class APIItemsBulk:
     ) -> JSONResponse:
         try:
             api_response = DELETEItemResponse()
-            for id_ in ids:
-                mark_delete_item_by_id(id_, current_identity['username'])
+            await set_items_deleted_mark(self.db, ids, current_identity['username'])
         except EntityNotFoundException:
             set_api_response_error(api_response, 'One or more items not found', EAPIResponseCode.not_found)
         except Exception:
             set_api_response_error(api_response, 'Failed to mark items as deleted', EAPIResponseCode.internal_error)
         return api_response.json_response()
 
-    @router_bulk.get('/mark/')
-    async def get_items_mark(self, current_identity: dict = Depends(jwt_required)) -> JSONResponse:
+    @router_bulk.put('/mark/')
+    async def mark_items_restore(
+        self, ids: list[UUID] = Query(None), current_identity: dict = Depends(jwt_required)
+    ) -> JSONResponse:
+        try:
+            api_response = PUTItemResponse()
+            await set_items_deleted_mark(self.db, ids, None)
+        except EntityNotFoundException:
+            set_api_response_error(api_response, 'One or more items not found', EAPIResponseCode.not_found)
+        except Exception:
+            set_api_response_error(api_response, 'Failed to restore marked items', EAPIResponseCode.internal_error)
+        return api_response.json_response()
+
+    @router_bulk.get('/mark/', response_model=GETItemResponse, summary='Get a page of the items marked as deleted')
+    async def get_items_mark(
+        self, params: GETMarkedItems = Depends(), current_identity: dict = Depends(jwt_required)
+    ) -> ORJSONResponse:
         try:
             api_response = GETItemResponse()
-            result = get_marked_items_by_username(current_identity['username'])
-            api_response.result = [combine_item_tables(item) for item in result]
+            await get_marked_items_by_username(self.db, current_identity['username'], params, api_response)
+        except BadRequestException as e:
+            set_api_response_error(api_response, str(e), EAPIResponseCode.bad_request)
         except Exception:
             set_api_response_error(api_response, 'Failed to get marked items', EAPIResponseCode.internal_error)
+        return api_response.orjson_response()
+
+    @router_bulk.delete(
+        '/mark/empty/',
+        response_model=DELETEItemResponse,
+        summary='Permanently delete all items marked as deleted by the user',
+    )
+    async def empty_trash(self, current_identity: dict = Depends(jwt_required)) -> JSONResponse:
+        try:
+            api_response = DELETEItemResponse()
+            await empty_trash(self.db, current_identity['username'], api_response)
+        except Exception:
+            set_api_response_error(api_response, 'Failed to empty trash', EAPIResponseCode.internal_error)
         return api_response.json_response()
 
     @router_bulk.put(
@@ -268,11 +324,10 @@ class APIItemsBulk:
         self,
         data: PUTItemsBequeath,
         id_: UUID = Query(None, alias='id'),
-        kafka_client: KafkaProducerClient = Depends(get_kafka_client),
     ) -> JSONResponse:
         try:
             api_response = PUTItemsBequeathResponse()
-            bequeath_to_children(id_, data, kafka_client, api_response)
+            await bequeath_to_children(self.db, id_, data, api_response)
         except BadRequestException as e:
             set_api_response_error(api_response, str(e), EAPIResponseCode.bad_request)
         except Exception:
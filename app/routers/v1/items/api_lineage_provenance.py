@@ -4,29 +4,55 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+from uuid import UUID
+
 from fastapi import APIRouter
 from fastapi import Depends
+from fastapi import Query
 from fastapi.responses import JSONResponse
 from fastapi_utils.cbv import cbv
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.dependencies.db import get_db_session
 from app.models.base_models import EAPIResponseCode
+from app.models.models_lineage_provenance import GETLineageGraph
+from app.models.models_lineage_provenance import GETLineageGraphResponse
 from app.models.models_lineage_provenance import GETLineageProvenance
+from app.models.models_lineage_provenance import GETLineageProvenanceBatchResponse
 from app.models.models_lineage_provenance import GETLineageProvenanceResponse
 from app.routers.router_utils import set_api_response_error
+from app.routers.v1.items.crud_lineage_provenance import get_lineage_graph_by_item_id
 from app.routers.v1.items.crud_lineage_provenance import get_lineage_provenance_by_item_id
+from app.routers.v1.items.crud_lineage_provenance import get_lineage_provenance_by_item_ids
 
 router = APIRouter()
 
 
 @cbv(router)
 class APILineageProvenance:
+    db: AsyncSession = Depends(get_db_session)
+
+    @router.get(
+        '/batch/',
+        response_model=GETLineageProvenanceBatchResponse,
+        summary='Get lineage and provenance for many items',
+    )
+    async def get_lineage_provenance_batch(self, item_ids: list[UUID] = Query(...)) -> JSONResponse:
+        try:
+            api_response = GETLineageProvenanceBatchResponse()
+            api_response.result = await get_lineage_provenance_by_item_ids(self.db, item_ids)
+            api_response.total = len(api_response.result)
+        except Exception:
+            set_api_response_error(api_response, 'Failed to get lineage for items', EAPIResponseCode.internal_error)
+        return api_response.json_response()
+
     @router.get(
         '/{item_id}/', response_model=GETLineageProvenanceResponse, summary='Get lineage and provenance for an item'
     )
     async def get_lineage_provenance(self, params: GETLineageProvenance = Depends()) -> JSONResponse:
         try:
             api_response = GETLineageProvenanceResponse()
-            api_response.result = get_lineage_provenance_by_item_id(params.item_id)
+            api_response.result = await get_lineage_provenance_by_item_id(self.db, params.item_id)
         except Exception:
             set_api_response_error(
                 api_response,
@@ -34,3 +60,22 @@ class APILineageProvenance:
                 EAPIResponseCode.not_found,
             )
         return api_response.json_response()
+
+    @router.get(
+        '/{item_id}/graph/',
+        response_model=GETLineageGraphResponse,
+        summary='Get the upstream and downstream lineage graph of an item',
+    )
+    async def get_lineage_graph(self, params: GETLineageGraph = Depends()) -> JSONResponse:
+        try:
+            api_response = GETLineageGraphResponse()
+            api_response.result = await get_lineage_graph_by_item_id(
+                self.db, params.item_id, params.depth, params.direction
+            )
+        except Exception:
+            set_api_response_error(
+                api_response,
+                f'Failed to get lineage graph for item with id {params.item_id}',
+                EAPIResponseCode.not_found,
+            )
+        return api_response.json_response()
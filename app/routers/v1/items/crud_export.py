@@ -0,0 +1,79 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import zlib
+from collections.abc import AsyncIterator
+
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+from sqlalchemy.sql import expression
+from sqlalchemy_utils.types.ltree import LQUERY
+
+from app.app_utils import encode_path_for_ltree
+from app.config import ConfigClass
+from app.models.models_items import ContainerType
+from app.models.models_items import GETItemsByLocation
+from app.models.models_items import GETItemsExport
+from app.models.sql_extended import ExtendedModel
+from app.models.sql_items import ItemModel
+from app.models.sql_storage import StorageModel
+from app.routers.v1.items.permissions_items import search_permissions_filter
+from app.routers.v1.items.utils import combine_item_row
+from app.routers.v1.items.utils import select_item_rows
+
+
+async def get_items_export_query(params: GETItemsExport, fields: list[str] | None, current_identity: dict) -> Select:
+    """Build the export query, filtered the same way as a recursive search of the container."""
+
+    item_query = (
+        select_item_rows(fields)
+        .join(StorageModel)
+        .join(ExtendedModel)
+        .where(
+            ItemModel.container_code == params.container_code,
+            ItemModel.container_type == params.container_type,
+            ItemModel.status == params.status,
+            ItemModel.deleted.is_(False),
+        )
+        .order_by(ItemModel.id)
+    )
+    if params.zone is not None:
+        item_query = item_query.where(ItemModel.zone == params.zone)
+    if params.parent_path:
+        search_path = encode_path_for_ltree(params.parent_path) + '.*'
+        item_query = item_query.where(ItemModel.parent_path.lquery(expression.cast(search_path, LQUERY)))
+    if params.container_type != ContainerType.DATASET:
+        search_params = GETItemsByLocation(
+            container_code=params.container_code,
+            status=params.status,
+            parent_path=params.parent_path,
+            recursive=True,
+        )
+        item_query = await search_permissions_filter(item_query, current_identity, search_params)
+    return item_query
+
+
+async def stream_items_ndjson(
+    db: AsyncSession, item_query: Select, fields: list[str] | None, compress: bool = False
+) -> AsyncIterator[bytes]:
+    """Yield the query results as NDJSON, one chunk per server-side cursor batch, optionally as a gzip stream.
+
+    Rows are fetched ITEMS_EXPORT_BATCH_SIZE at a time, so memory use does not grow with the size of the container.
+    """
+
+    batch_size = ConfigClass.ITEMS_EXPORT_BATCH_SIZE
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    args = {'fields': fields}
+    result = await db.stream(item_query.execution_options(yield_per=batch_size))
+    async for rows in result.partitions(batch_size):
+        chunk = b''.join(orjson.dumps(combine_item_row(row, args)) + b'\n' for row in rows)
+        if compressor:
+            chunk = compressor.compress(chunk)
+        if chunk:
+            yield chunk
+    if compressor:
+        yield compressor.flush()
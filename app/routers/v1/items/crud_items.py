@@ -11,19 +11,38 @@ from datetime import timedelta
 from datetime import timezone
 from uuid import UUID
 
-from fastapi_sqlalchemy import db
+from sqlalchemy import Column
+from sqlalchemy import Text
+from sqlalchemy import and_
+from sqlalchemy import bindparam
+from sqlalchemy import case
+from sqlalchemy import delete
+from sqlalchemy import func
+from sqlalchemy import literal
+from sqlalchemy import or_
+from sqlalchemy import select
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import expression
+from sqlalchemy.sql.elements import Case
+from sqlalchemy.sql.elements import ColumnElement
 from sqlalchemy_utils import Ltree
+from sqlalchemy_utils import LtreeType
 from sqlalchemy_utils.types.ltree import LQUERY
 
 from app.app_utils import decode_path_from_ltree
 from app.app_utils import encode_label_for_ltree
 from app.app_utils import encode_path_for_ltree
-from app.clients.kafka_client import KafkaProducerClient
+from app.app_utils import split_into_chunks
 from app.config import ConfigClass
 from app.models.base_models import APIResponse
 from app.models.models_items import GETItemsByIDs
 from app.models.models_items import GETItemsByLocation
+from app.models.models_items import GETMarkedItems
 from app.models.models_items import ItemStatus
 from app.models.models_items import PATCHItem
 from app.models.models_items import POSTItem
@@ -32,27 +51,33 @@ from app.models.models_items import PUTItem
 from app.models.models_items import PUTItems
 from app.models.models_items import PUTItemsBequeath
 from app.models.models_lineage_provenance import TransformationType
-from app.models.sql_attribute_templates import AttributeTemplateModel
 from app.models.sql_extended import ExtendedModel
 from app.models.sql_favourites import FavouritesModel
 from app.models.sql_items import ItemModel
+from app.models.sql_items_collections import ItemsCollectionsModel
+from app.models.sql_provenance import ProvenanceModel
 from app.models.sql_storage import StorageModel
 from app.routers.router_exceptions import BadRequestException
 from app.routers.router_exceptions import DuplicateRecordException
 from app.routers.router_exceptions import EntityNotFoundException
 from app.routers.router_utils import paginate
+from app.routers.v1.attribute_templates.template_cache import attribute_template_cache
+from app.routers.v1.attribute_templates.validators import validate_attributes
+from app.routers.v1.attribute_templates.validators import validate_attributes_batch
 from app.routers.v1.favourites import crud_favourites
-from app.routers.v1.items.crud_lineage_provenance import create_lineage
-from app.routers.v1.items.crud_lineage_provenance import create_provenance
+from app.routers.v1.items.crud_lineage_provenance import create_lineages
+from app.routers.v1.items.crud_lineage_provenance import create_provenances
+from app.routers.v1.items.crud_outbox import add_item_events
 from app.routers.v1.items.permissions_items import search_permissions_filter
+from app.routers.v1.items.utils import combine_item_row
 from app.routers.v1.items.utils import combine_item_tables
-from app.routers.v1.items.utils import get_relative_path_depth
-from app.routers.v1.items.utils import rename_folder_in_path
+from app.routers.v1.items.utils import parse_item_fields
+from app.routers.v1.items.utils import select_item_rows
 
 
-def check_item_consistency(id_: UUID, zone: int = None, container_code: str = None) -> int:
-    item_query = db.session.query(ItemModel).filter(ItemModel.id == id_)
-    item = item_query.first()
+async def check_item_consistency(db: AsyncSession, id_: UUID, zone: int = None, container_code: str = None) -> int:
+    item_query = select(ItemModel).where(ItemModel.id == id_)
+    item = (await db.execute(item_query)).scalars().first()
     if not item:
         return 404
     if (zone and item.zone != zone) or (container_code and item.container_code != container_code):
@@ -60,7 +85,8 @@ def check_item_consistency(id_: UUID, zone: int = None, container_code: str = No
     return 200
 
 
-def get_available_file_name(
+async def get_available_file_name(
+    db: AsyncSession,
     container_code: UUID,
     zone: int,
     item_name: str,
@@ -68,17 +94,14 @@ def get_available_file_name(
     status: ItemStatus,
 ) -> str:
 
-    item = (
-        db.session.query(ItemModel)
-        .filter_by(
-            container_code=container_code,
-            zone=zone,
-            name=item_name,
-            parent_path=encoded_item_path,
-            status=status,
-        )
-        .first()
+    item_query = select(ItemModel).filter_by(
+        container_code=container_code,
+        zone=zone,
+        name=item_name,
+        parent_path=encoded_item_path,
+        status=status,
     )
+    item = (await db.execute(item_query)).scalars().first()
 
     if not item:
         return item_name
@@ -92,101 +115,88 @@ def get_available_file_name(
     return item_name_new
 
 
-def get_item_children(root_item: ItemModel, group_by_depth: bool = False) -> dict:
+async def get_item_children(db: AsyncSession, root_item: ItemModel) -> list:
+    """Return all descendants of a folder, shallowest first, ordering by ltree label count in the query."""
+    path_column = ItemModel.restore_path if root_item.status == ItemStatus.ARCHIVED else ItemModel.parent_path
     search_path = (
         f'{root_item.restore_path}.{encode_label_for_ltree(root_item.name)}.*'
         if root_item.status == ItemStatus.ARCHIVED
         else f'{root_item.parent_path}.{encode_label_for_ltree(root_item.name)}.*'
     )
     children_item_query = (
-        db.session.query(ItemModel, StorageModel, ExtendedModel)
-        .join(StorageModel, ExtendedModel)
-        .filter(
+        select(ItemModel, StorageModel, ExtendedModel)
+        .join(StorageModel)
+        .join(ExtendedModel)
+        .where(
             ItemModel.container_code == root_item.container_code,
             ItemModel.zone == root_item.zone,
             ItemModel.status == root_item.status,
-            (
-                ItemModel.restore_path.lquery(expression.cast(search_path, LQUERY))
-                if root_item.status == ItemStatus.ARCHIVED
-                else ItemModel.parent_path.lquery(expression.cast(search_path, LQUERY))
-            ),
+            path_column.lquery(expression.cast(search_path, LQUERY)),
         )
+        .order_by(func.nlevel(path_column), ItemModel.type, ItemModel.name)
     )
-    children = children_item_query.all()
-    if not group_by_depth:
-        return children
-    layers = {}
-    for item in children:
-        depth = get_relative_path_depth(root_item, item[0])
-        if depth not in layers:
-            layers[depth] = []
-        layers[depth].append(item)
-    return layers
-
-
-def move_item(item: ItemModel, new_parent_path: str, children: dict = None, depth: int = 1):
-    if not children:
-        children = get_item_children(item, True)
-    item.parent_path = Ltree(encode_path_for_ltree(new_parent_path)) if new_parent_path else None
-    if depth not in children:
-        return
-    layer = children[depth]
-    for child in layer:
-        move_item(child[0], f'{new_parent_path}/{item.name}' if new_parent_path else item.name, children, depth + 1)
+    return (await db.execute(children_item_query)).all()
 
 
-def rename_item(
-    root_item: ItemModel, item: ItemModel, old_name: str, new_name: str, children: dict = None, depth: int = 1
-):
-    if not children:
-        children = get_item_children(item, True)
-    if item == root_item:
-        item.name = new_name
-    else:
-        rename_folder_in_path(root_item, item)
-    if depth not in children:
-        return
-    layer = children[depth]
-    for child in layer:
-        rename_item(root_item, child[0], old_name, new_name, children, depth + 1)
+def get_children_path_prefix(root_item: ItemModel, name: str = None) -> Ltree:
+    root_path = root_item.restore_path if root_item.status == ItemStatus.ARCHIVED else root_item.parent_path
+    label = encode_label_for_ltree(name if name else root_item.name)
+    return Ltree(f'{root_path}.{label}') if root_path else Ltree(label)
 
 
-def attributes_match_template(attributes: dict, template_id: UUID) -> bool:
-    if not template_id and not attributes:
-        return True
-    try:
-        attribute_template = db.session.query(AttributeTemplateModel).filter_by(id=template_id).first().to_dict()
-        if len(attributes) > len(attribute_template['attributes']):
-            return False
-        for format_ in attribute_template['attributes']:
-            if not format_['optional']:
-                input_value = attributes[format_['name']]
-                if 'options' in format_:
-                    if format_['options']:
-                        if input_value not in format_['options']:
-                            return False
-        return True
-    except Exception:
-        return False
+def replace_path_prefix(path_column: Column, prefix_depth: int, new_prefix: Ltree) -> Case:
+    """Build an expression replacing the first prefix_depth labels of path_column with new_prefix."""
+    new_prefix = expression.cast(str(new_prefix), LtreeType)
+    return case(
+        (func.nlevel(path_column) == prefix_depth, new_prefix),
+        else_=new_prefix + func.subpath(path_column, prefix_depth, type_=LtreeType),
+    )
+
+
+async def repath_item_children(db: AsyncSession, root_item: ItemModel, old_prefix: Ltree, new_prefix: Ltree) -> list:
+    """Replace the old_prefix of every child's parent_path with new_prefix in a single UPDATE."""
+    await db.flush()
+    repath_query = (
+        update(ItemModel)
+        .where(
+            ItemModel.container_code == root_item.container_code,
+            ItemModel.zone == root_item.zone,
+            ItemModel.status == root_item.status,
+            ItemModel.parent_path.descendant_of(expression.cast(str(old_prefix), LtreeType)),
+        )
+        .values(parent_path=replace_path_prefix(ItemModel.parent_path, len(old_prefix), new_prefix))
+        .returning(ItemModel.id)
+        .execution_options(synchronize_session=False)
+    )
+    return (await db.execute(repath_query)).scalars().all()
+
 
+async def validate_item_attributes(db: AsyncSession, attributes: dict | None, template_id: UUID | None) -> None:
+    validators = await attribute_template_cache.get_validators(db, [template_id] if template_id else [])
+    errors = validate_attributes(attributes, template_id, validators)
+    if errors:
+        raise BadRequestException(f'Attributes do not match attribute template: {"; ".join(errors)}')
 
-def get_item_by_id(item_id: UUID) -> tuple[ItemModel, StorageModel, ExtendedModel]:
+
+async def get_item_by_id(db: AsyncSession, item_id: UUID) -> tuple[ItemModel, StorageModel, ExtendedModel]:
     item_query = (
-        db.session.query(ItemModel, StorageModel, ExtendedModel)
-        .join(StorageModel, ExtendedModel)
-        .filter(ItemModel.id == item_id)
+        select(ItemModel, StorageModel, ExtendedModel)
+        .join(StorageModel)
+        .join(ExtendedModel)
+        .where(ItemModel.id == item_id)
     )
-    item_result = item_query.first()
+    item_result = (await db.execute(item_query)).first()
     if not item_result:
         raise EntityNotFoundException()
     return item_result
 
 
-def get_item_by_location(params: GETItemsByLocation):
+async def get_item_by_location(db: AsyncSession, params: GETItemsByLocation):
     item_query = (
-        db.session.query(ItemModel, StorageModel, ExtendedModel)
-        .join(StorageModel, ExtendedModel)
-        .filter(
+        select(ItemModel, StorageModel, ExtendedModel)
+        .join(StorageModel)
+        .join(ExtendedModel)
+        .where(
             ItemModel.name == params.name,
             (
                 ItemModel.parent_path == Ltree(encode_path_for_ltree(params.parent_path))
@@ -199,38 +209,57 @@ def get_item_by_location(params: GETItemsByLocation):
             ItemModel.status == params.status,
         )
     )
-    item_result = item_query.first()
+    item_result = (await db.execute(item_query)).first()
     if item_result:
         return combine_item_tables(item_result)
     else:
         raise EntityNotFoundException()
 
 
-def get_items_by_ids(params: GETItemsByIDs, ids: list[UUID], api_response: APIResponse):
-    item_query = (
-        db.session.query(ItemModel, StorageModel, ExtendedModel)
-        .join(StorageModel, ExtendedModel)
-        .filter(ItemModel.id.in_(ids))
-    )
-    paginate(params, api_response, item_query, combine_item_tables)
+async def get_items_by_ids(db: AsyncSession, params: GETItemsByIDs, ids: list[UUID], api_response: APIResponse):
+    fields = parse_item_fields(params.fields)
+    item_query = select_item_rows(fields).join(StorageModel).join(ExtendedModel).where(ItemModel.id.in_(ids))
+    await paginate(db, params, api_response, item_query, combine_item_row, fields=fields)
+
+
+async def get_combined_items_by_ids(db: AsyncSession, ids: list[UUID]) -> list[dict]:
+    results = []
+    for chunk in split_into_chunks(ids, ConfigClass.BULK_INSERT_CHUNK_SIZE):
+        item_query = (
+            select(ItemModel, StorageModel, ExtendedModel)
+            .join(StorageModel)
+            .join(ExtendedModel)
+            .where(ItemModel.id.in_(chunk))
+            .execution_options(populate_existing=True)
+        )
+        items = {item[0].id: item for item in (await db.execute(item_query)).all()}
+        results.extend(combine_item_tables(items[id_]) for id_ in chunk if id_ in items)
+    return results
 
 
-def get_marked_items_by_username(deleted_by: str) -> list[tuple[ItemModel, StorageModel, ExtendedModel]]:
+async def get_marked_items_by_username(
+    db: AsyncSession, deleted_by: str, params: GETMarkedItems, api_response: APIResponse
+):
+    """Page through a user's trash, most recently deleted first, using the items_trash_idx partial index."""
     days_ago = ConfigClass.DELETED_ITEMS_RETENTION_DAYS
+    fields = parse_item_fields(params.fields)
+    keyset = [(ItemModel.deleted_at, True), (ItemModel.id, True)]
     item_query = (
-        db.session.query(ItemModel, StorageModel, ExtendedModel)
-        .join(StorageModel, ExtendedModel)
-        .filter(
+        select_item_rows(fields, keyset=keyset)
+        .join(StorageModel)
+        .join(ExtendedModel)
+        .where(
             ItemModel.deleted_by == deleted_by,
             ItemModel.deleted.is_(True),
             ItemModel.deleted_at >= datetime.now(timezone.utc) - timedelta(days=days_ago),
         )
+        .order_by(ItemModel.deleted_at.desc(), ItemModel.id.desc())
     )
-    return item_query.all()
+    await paginate(db, params, api_response, item_query, combine_item_row, keyset, fields=fields)
 
 
 async def get_items_by_location(  # noqa: C901
-    params: GETItemsByLocation, api_response: APIResponse, current_identity: dict
+    db: AsyncSession, params: GETItemsByLocation, api_response: APIResponse, current_identity: dict
 ):
     if params.type and params.type not in ['name_folder', 'folder', 'file']:
         raise BadRequestException(f'Invalid type {params.type}')
@@ -242,28 +271,34 @@ async def get_items_by_location(  # noqa: C901
             custom_sort = getattr(ItemModel, params.sorting).desc()
     except Exception:
         raise BadRequestException(f'Cannot sort by {params.sorting}')
+    fields = parse_item_fields(params.fields)
+    descending = params.order == 'desc'
+    keyset = [(ItemModel.type, False), (getattr(ItemModel, params.sorting), descending), (ItemModel.id, descending)]
 
-    item_query = db.session.query(ItemModel, StorageModel, ExtendedModel).join(StorageModel, ExtendedModel)
+    item_query = select_item_rows(fields, keyset=keyset).join(StorageModel).join(ExtendedModel)
     if params.fav_user:
-        item_query = db.session.query(ItemModel, StorageModel, ExtendedModel, FavouritesModel).outerjoin(
-            StorageModel, ExtendedModel, FavouritesModel
+        item_query = (
+            select_item_rows(fields, favourites=True, keyset=keyset)
+            .outerjoin(StorageModel)
+            .outerjoin(ExtendedModel)
+            .outerjoin(FavouritesModel)
         )
-    item_query = item_query.filter(ItemModel.status == params.status, ItemModel.deleted.is_(False)).order_by(
+    item_query = item_query.where(ItemModel.status == params.status, ItemModel.deleted.is_(False)).order_by(
         ItemModel.type, custom_sort
     )
 
     if params.container_code:
-        item_query = item_query.filter(ItemModel.container_code == params.container_code)
+        item_query = item_query.where(ItemModel.container_code == params.container_code)
     if params.zone is not None:
-        item_query = item_query.filter(ItemModel.zone == params.zone)
+        item_query = item_query.where(ItemModel.zone == params.zone)
     if params.name:
-        item_query = item_query.filter(ItemModel.name.ilike(f'%{params.name}%'))
+        item_query = item_query.where(ItemModel.name.ilike(f'%{params.name}%'))
     if params.owner:
-        item_query = item_query.filter(ItemModel.owner.like(params.owner))
+        item_query = item_query.where(ItemModel.owner.like(params.owner))
     if params.type:
-        item_query = item_query.filter(ItemModel.type == params.type)
+        item_query = item_query.where(ItemModel.type == params.type)
     if params.container_type:
-        item_query = item_query.filter(ItemModel.container_type == params.container_type)
+        item_query = item_query.where(ItemModel.container_type == params.container_type)
 
     if params.container_type != 'dataset':
         item_query = await search_permissions_filter(
@@ -276,66 +311,35 @@ async def get_items_by_location(  # noqa: C901
         search_path = encode_path_for_ltree(params.parent_path)
         if params.recursive:
             search_path += '.*'
-        item_query = item_query.filter(ItemModel.parent_path.lquery(expression.cast(search_path, LQUERY)))
+        item_query = item_query.where(ItemModel.parent_path.lquery(expression.cast(search_path, LQUERY)))
     else:
         if not params.recursive:
-            item_query = item_query.filter(ItemModel.parent_path.is_(None))
+            item_query = item_query.where(ItemModel.parent_path.is_(None))
     if params.restore_path:
         search_path = encode_path_for_ltree(params.restore_path)
         if params.recursive:
             search_path += '.*'
-        item_query = item_query.filter(ItemModel.restore_path.lquery(expression.cast(search_path, LQUERY)))
+        item_query = item_query.where(ItemModel.restore_path.lquery(expression.cast(search_path, LQUERY)))
     if params.last_updated_start:
-        item_query = item_query.filter(ItemModel.last_updated_time >= params.last_updated_start)
+        item_query = item_query.where(ItemModel.last_updated_time >= params.last_updated_start)
     if params.last_updated_end:
-        item_query = item_query.filter(ItemModel.last_updated_time <= params.last_updated_end)
-
-    paginate(params, api_response, item_query, combine_item_tables, fav_user=params.fav_user)
+        item_query = item_query.where(ItemModel.last_updated_time <= params.last_updated_end)
 
+    await paginate(
+        db, params, api_response, item_query, combine_item_row, keyset, fav_user=params.fav_user, fields=fields
+    )
 
-def create_item(data: POSTItem, kafka_client: KafkaProducerClient) -> dict:
-    def create_lineage_provenance(
-        transformation_type: TransformationType, consumed_item_id: UUID, produced_item: ItemModel
-    ) -> None:
-        lineage_id = None
-        if transformation_type == TransformationType.COPY_TO_ZONE:
-            lineage_id = create_lineage(
-                consumes=[consumed_item_id], produces=[produced_item.id], tfrm_type=transformation_type
-            )
-            consumed_item = get_item_by_id(consumed_item_id)[0]
-            create_provenance(
-                lineage_id=lineage_id,
-                item_id=consumed_item.id,
-                parent=consumed_item.parent,
-                parent_path=consumed_item.parent_path,
-                status=consumed_item.status,
-                type_=consumed_item.type,
-                zone=consumed_item.zone,
-                name=consumed_item.name,
-                size=consumed_item.size,
-                owner=consumed_item.owner,
-                container_code=consumed_item.container_code,
-                container_type=consumed_item.container_type,
-            )
-        create_provenance(
-            lineage_id=lineage_id,
-            item_id=produced_item.id,
-            parent=produced_item.parent,
-            parent_path=produced_item.parent_path,
-            status=produced_item.status,
-            type_=produced_item.type,
-            zone=produced_item.zone,
-            name=produced_item.name,
-            size=produced_item.size,
-            owner=produced_item.owner,
-            container_code=produced_item.container_code,
-            container_type=produced_item.container_type,
-        )
 
-    if not attributes_match_template(data.attributes, data.attribute_template_id):
-        raise BadRequestException('Attributes do not match attribute template')
+async def create_item(db: AsyncSession, data: POSTItem) -> dict:
+    """Create an item with its storage, extended, lineage and provenance rows and its event in one transaction."""
+    await validate_item_attributes(db, data.attributes, data.attribute_template_id)
     if data.type == 'file' and data.status == ItemStatus.ACTIVE:
         raise BadRequestException('Can not create file as active status.')
+    source = None
+    if data.tfrm_type == TransformationType.COPY_TO_ZONE:
+        source = (await db.execute(select(ItemModel).where(ItemModel.id == data.tfrm_source))).scalar()
+        if not source:
+            raise BadRequestException(f'Transformation sources do not exist: {data.tfrm_source}')
     item_model_data = {
         'id_': data.id if data.id else uuid.uuid4(),
         'parent': data.parent if data.parent else None,
@@ -367,114 +371,318 @@ def create_item(data: POSTItem, kafka_client: KafkaProducerClient) -> dict:
     }
     extended = ExtendedModel(**extended_model_data)
     try:
-        db.session.add_all([item, storage, extended])
-        db.session.commit()
-        db.session.refresh(item)
-        db.session.refresh(storage)
-        db.session.refresh(extended)
+        db.add_all([item, storage, extended])
+        await db.flush()
+        await db.refresh(item)
+        await db.refresh(storage)
+        await db.refresh(extended)
     except Exception:
+        await db.rollback()
         raise DuplicateRecordException
+    lineage_id = None
+    snapshots = []
+    if source:
+        lineage_id = uuid.uuid4()
+        await create_lineages(
+            db, [{'id': lineage_id, 'consumes': [source.id], 'produces': [item.id], 'tfrm_type': data.tfrm_type}]
+        )
+        snapshots.append(get_provenance_snapshot(source, lineage_id))
+    snapshots.append(get_provenance_snapshot(item, lineage_id))
+    await create_provenances(db, snapshots)
     combined_item = combine_item_tables((item, storage, extended))
-    if kafka_client:
-        kafka_client.send(combined_item)
+    add_item_events(db, [combined_item])
+    await db.commit()
+    return combined_item
 
-    create_lineage_provenance(transformation_type=data.tfrm_type, consumed_item_id=data.tfrm_source, produced_item=item)
 
-    return combined_item
+PROVENANCE_ITEM_KEYS = (
+    'parent',
+    'parent_path',
+    'status',
+    'type',
+    'zone',
+    'name',
+    'size',
+    'owner',
+    'container_code',
+    'container_type',
+)
 
 
-def create_items(data: POSTItems, kafka_client: KafkaProducerClient, api_response: APIResponse):
-    results = []
+def get_provenance_snapshot(item: ItemModel | dict, lineage_id: UUID | None) -> dict:
+    if isinstance(item, ItemModel):
+        item = {column.key: getattr(item, column.key) for column in ItemModel.__table__.columns}
+    return {'lineage_id': lineage_id, 'item_id': item['id'], **{key: item[key] for key in PROVENANCE_ITEM_KEYS}}
+
+
+async def validate_new_items(db: AsyncSession, items: list[POSTItem]) -> dict[UUID, ItemModel]:
+    template_ids = {item.attribute_template_id for item in items if item.attribute_template_id}
+    validators = await attribute_template_cache.get_validators(db, template_ids)
+    attribute_errors = validate_attributes_batch(
+        ((item.attributes, item.attribute_template_id) for item in items), validators
+    )
+    invalid_items = [
+        f'{item.id or index}: {"; ".join(errors)}'
+        for index, (item, errors) in enumerate(zip(items, attribute_errors))
+        if errors
+    ]
+    if invalid_items:
+        raise BadRequestException(f'Attributes do not match attribute template: {" | ".join(invalid_items)}')
+    for item in items:
+        if item.type == 'file' and item.status == ItemStatus.ACTIVE:
+            raise BadRequestException('Can not create file as active status.')
+    source_ids = {item.tfrm_source for item in items if item.tfrm_type == TransformationType.COPY_TO_ZONE}
+    sources = {}
+    for chunk in split_into_chunks(list(source_ids), ConfigClass.BULK_INSERT_CHUNK_SIZE):
+        source_query = select(ItemModel).where(ItemModel.id.in_(chunk))
+        sources.update({item.id: item for item in (await db.execute(source_query)).scalars()})
+    missing_sources = source_ids - sources.keys()
+    if missing_sources:
+        raise BadRequestException(f'Transformation sources do not exist: {", ".join(map(str, missing_sources))}')
+    return sources
+
+
+async def create_items(db: AsyncSession, data: POSTItems, api_response: APIResponse):  # noqa: C901
+    sources = await validate_new_items(db, data.items)
+    new_items = {}
     for item in data.items:
-        try:
-            results.append(create_item(item, kafka_client))
-        except DuplicateRecordException as e:
+        item_id = item.id if item.id else uuid.uuid4()
+        if item_id in new_items:
+            if data.skip_duplicates:
+                continue
+            raise DuplicateRecordException
+        new_items[item_id] = item
+    item_rows = {
+        item_id: {
+            'id': item_id,
+            'parent': item.parent if item.parent else None,
+            'parent_path': Ltree(encode_path_for_ltree(item.parent_path)) if item.parent_path else None,
+            'status': item.status,
+            'type': item.type,
+            'zone': item.zone,
+            'name': item.name,
+            'size': item.size,
+            'owner': item.owner,
+            'container_code': item.container_code,
+            'container_type': item.container_type,
+        }
+        for item_id, item in new_items.items()
+    }
+
+    inserted_ids = set()
+    try:
+        for chunk in split_into_chunks(list(item_rows.values()), ConfigClass.BULK_INSERT_CHUNK_SIZE):
+            item_insert = insert(ItemModel).values(chunk).returning(ItemModel.id)
             if data.skip_duplicates:
-                pass
-            else:
-                raise e
+                item_insert = item_insert.on_conflict_do_nothing()
+            inserted_ids.update((await db.execute(item_insert)).scalars().all())
+    except IntegrityError:
+        await db.rollback()
+        raise DuplicateRecordException
+    new_items = {item_id: item for item_id, item in new_items.items() if item_id in inserted_ids}
+
+    storage_rows = []
+    extended_rows = []
+    lineage_rows = []
+    snapshots = []
+    for item_id, item in new_items.items():
+        storage_rows.append(
+            {
+                'id': uuid.uuid4(),
+                'item_id': item_id,
+                'location_uri': item.location_uri,
+                'version': item.version,
+                'upload_id': item.upload_id,
+            }
+        )
+        extended_rows.append(
+            {
+                'id': uuid.uuid4(),
+                'item_id': item_id,
+                'extra': {
+                    'tags': item.tags,
+                    'system_tags': item.system_tags,
+                    'attributes': {str(item.attribute_template_id): item.attributes} if item.attributes else {},
+                },
+            }
+        )
+        lineage_id = None
+        if item.tfrm_type == TransformationType.COPY_TO_ZONE:
+            lineage_id = uuid.uuid4()
+            lineage_rows.append(
+                {'id': lineage_id, 'consumes': [item.tfrm_source], 'produces': [item_id], 'tfrm_type': item.tfrm_type}
+            )
+            snapshots.append(get_provenance_snapshot(sources[item.tfrm_source], lineage_id))
+        snapshots.append(get_provenance_snapshot(item_rows[item_id], lineage_id))
+    for chunk in split_into_chunks(storage_rows, ConfigClass.BULK_INSERT_CHUNK_SIZE):
+        await db.execute(insert(StorageModel).values(chunk))
+    for chunk in split_into_chunks(extended_rows, ConfigClass.BULK_INSERT_CHUNK_SIZE):
+        await db.execute(insert(ExtendedModel).values(chunk))
+    await create_lineages(db, lineage_rows)
+    await create_provenances(db, snapshots)
+
+    results = await get_combined_items_by_ids(db, list(new_items))
+    add_item_events(db, results)
+    await db.commit()
     api_response.result = results
     api_response.total = len(results)
 
 
-def update_item(item_id: UUID, data: PUTItem, kafka_client: KafkaProducerClient) -> dict:  # noqa: C901
-    item = db.session.query(ItemModel).filter_by(id=item_id).first()
-    if not item:
-        raise EntityNotFoundException()
-    if item.status == ItemStatus.REGISTERED and (data.status is None or data.status == ItemStatus.REGISTERED):
-        raise BadRequestException('Cannot update attribute of a REGISTERED item')
+ITEM_UPDATE_COLUMNS = (
+    'parent',
+    'parent_path',
+    'type',
+    'status',
+    'zone',
+    'name',
+    'size',
+    'owner',
+    'container_code',
+    'container_type',
+    'last_updated_time',
+)
+
+
+async def get_items_for_update(db: AsyncSession, ids: list[UUID]) -> dict[UUID, tuple]:
+    targets = {}
+    for chunk in split_into_chunks(ids, ConfigClass.BULK_INSERT_CHUNK_SIZE):
+        item_query = (
+            select(ItemModel, StorageModel, ExtendedModel)
+            .join(StorageModel)
+            .join(ExtendedModel)
+            .where(ItemModel.id.in_(chunk))
+            .execution_options(populate_existing=True)
+        )
+        targets.update({row[0].id: row for row in (await db.execute(item_query)).all()})
+    return targets
+
+
+async def validate_item_updates(db: AsyncSession, updates: list[tuple[ItemModel, PUTItem]]) -> None:
+    for item, data in updates:
+        if item.status == ItemStatus.REGISTERED and (data.status is None or data.status == ItemStatus.REGISTERED):
+            raise BadRequestException('Cannot update attribute of a REGISTERED item')
+    attribute_updates = [(item, data) for item, data in updates if data.attribute_template_id and data.attributes]
+    validators = await attribute_template_cache.get_validators(
+        db, {data.attribute_template_id for _, data in attribute_updates}
+    )
+    attribute_errors = validate_attributes_batch(
+        ((data.attributes, data.attribute_template_id) for _, data in attribute_updates), validators
+    )
+    invalid_items = [
+        f'{item.id}: {"; ".join(errors)}' for (item, _), errors in zip(attribute_updates, attribute_errors) if errors
+    ]
+    if invalid_items:
+        raise BadRequestException(f'Attributes do not match attribute template: {" | ".join(invalid_items)}')
+
 
+def get_updated_item_row(item: ItemModel, data: PUTItem, updated_time: datetime) -> dict:
+    """Work out the new column values of an item without touching the loaded entity."""
+    row = {column.key: getattr(item, column.key) for column in ItemModel.__table__.columns}
     if data.parent != '':
-        item.parent = data.parent if data.parent else None
+        row['parent'] = data.parent if data.parent else None
     if data.parent_path != '' and item.status == ItemStatus.ACTIVE:
-        move_item(item, data.parent_path)
-    if data.type:
-        item.type = data.type
-    if data.status:
-        item.status = data.status
-    if data.zone:
-        item.zone = data.zone
-    if data.name and item.status == ItemStatus.ACTIVE:
-        rename_item(item, item, item.name, data.name)
-    if data.size:
-        item.size = data.size
-    if data.owner:
-        item.owner = data.owner
-    if data.container_code:
-        item.container_code = data.container_code
-    if data.container_type:
-        item.container_type = data.container_type
-    item.last_updated_time = datetime.now(timezone.utc)
-    storage = db.session.query(StorageModel).filter_by(item_id=item_id).first()
-    if data.location_uri:
-        storage.location_uri = data.location_uri
-    if data.version:
-        storage.version = data.version
-    extended = db.session.query(ExtendedModel).filter_by(item_id=item_id).first()
-    extra = dict(extended.extra)
+        row['parent_path'] = Ltree(encode_path_for_ltree(data.parent_path)) if data.parent_path else None
+    for key in ('type', 'status', 'zone', 'size', 'owner', 'container_code', 'container_type'):
+        if getattr(data, key):
+            row[key] = getattr(data, key)
+    if data.name and row['status'] == ItemStatus.ACTIVE:
+        row['name'] = data.name
+    row['last_updated_time'] = updated_time
+    return row
+
+
+def get_updated_extra(extra: dict, data: PUTItem) -> dict:
+    extra = dict(extra)
     if data.tags is not None:
         extra['tags'] = data.tags
     if data.system_tags is not None:
         extra['system_tags'] = data.system_tags
     if data.attribute_template_id and data.attributes:
-        if not attributes_match_template(data.attributes, data.attribute_template_id):
-            raise BadRequestException('Attributes do not match attribute template')
-        extra['attributes'] = {str(data.attribute_template_id): data.attributes} if data.attributes else {}
-    if extra != extended.extra:
-        extended.extra = extra
-    db.session.commit()
-    db.session.refresh(item)
-    db.session.refresh(storage)
-    db.session.refresh(extended)
-    combined_item = combine_item_tables((item, storage, extended))
-    if kafka_client:
-        kafka_client.send(combined_item)
-    create_provenance(
-        lineage_id=None,
-        item_id=item.id,
-        parent=item.parent,
-        parent_path=item.parent_path,
-        status=item.status,
-        type_=item.type,
-        zone=item.zone,
-        name=item.name,
-        size=item.size,
-        owner=item.owner,
-        container_code=item.container_code,
-        container_type=item.container_type,
+        extra['attributes'] = {str(data.attribute_template_id): data.attributes}
+    return extra
+
+
+async def execute_many_updates(db: AsyncSession, model, key: str, columns: tuple, rows: list[dict]) -> None:
+    """Write rows with one executemany UPDATE matching model.key, setting the given columns."""
+    if not rows:
+        return
+    table = model.__table__
+    update_query = (
+        update(table)
+        .where(table.c[key] == bindparam('match_key', type_=table.c[key].type))
+        .values({column: bindparam(f'new_{column}', type_=table.c[column].type) for column in columns})
+    )
+    await db.execute(
+        update_query, [{'match_key': row[key], **{f'new_{column}': row[column] for column in columns}} for row in rows]
     )
-    return combined_item
 
 
-def update_items(ids: list[UUID], data: PUTItems, kafka_client: KafkaProducerClient, api_response: APIResponse):
-    results = []
-    for i in range(0, len(ids)):
-        results.append(update_item(ids[i], data.items[i], kafka_client))
+async def apply_item_updates(db: AsyncSession, ids: list[UUID], items: list[PUTItem]) -> list[dict]:
+    """Update many items with set-based statements and a single commit, returning them in request order.
+
+    All targets are loaded in one query and their new state is worked out in memory. Items, storage and extended rows
+    are then written with one executemany UPDATE each, folders that moved or were renamed repath their children with
+    one UPDATE per folder (deepest first, so nested repaths compose), and every provenance snapshot goes into a single
+    insert.
+    """
+    if len(set(ids)) != len(ids):
+        raise BadRequestException('Item ids must be unique')
+    targets = await get_items_for_update(db, ids)
+    missing_ids = [str(item_id) for item_id in ids if item_id not in targets]
+    if missing_ids:
+        raise EntityNotFoundException(f'Items do not exist: {", ".join(missing_ids)}')
+    await validate_item_updates(db, [(targets[item_id][0], data) for item_id, data in zip(ids, items)])
+
+    updated_time = datetime.now(timezone.utc)
+    item_rows, storage_rows, extended_rows, repaths = [], [], [], []
+    for item_id, data in zip(ids, items):
+        item, storage, extended = targets[item_id]
+        item_row = get_updated_item_row(item, data, updated_time)
+        item_rows.append(item_row)
+        if item.type != 'file' and item.status == ItemStatus.ACTIVE:
+            new_label = encode_label_for_ltree(item_row['name'])
+            new_prefix = Ltree(f'{item_row["parent_path"]}.{new_label}' if item_row['parent_path'] else new_label)
+            old_prefix = get_children_path_prefix(item)
+            if new_prefix != old_prefix:
+                repaths.append((item, old_prefix, new_prefix))
+        if data.location_uri or data.version:
+            storage_rows.append(
+                {
+                    'item_id': item_id,
+                    'location_uri': data.location_uri or storage.location_uri,
+                    'version': data.version or storage.version,
+                }
+            )
+        extra = get_updated_extra(extended.extra, data)
+        if extra != extended.extra:
+            extended_rows.append({'item_id': item_id, 'extra': extra})
+
+    await execute_many_updates(db, ItemModel, 'id', ITEM_UPDATE_COLUMNS, item_rows)
+    await execute_many_updates(db, StorageModel, 'item_id', ('location_uri', 'version'), storage_rows)
+    await execute_many_updates(db, ExtendedModel, 'item_id', ('extra',), extended_rows)
+    repathed_children_ids = set()
+    for item, old_prefix, new_prefix in sorted(repaths, key=lambda repath: len(repath[1]), reverse=True):
+        repathed_children_ids.update(await repath_item_children(db, item, old_prefix, new_prefix))
+    await create_provenances(db, [get_provenance_snapshot(item_row, None) for item_row in item_rows])
+
+    results = await get_combined_items_by_ids(db, ids)
+    children_ids = list(repathed_children_ids - set(ids))
+    add_item_events(db, results + await get_combined_items_by_ids(db, children_ids))
+    await db.commit()
+    return results
+
+
+async def update_item(db: AsyncSession, item_id: UUID, data: PUTItem) -> dict:
+    return (await apply_item_updates(db, [item_id], [data]))[0]
+
+
+async def update_items(db: AsyncSession, ids: list[UUID], data: PUTItems, api_response: APIResponse):
+    results = await apply_item_updates(db, ids, data.items)
     api_response.result = results
     api_response.total = len(results)
 
 
-def get_restore_destination_id(container_code: str, zone: int, restore_path: Ltree) -> UUID:
+async def get_restore_destination_id(db: AsyncSession, container_code: str, zone: int, restore_path: Ltree) -> UUID:
     decoded_restore_path = decode_path_from_ltree(restore_path)
     destination_name = decoded_restore_path
     destination_path = None
@@ -482,197 +690,288 @@ def get_restore_destination_id(container_code: str, zone: int, restore_path: Ltr
     if len(decoded_restore_path_labels) > 1:
         destination_name = decoded_restore_path_labels[-1]
         destination_path = '/'.join(decoded_restore_path_labels[:-1])
-    destination_query = db.session.query(ItemModel).filter(
+    destination_query = select(ItemModel).where(
         ItemModel.container_code == container_code,
         ItemModel.zone == zone,
         ItemModel.status == ItemStatus.ACTIVE,
         ItemModel.name == destination_name,
     )
     if destination_path:
-        destination_query = destination_query.filter(
+        destination_query = destination_query.where(
             ItemModel.parent_path.lquery(expression.cast(encode_path_for_ltree(destination_path), LQUERY))
         )
-    destination = destination_query.first()
+    destination = (await db.execute(destination_query)).scalars().first()
     if destination:
         return destination.id
 
 
-def archive_item(item: ItemModel, trash_item: ItemStatus, root_item: ItemModel = None):
-    if item.status != trash_item:
-        if trash_item == ItemStatus.ARCHIVED:
-            if not root_item:
-                item.name = get_available_file_name(
-                    item.container_code, item.zone, item.name, None, ItemStatus.ARCHIVED
-                )
-                item.parent = None
-            else:
-                rename_folder_in_path(root_item, item)
-            item.restore_path = item.parent_path
-        else:
-            if not root_item:
-
-                item_file_name = get_available_file_name(
-                    item.container_code, item.zone, item.name, item.restore_path, ItemStatus.ACTIVE
-                )
-
-                restore_destination_id = get_restore_destination_id(item.container_code, item.zone, item.restore_path)
-
-                if not restore_destination_id:
-
-                    raise BadRequestException('Restore destination does not exist')
-                item.parent = restore_destination_id
-                item.name = item_file_name
-            else:
-                rename_folder_in_path(root_item, item, ItemStatus.ARCHIVED)
-            item.parent_path = item.restore_path
-            item.restore_path = None
-        item.status = trash_item
-        item.last_updated_time = datetime.now(timezone.utc)
-        lineage_id = create_lineage(consumes=[item.id], produces=None, tfrm_type=TransformationType.ARCHIVE)
-        create_provenance(
-            lineage_id=lineage_id,
-            item_id=item.id,
-            parent=item.parent,
-            parent_path=item.parent_path,
-            status=item.status,
-            type_=item.type,
-            zone=item.zone,
-            name=item.name,
-            size=item.size,
-            owner=item.owner,
-            container_code=item.container_code,
-            container_type=item.container_type,
+async def archive_item(db: AsyncSession, item: ItemModel, trash_item: ItemStatus):
+    if trash_item == ItemStatus.ARCHIVED:
+        item.name = await get_available_file_name(
+            db, item.container_code, item.zone, item.name, None, ItemStatus.ARCHIVED
+        )
+        item.parent = None
+        item.restore_path = item.parent_path
+        item.parent_path = None
+    else:
+        item_file_name = await get_available_file_name(
+            db, item.container_code, item.zone, item.name, item.restore_path, ItemStatus.ACTIVE
+        )
+        restore_destination_id = await get_restore_destination_id(db, item.container_code, item.zone, item.restore_path)
+        if not restore_destination_id:
+            raise BadRequestException('Restore destination does not exist')
+        item.parent = restore_destination_id
+        item.name = item_file_name
+        item.parent_path = item.restore_path
+        item.restore_path = None
+    item.status = trash_item
+    item.last_updated_time = datetime.now(timezone.utc)
+
+
+async def archive_item_children(
+    db: AsyncSession, root_item: ItemModel, children_prefix: Ltree, previous_status: ItemStatus
+) -> list:
+    """Move every child of an already archived or restored root_item into the same state with a single UPDATE."""
+    prefix_depth = len(children_prefix)
+    root_label = encode_label_for_ltree(root_item.name)
+    if root_item.status == ItemStatus.ARCHIVED:
+        path_column = ItemModel.parent_path
+        restore_prefix = (
+            Ltree(f'{root_item.restore_path}.{root_label}') if root_item.restore_path else Ltree(root_label)
+        )
+        new_paths = {
+            'parent_path': replace_path_prefix(ItemModel.parent_path, prefix_depth, Ltree(root_label)),
+            'restore_path': replace_path_prefix(ItemModel.parent_path, prefix_depth, restore_prefix),
+        }
+    else:
+        path_column = ItemModel.restore_path
+        new_paths = {
+            'parent_path': replace_path_prefix(
+                ItemModel.restore_path, prefix_depth, get_children_path_prefix(root_item)
+            ),
+            'restore_path': None,
+        }
+    children_query = (
+        update(ItemModel)
+        .where(
+            ItemModel.container_code == root_item.container_code,
+            ItemModel.zone == root_item.zone,
+            ItemModel.status == previous_status,
+            path_column.descendant_of(expression.cast(str(children_prefix), LtreeType)),
         )
+        .values(status=root_item.status, last_updated_time=datetime.now(timezone.utc), **new_paths)
+        .returning(ItemModel.id, *(getattr(ItemModel, key) for key in PROVENANCE_ITEM_KEYS))
+        .execution_options(synchronize_session=False)
+    )
+    return (await db.execute(children_query)).mappings().all()
 
 
-def archive_item_by_id(params: PATCHItem, kafka_client: KafkaProducerClient, api_response: APIResponse):  # noqa: C901
+async def archive_item_by_id(db: AsyncSession, params: PATCHItem, api_response: APIResponse):
     root_item_query = (
-        db.session.query(ItemModel, StorageModel, ExtendedModel)
-        .join(StorageModel, ExtendedModel)
-        .filter(ItemModel.id == params.id)
+        select(ItemModel, StorageModel, ExtendedModel)
+        .join(StorageModel)
+        .join(ExtendedModel)
+        .where(ItemModel.id == params.id)
     )
-    root_item_result = root_item_query.first()
+    root_item_result = (await db.execute(root_item_query)).first()
     if not root_item_result:
         raise EntityNotFoundException()
-    if root_item_result[0].type == 'name_folder':
+    root_item = root_item_result[0]
+    if root_item.type == 'name_folder':
         raise BadRequestException('Name folders cannot be archived or restored')
-    children_result = []
-    if root_item_result[0].type == 'folder':
-        children_result = get_item_children(root_item_result[0])
-    all_items = []
+    if root_item.status == params.status:
+        children_result = await get_item_children(db, root_item) if root_item.type == 'folder' else []
+        api_response.result = [combine_item_tables(item) for item in [root_item_result, *children_result]]
+        api_response.total = len(api_response.result)
+        return
 
-    try:
-        archive_item(root_item_result[0], params.status)
-        all_items.append(root_item_result)
-        for child in children_result:
-            archive_item(child[0], params.status, root_item_result[0])
-            all_items.append(child)
-        if params.status == ItemStatus.ARCHIVED:
-            move_item(root_item_result[0], None)
-    except BadRequestException:
-
-        raise
-    db.session.commit()
-    results = []
-    for item in all_items:
-        db.session.refresh(item[0])
-        combined_item = combine_item_tables(item)
-        results.append(combined_item)
-        if kafka_client:
-            kafka_client.send(combined_item)
+    previous_status = root_item.status
+    children_prefix = get_children_path_prefix(root_item)
+    await archive_item(db, root_item, params.status)
+    await db.flush()
+    children = []
+    if root_item.type == 'folder':
+        children = await archive_item_children(db, root_item, children_prefix, previous_status)
+    item_ids = [root_item.id] + [child['id'] for child in children]
+
+    lineage_id = uuid.uuid4()
+    await create_lineages(
+        db, [{'id': lineage_id, 'consumes': item_ids, 'produces': None, 'tfrm_type': TransformationType.ARCHIVE}]
+    )
+    await create_provenances(db, [get_provenance_snapshot(item, lineage_id) for item in [root_item, *children]])
+    if params.status == ItemStatus.ARCHIVED:
+        await crud_favourites.delete_favourites_for_all_users(db, item_ids, 'item')
+    results = await get_combined_items_by_ids(db, item_ids)
+    add_item_events(db, results)
+    await db.commit()
     api_response.result = results
     api_response.total = len(results)
-    if params.status == ItemStatus.ARCHIVED:
-        item_ids_to_remove_from_favourites = []
-        for item in all_items:
-            item_ids_to_remove_from_favourites.append(str(item[0].id))
-        crud_favourites.delete_favourites_for_all_users(item_ids_to_remove_from_favourites, 'item')
 
 
-def delete_item_by_id(id_: UUID, kafka_client: KafkaProducerClient, api_response: APIResponse):
-    del_items = []
-    root_item_query = (
-        db.session.query(ItemModel, StorageModel, ExtendedModel)
-        .join(StorageModel, ExtendedModel)
-        .filter(ItemModel.id == id_)
+async def delete_item_by_id(db: AsyncSession, id_: UUID, api_response: APIResponse):
+    await delete_items_by_ids(db, [id_], api_response)
+
+
+async def set_items_deleted_mark(db: AsyncSession, ids: list[UUID], deleted_by: str | None) -> None:
+    """Mark items as deleted by deleted_by, or restore them when it is None, with one UPDATE and one commit."""
+    ids = list(dict.fromkeys(ids))
+    deleted = deleted_by is not None
+    mark_query = (
+        update(ItemModel)
+        .where(ItemModel.id.in_(ids))
+        .values(deleted=deleted, deleted_by=deleted_by, deleted_at=datetime.now(timezone.utc) if deleted else None)
+        .returning(ItemModel.id)
+        .execution_options(synchronize_session=False)
     )
-    root_item_result = root_item_query.first()
-    if not root_item_result:
-        raise EntityNotFoundException()
-    del_items.append(combine_item_tables(root_item_result))
-    if root_item_result[0].type == 'folder':
-        children_result = get_item_children(root_item_result[0])
-        for child in children_result:
-            del_items.append(combine_item_tables(child))
-            for row in child:
-                db.session.delete(row)
-    for row in root_item_result:
-        db.session.delete(row)
-    db.session.commit()
-    for item in del_items:
-        item['to_delete'] = True
-        if kafka_client:
-            kafka_client.send(item)
-    api_response.total = 0
+    marked_ids = set((await db.execute(mark_query)).scalars().all())
+    missing_ids = [str(id_) for id_ in ids if id_ not in marked_ids]
+    if missing_ids:
+        await db.rollback()
+        raise EntityNotFoundException(f'Items do not exist: {", ".join(missing_ids)}')
+    await db.commit()
 
 
-def mark_delete_item_by_id(id_: UUID, username: str):
-    item_query = db.session.query(ItemModel).filter(ItemModel.id == id_)
-    item_result = item_query.first()
-    if not item_result:
-        raise EntityNotFoundException()
-    item_result.deleted = True
-    item_result.deleted_by = username
-    item_result.deleted_at = datetime.now(timezone.utc)
-    db.session.commit()
+async def mark_delete_item_by_id(db: AsyncSession, id_: UUID, username: str):
+    await set_items_deleted_mark(db, [id_], username)
 
 
-def mark_restore_item_by_id(id_: UUID):
-    item_query = db.session.query(ItemModel).filter(ItemModel.id == id_)
-    item_result = item_query.first()
-    if not item_result:
-        raise EntityNotFoundException()
-    item_result.deleted = False
-    item_result.deleted_by = None
-    item_result.deleted_at = None
-    db.session.commit()
+async def mark_restore_item_by_id(db: AsyncSession, id_: UUID):
+    await set_items_deleted_mark(db, [id_], None)
 
 
-def delete_items_by_ids(ids: list[UUID], kafka_client: KafkaProducerClient, api_response: APIResponse):
-    for id_ in ids:
-        delete_item_by_id(id_, kafka_client, api_response)
+async def empty_trash(db: AsyncSession, deleted_by: str, api_response: APIResponse):
+    """Permanently delete every item a user has marked as deleted, one committed chunk at a time.
 
+    Each chunk is re-selected so items that went with an earlier chunk's folder subtree are not looked up again.
+    """
+    deleted_count = 0
+    chunk_query = (
+        select(ItemModel.id)
+        .where(ItemModel.deleted_by == deleted_by, ItemModel.deleted.is_(True))
+        .order_by(ItemModel.deleted_at, ItemModel.id)
+        .limit(ConfigClass.EMPTY_TRASH_CHUNK_SIZE)
+    )
+    while True:
+        ids = (await db.execute(chunk_query)).scalars().all()
+        chunk_count = await delete_items_by_ids(db, ids, api_response) if ids else 0
+        if not chunk_count:
+            break
+        deleted_count += chunk_count
+    api_response.total = deleted_count
+
+
+def get_children_filter(root: ItemModel) -> ColumnElement:
+    """Match every descendant of a folder, the set-based counterpart of get_item_children."""
+    path_column = ItemModel.restore_path if root.status == ItemStatus.ARCHIVED else ItemModel.parent_path
+    return and_(
+        ItemModel.container_code == root.container_code,
+        ItemModel.zone == root.zone,
+        ItemModel.status == root.status,
+        path_column.descendant_of(expression.cast(str(get_children_path_prefix(root)), LtreeType)),
+    )
 
-def bequeath_to_children(
-    id_: UUID, data: PUTItemsBequeath, kafka_client: KafkaProducerClient, api_response: APIResponse
-):
-    if not attributes_match_template(data.attributes, data.attribute_template_id):
-        raise BadRequestException('Attributes do not match attribute template')
-    root_item_query = (
-        db.session.query(ItemModel, StorageModel, ExtendedModel)
-        .join(StorageModel, ExtendedModel)
-        .filter(ItemModel.id == id_)
+
+def get_subtrees_filter(roots: list[ItemModel]) -> ColumnElement:
+    """Match the roots themselves and every descendant of the folders among them."""
+    conditions = [ItemModel.id.in_([root.id for root in roots])]
+    conditions.extend(get_children_filter(root) for root in roots if root.type == 'folder')
+    return or_(*conditions)
+
+
+async def delete_items_by_ids(
+    db: AsyncSession, ids: list[UUID], api_response: APIResponse, with_provenance: bool = False
+) -> int:
+    """Permanently delete items, and the subtrees of folders among them, in a single transaction.
+
+    The whole set is resolved in one query, dependent rows and items are removed with set-based DELETEs and every
+    to_delete event is staged in the outbox together with them. Provenance is kept as history unless with_provenance
+    is set. Returns the number of items deleted.
+    """
+    ids = list(dict.fromkeys(ids))
+    roots = {}
+    for chunk in split_into_chunks(ids, ConfigClass.BULK_INSERT_CHUNK_SIZE):
+        roots.update(
+            {item.id: item for item in (await db.execute(select(ItemModel).where(ItemModel.id.in_(chunk)))).scalars()}
+        )
+    missing_ids = [str(id_) for id_ in ids if id_ not in roots]
+    if missing_ids:
+        raise EntityNotFoundException(f'Items do not exist: {", ".join(missing_ids)}')
+
+    item_query = (
+        select_item_rows()
+        .join(StorageModel)
+        .join(ExtendedModel)
+        .where(get_subtrees_filter(list(roots.values())))
+        .order_by(func.nlevel(ItemModel.parent_path).nullsfirst(), ItemModel.id)
     )
-    root_item_result = root_item_query.first()
-    if not root_item_result:
+    item_rows = (await db.execute(item_query)).all()
+    del_items = []
+    for row in item_rows:
+        item = combine_item_row(row)
+        item['to_delete'] = True
+        del_items.append(item)
+
+    dependent_columns = (
+        StorageModel.item_id,
+        ExtendedModel.item_id,
+        FavouritesModel.item_id,
+        ItemsCollectionsModel.item_id,
+    )
+    if with_provenance:
+        dependent_columns += (ProvenanceModel.item_id,)
+    for chunk in split_into_chunks([row.id for row in item_rows], ConfigClass.BULK_INSERT_CHUNK_SIZE):
+        for column in dependent_columns:
+            await db.execute(
+                delete(column.class_).where(column.in_(chunk)).execution_options(synchronize_session=False)
+            )
+        await db.execute(delete(ItemModel).where(ItemModel.id.in_(chunk)).execution_options(synchronize_session=False))
+    add_item_events(db, del_items)
+    await db.commit()
+    api_response.total = 0
+    return len(del_items)
+
+
+def get_bequeathed_extra(data: PUTItemsBequeath) -> ColumnElement | None:
+    """Build the jsonb_set expression writing the bequeathed properties into extended.extra, if there are any."""
+    extra = ExtendedModel.extra
+    if data.attribute_template_id and data.attributes:
+        attributes = {str(data.attribute_template_id): data.attributes}
+        extra = func.jsonb_set(extra, literal(['attributes'], ARRAY(Text)), literal(attributes, JSONB))
+    if data.system_tags:
+        extra = func.jsonb_set(extra, literal(['system_tags'], ARRAY(Text)), literal(data.system_tags, JSONB))
+    return None if extra is ExtendedModel.extra else extra
+
+
+async def bequeath_to_children(db: AsyncSession, id_: UUID, data: PUTItemsBequeath, api_response: APIResponse):
+    """Write a folder's properties into the extended rows of all its descendants with a single UPDATE.
+
+    The updated children are read back as column rows rather than ORM entities to build the response and their events.
+    """
+    await validate_item_attributes(db, data.attributes, data.attribute_template_id)
+    root_item = (await db.execute(select(ItemModel).where(ItemModel.id == id_))).scalar()
+    if not root_item:
         raise EntityNotFoundException()
-    if root_item_result[0].type != 'folder':
+    if root_item.type != 'folder':
         raise BadRequestException('Properties can only be bequeathed from folders')
-    children_result = get_item_children(root_item_result[0])
-    results = []
-    for child in children_result:
-        extra = dict(child[2].extra)
-        if data.attribute_template_id and data.attributes:
-            extra['attributes'] = {str(data.attribute_template_id): data.attributes} if data.attributes else {}
-        if data.system_tags:
-            extra['system_tags'] = data.system_tags
-        child[2].extra = extra
-    db.session.commit()
-    for child in children_result:
-        db.session.refresh(child[2])
-        combined_item = combine_item_tables(child)
-        results.append(combined_item)
-        if kafka_client:
-            kafka_client.send(combined_item)
+    children_filter = get_children_filter(root_item)
+    extra = get_bequeathed_extra(data)
+    if extra is not None:
+        await db.execute(
+            update(ExtendedModel)
+            .where(ExtendedModel.item_id == ItemModel.id, children_filter)
+            .values(extra=extra)
+            .execution_options(synchronize_session=False)
+        )
+    path_column = ItemModel.restore_path if root_item.status == ItemStatus.ARCHIVED else ItemModel.parent_path
+    children_query = (
+        select_item_rows()
+        .join(StorageModel)
+        .join(ExtendedModel)
+        .where(children_filter)
+        .order_by(func.nlevel(path_column), ItemModel.type, ItemModel.name)
+    )
+    results = [combine_item_row(row) for row in (await db.execute(children_query)).all()]
+    add_item_events(db, results)
+    await db.commit()
     api_response.result = results
     api_response.total = len(results)
@@ -4,26 +4,39 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
-from operator import or_
+import uuid
 from uuid import UUID
 
-from fastapi_sqlalchemy import db
-from sqlalchemy_utils import Ltree
+from sqlalchemy import Integer
+from sqlalchemy import func
+from sqlalchemy import insert
+from sqlalchemy import literal
+from sqlalchemy import literal_column
+from sqlalchemy import or_
+from sqlalchemy import select
+from sqlalchemy import union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.expression import CTE
 
-from app.models.models_items import ContainerType
-from app.models.models_items import ItemStatus
+from app.app_utils import split_into_chunks
+from app.config import ConfigClass
 from app.models.models_items import ItemType
-from app.models.models_lineage_provenance import TransformationType
+from app.models.models_lineage_provenance import LineageDirection
 from app.models.sql_lineage import LineageModel
 from app.models.sql_provenance import ProvenanceModel
 from app.routers.router_exceptions import EntityNotFoundException
 
 
-def get_lineage_by_item_id(item_id: UUID) -> list[LineageModel]:
-    lineage_query = db.session.query(LineageModel).filter(
-        or_(LineageModel.consumes.any(item_id), LineageModel.produces.any(item_id))
-    )
-    lineage_query_results = lineage_query.all()
+def touches_items(item_ids: list[UUID]):
+    """Match transformations consuming or producing any of the items with GIN-indexable array operators."""
+    if len(item_ids) == 1:
+        return or_(LineageModel.consumes.contains(item_ids), LineageModel.produces.contains(item_ids))
+    return or_(LineageModel.consumes.overlap(item_ids), LineageModel.produces.overlap(item_ids))
+
+
+async def get_lineage_by_item_id(db: AsyncSession, item_id: UUID) -> list[LineageModel]:
+    lineage_query = select(LineageModel).where(touches_items([item_id]))
+    lineage_query_results = (await db.execute(lineage_query)).scalars().all()
     if not lineage_query_results:
         raise EntityNotFoundException()
     item_lineage = []
@@ -32,13 +45,11 @@ def get_lineage_by_item_id(item_id: UUID) -> list[LineageModel]:
     return item_lineage
 
 
-def get_provenance_snapshots_by_item_id(item_id: UUID) -> list[ProvenanceModel]:
+async def get_provenance_snapshots_by_item_id(db: AsyncSession, item_id: UUID) -> list[ProvenanceModel]:
     provenance_query = (
-        db.session.query(ProvenanceModel)
-        .filter(ProvenanceModel.item_id == item_id)
-        .order_by(ProvenanceModel.snapshot_time)
+        select(ProvenanceModel).where(ProvenanceModel.item_id == item_id).order_by(ProvenanceModel.snapshot_time)
     )
-    provenance_query_results = provenance_query.all()
+    provenance_query_results = (await db.execute(provenance_query)).scalars().all()
     if not provenance_query_results:
         raise EntityNotFoundException()
     provenance_snapshots = []
@@ -47,70 +58,151 @@ def get_provenance_snapshots_by_item_id(item_id: UUID) -> list[ProvenanceModel]:
     return provenance_snapshots
 
 
-def get_lineage_provenance_by_item_id(item_id: UUID) -> dict:
+def add_lineage_provenance_to_response(response: dict, lineage: LineageModel, provenance: ProvenanceModel) -> None:
+    response['lineage'][str(lineage.id)] = {
+        'tfrm_type': str(lineage.tfrm_type),
+        'consumes': [str(item_id) for item_id in lineage.consumes] if lineage.consumes else None,
+        'produces': [str(item_id) for item_id in lineage.produces] if lineage.produces else None,
+    }
+    provenance_response = provenance.to_dict()
+    provenance_response.pop('item_id')
+    response['provenance'][str(provenance.item_id)] = provenance_response
+
+
+async def get_lineage_provenance_by_item_id(db: AsyncSession, item_id: UUID) -> dict:
     lineage_provenance_query = (
-        db.session.query(LineageModel, ProvenanceModel)
-        .join(ProvenanceModel)
-        .filter(or_(LineageModel.consumes.any(item_id), LineageModel.produces.any(item_id)))
+        select(LineageModel, ProvenanceModel).join(ProvenanceModel).where(touches_items([item_id]))
     )
-    lineage_provenance_query_results = lineage_provenance_query.all()
+    lineage_provenance_query_results = (await db.execute(lineage_provenance_query)).all()
     if not lineage_provenance_query_results:
         raise EntityNotFoundException()
 
     response = {'lineage': {}, 'provenance': {}}
-    for lineage_provenance_result in lineage_provenance_query_results:
-        lineage = lineage_provenance_result[0]
-        provenance = lineage_provenance_result[1]
-        response['lineage'][str(lineage.id)] = {
-            'tfrm_type': str(lineage.tfrm_type),
-            'consumes': [str(item_id) for item_id in lineage.consumes] if lineage.consumes else None,
-            'produces': [str(item_id) for item_id in lineage.produces] if lineage.produces else None,
-        }
-        provenance_response = provenance.to_dict()
-        provenance_response.pop('item_id')
-        response['provenance'][str(provenance.item_id)] = provenance_response
+    for lineage, provenance in lineage_provenance_query_results:
+        add_lineage_provenance_to_response(response, lineage, provenance)
+    return response
+
+
+async def get_lineage_provenance_by_item_ids(db: AsyncSession, item_ids: list[UUID]) -> dict:
+    """Return lineage and provenance for many items keyed by item id, fetched with a single query.
+
+    Items without any recorded transformation are left out of the result.
+    """
+    requested_ids = set(item_ids)
+    lineage_provenance_query = (
+        select(LineageModel, ProvenanceModel).join(ProvenanceModel).where(touches_items(list(requested_ids)))
+    )
+    lineage_provenance_query_results = (await db.execute(lineage_provenance_query)).all()
+
+    response = {}
+    for lineage, provenance in lineage_provenance_query_results:
+        for item_id in requested_ids.intersection((lineage.consumes or []) + (lineage.produces or [])):
+            item_response = response.setdefault(str(item_id), {'lineage': {}, 'provenance': {}})
+            add_lineage_provenance_to_response(item_response, lineage, provenance)
     return response
 
 
-def create_lineage(consumes: list[UUID], produces: list[UUID], tfrm_type: TransformationType) -> UUID:
-    lineage_model_data = {'consumes': consumes, 'produces': produces, 'tfrm_type': tfrm_type}
-    lineage = LineageModel(**lineage_model_data)
-    db.session.add(lineage)
-    db.session.commit()
-    db.session.refresh(lineage)
-    return lineage.id
-
-
-def create_provenance(
-    lineage_id: UUID,
-    item_id: UUID,
-    parent: UUID,
-    parent_path: Ltree,
-    status: ItemStatus,
-    type_: ItemType,
-    zone: int,
-    name: str,
-    size: int,
-    owner: str,
-    container_code: str,
-    container_type: ContainerType,
-) -> None:
-    if type_ == ItemType.FILE:
-        provenance_model_data = {
-            'lineage_id': lineage_id,
-            'item_id': item_id,
-            'parent': parent if parent else None,
-            'parent_path': parent_path,
-            'status': status,
-            'type_': type_,
-            'zone': zone,
-            'name': name,
-            'size': size,
-            'owner': owner,
-            'container_code': container_code,
-            'container_type': container_type,
+def lineage_traversal_cte(item_id: UUID, depth: int, direction: LineageDirection) -> CTE:
+    """Recursively collect transformations reachable from an item in one direction, up to depth hops away.
+
+    Each step follows transformations whose inputs (downstream) or outputs (upstream) overlap the items reached by the
+    previous step, so the frontier of a row is the set of items it hands on to the next hop.
+    """
+    if direction == LineageDirection.DOWNSTREAM:
+        source, target = LineageModel.consumes, LineageModel.produces
+    else:
+        source, target = LineageModel.produces, LineageModel.consumes
+    anchor = select(
+        LineageModel.id.label('lineage_id'), literal_column('1', Integer).label('depth'), target.label('frontier')
+    ).where(source.contains([item_id]))
+    traversal = anchor.cte(f'{direction.value}_lineage', recursive=True)
+    step = (
+        select(LineageModel.id, traversal.c.depth + 1, target)
+        .join(traversal, source.overlap(traversal.c.frontier))
+        .where(traversal.c.depth < depth)
+    )
+    return traversal.union(step)
+
+
+async def get_lineage_graph_by_item_id(
+    db: AsyncSession, item_id: UUID, depth: int, direction: LineageDirection
+) -> dict:
+    """Return the lineage graph around an item as nodes with provenance snapshots and transformation edges."""
+    directions = [LineageDirection.UPSTREAM, LineageDirection.DOWNSTREAM]
+    if direction != LineageDirection.BOTH:
+        directions = [direction]
+    traversals = []
+    for traversal_direction in directions:
+        traversal = lineage_traversal_cte(item_id, depth, traversal_direction)
+        traversals.append(
+            select(traversal.c.lineage_id, traversal.c.depth, literal(traversal_direction.value).label('direction'))
+        )
+    steps = union_all(*traversals).subquery()
+    edges = (
+        select(steps.c.lineage_id, steps.c.direction, func.min(steps.c.depth).label('depth'))
+        .group_by(steps.c.lineage_id, steps.c.direction)
+        .subquery()
+    )
+    graph_query = (
+        select(LineageModel, edges.c.direction, edges.c.depth, ProvenanceModel)
+        .join(edges, LineageModel.id == edges.c.lineage_id)
+        .outerjoin(ProvenanceModel, ProvenanceModel.lineage_id == LineageModel.id)
+        .order_by(edges.c.depth, LineageModel.id)
+    )
+    graph_query_results = (await db.execute(graph_query)).all()
+    if not graph_query_results:
+        raise EntityNotFoundException()
+
+    nodes = {str(item_id): {'id': str(item_id), 'provenance': []}}
+    edge_responses = {}
+    for lineage, edge_direction, edge_depth, provenance in graph_query_results:
+        edge_key = (lineage.id, edge_direction)
+        if edge_key not in edge_responses:
+            edge_responses[edge_key] = {
+                'id': str(lineage.id),
+                'tfrm_type': str(lineage.tfrm_type),
+                'consumes': [str(node_id) for node_id in lineage.consumes] if lineage.consumes else None,
+                'produces': [str(node_id) for node_id in lineage.produces] if lineage.produces else None,
+                'direction': edge_direction,
+                'depth': edge_depth,
+            }
+            for node_id in (lineage.consumes or []) + (lineage.produces or []):
+                nodes.setdefault(str(node_id), {'id': str(node_id), 'provenance': []})
+        if provenance:
+            provenance_response = provenance.to_dict()
+            node_id = provenance_response.pop('item_id')
+            node = nodes.setdefault(node_id, {'id': node_id, 'provenance': []})
+            if provenance_response not in node['provenance']:
+                node['provenance'].append(provenance_response)
+    return {'nodes': list(nodes.values()), 'edges': list(edge_responses.values())}
+
+
+async def create_lineages(db: AsyncSession, lineages: list[dict]) -> None:
+    """Insert many lineage rows with multi-row inserts, leaving the commit to the caller."""
+    for chunk in split_into_chunks(lineages, ConfigClass.BULK_INSERT_CHUNK_SIZE):
+        await db.execute(insert(LineageModel).values(chunk))
+
+
+async def create_provenances(db: AsyncSession, snapshots: list[dict]) -> None:
+    """Insert provenance snapshots of many files with multi-row inserts, leaving the commit to the caller."""
+    provenance_rows = [
+        {
+            'id': uuid.uuid4(),
+            'lineage_id': snapshot['lineage_id'],
+            'item_id': snapshot['item_id'],
+            'parent': snapshot['parent'] if snapshot['parent'] else None,
+            'parent_path': snapshot['parent_path'],
+            'status': snapshot['status'],
+            'type': snapshot['type'],
+            'zone': snapshot['zone'],
+            'name': snapshot['name'],
+            'size': snapshot['size'],
+            'owner': snapshot['owner'],
+            'container_code': snapshot['container_code'],
+            'container_type': snapshot['container_type'],
         }
-        provenance = ProvenanceModel(**provenance_model_data)
-        db.session.add(provenance)
-        db.session.commit()
-        db.session.refresh(provenance)
+        for snapshot in snapshots
+        if snapshot['type'] == ItemType.FILE
+    ]
+    for chunk in split_into_chunks(provenance_rows, ConfigClass.BULK_INSERT_CHUNK_SIZE):
+        await db.execute(insert(ProvenanceModel).values(chunk))
@@ -0,0 +1,14 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.sql_outbox import OutboxModel
+
+
+def add_item_events(db: AsyncSession, items: list[dict]) -> None:
+    """Stage item events in the outbox so they are committed in the same transaction as the item changes."""
+    db.add_all([OutboxModel(item_id=item['id'], payload=item) for item in items])
@@ -4,19 +4,54 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+import hashlib
+import time
+from typing import Any
+
 from common import JWTHandler
 from fastapi import Request
+from jwt.algorithms import RSAAlgorithm
 
+from app.cache import TTLCache
 from app.config import ConfigClass
+from app.logger import logger
 from app.routers.router_exceptions import UnauthorizedException
 
+identity_cache = TTLCache('identities', ConfigClass.IDENTITY_CACHE_SIZE, ConfigClass.IDENTITY_CACHE_TTL)
+
+
+def load_public_key(public_key: str) -> Any:
+    """Parse the PEM public key once so token validation does not re-parse it on every request."""
+    if not public_key:
+        return public_key
+    try:
+        return RSAAlgorithm(RSAAlgorithm.SHA256).prepare_key(public_key)
+    except Exception:
+        logger.warning('Unable to parse RSA public key, tokens will be validated against the raw key')
+        return public_key
+
+
+jwt_handler = JWTHandler(load_public_key(ConfigClass.RSA_PUBLIC_KEY))
+
+
+def cache_identity(token_hash: str, decoded_token: dict, current_identity: dict | None) -> None:
+    """Remember a validated identity until the token expires, capped at IDENTITY_CACHE_TTL."""
+    if not current_identity or not isinstance(decoded_token, dict) or 'exp' not in decoded_token:
+        return
+    ttl = min(ConfigClass.IDENTITY_CACHE_TTL, decoded_token['exp'] - time.time())
+    if ttl > 0:
+        identity_cache.set(token_hash, current_identity, ttl)
+
 
 async def jwt_required(request: Request):
-    jwt_handler = JWTHandler(ConfigClass.RSA_PUBLIC_KEY)
     try:
         encoded_token = jwt_handler.get_token(request)
-        decoded_token = jwt_handler.decode_validate_token(encoded_token)
-        current_identity = await jwt_handler.get_current_identity(ConfigClass.AUTH_HOST, decoded_token)
+        token_hash = hashlib.sha256(encoded_token.encode('utf-8')).hexdigest()
+        current_identity = identity_cache.get(token_hash)
+        if current_identity is None:
+            decoded_token = jwt_handler.decode_validate_token(encoded_token)
+            current_identity = await jwt_handler.get_current_identity(ConfigClass.AUTH_HOST, decoded_token)
+            cache_identity(token_hash, decoded_token, current_identity)
     except Exception:
         raise UnauthorizedException()
     return current_identity
@@ -4,7 +4,6 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
-from common import has_permission
 from sqlalchemy import or_
 from sqlalchemy.orm.query import Query
 from sqlalchemy.sql import expression
@@ -15,6 +14,7 @@ from app.config import ConfigClass
 from app.models.models_items import GETItemsByLocation
 from app.models.models_items import ItemStatus
 from app.models.sql_items import ItemModel
+from app.permissions import get_file_view_permissions
 
 
 async def search_permissions_filter(
@@ -32,45 +32,23 @@ async def search_permissions_filter(
         item_location_for_permissions = ItemModel.parent_path
     search_auth_user = encode_label_for_ltree(current_identity['username']) + '.*'
 
-    project_code = params.container_code
-    if not await has_permission(ConfigClass.AUTH_SERVICE, project_code, 'file_any', 'core', 'view', current_identity):
-        if not await has_permission(
-            ConfigClass.AUTH_SERVICE, project_code, 'file_in_own_namefolder', 'core', 'view', current_identity
-        ):
-            item_query = item_query.filter(ItemModel.zone != ConfigClass.CORE_ZONE_VALUE)
+    zone_values = {'core': ConfigClass.CORE_ZONE_VALUE, 'greenroom': ConfigClass.GREENROOM_ZONE_VALUE}
+    permissions = await get_file_view_permissions(params.container_code, current_identity, list(zone_values))
+    for zone, resource in permissions.items():
+        zone_value = zone_values[zone]
+        if resource == 'file_any':
+            continue
+        if not resource:
+            item_query = item_query.filter(ItemModel.zone != zone_value)
+        elif searching_for_namefolders:
+            item_query = item_query.filter(
+                or_(ItemModel.zone != zone_value, ItemModel.name == current_identity['username'])
+            )
         else:
-            if searching_for_namefolders:
-                item_query = item_query.filter(
-                    or_(ItemModel.zone != ConfigClass.CORE_ZONE_VALUE, ItemModel.name == current_identity['username'])
-                )
-            else:
-                item_query = item_query.filter(
-                    or_(
-                        ItemModel.zone != ConfigClass.CORE_ZONE_VALUE,
-                        item_location_for_permissions.lquery(expression.cast(search_auth_user, LQUERY)),
-                    )
-                )
-
-    if not await has_permission(
-        ConfigClass.AUTH_SERVICE, project_code, 'file_any', 'greenroom', 'view', current_identity
-    ):
-        if not await has_permission(
-            ConfigClass.AUTH_SERVICE, project_code, 'file_in_own_namefolder', 'greenroom', 'view', current_identity
-        ):
-            item_query = item_query.filter(ItemModel.zone != ConfigClass.GREENROOM_ZONE_VALUE)
-        else:
-            if searching_for_namefolders:
-                item_query = item_query.filter(
-                    or_(
-                        ItemModel.zone != ConfigClass.GREENROOM_ZONE_VALUE,
-                        ItemModel.name == current_identity['username'],
-                    )
-                )
-            else:
-                item_query = item_query.filter(
-                    or_(
-                        ItemModel.zone != ConfigClass.GREENROOM_ZONE_VALUE,
-                        item_location_for_permissions.lquery(expression.cast(search_auth_user, LQUERY)),
-                    )
+            item_query = item_query.filter(
+                or_(
+                    ItemModel.zone != zone_value,
+                    item_location_for_permissions.lquery(expression.cast(search_auth_user, LQUERY)),
                 )
+            )
     return item_query
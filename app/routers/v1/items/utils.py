@@ -4,54 +4,142 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
-from sqlalchemy_utils import Ltree
+from operator import attrgetter
+from typing import Any
+from typing import Callable
+
+from sqlalchemy import select
+from sqlalchemy.engine import Row
+from sqlalchemy.sql import Select
 
 from app.app_utils import decode_path_from_ltree
-from app.app_utils import encode_path_for_ltree
-from app.models.models_items import ItemStatus
+from app.models.sql_extended import ExtendedModel
+from app.models.sql_favourites import FavouritesModel
 from app.models.sql_items import ItemModel
+from app.models.sql_storage import StorageModel
+from app.routers.router_exceptions import BadRequestException
+from app.routers.router_utils import Keyset
+
+
+def _optional_str(value: Any) -> str | None:
+    return str(value) if value else None
+
+
+def _optional_path(value: Any) -> str | None:
+    return decode_path_from_ltree(value) if value else None
+
+
+def _storage_data(row: Row) -> dict:
+    return {
+        'id': str(row.storage_id),
+        'location_uri': row.location_uri,
+        'version': row.version,
+        'upload_id': row.upload_id,
+    }
+
+
+def _extended_data(row: Row) -> dict:
+    return {'id': str(row.extended_id), 'extra': row.extra}
+
+
+# Response field -> (columns it is built from, formatter); favourite is added separately since it depends on the caller.
+ITEM_FIELDS: dict[str, tuple[tuple, Callable[[Row], Any]]] = {
+    'id': ((ItemModel.id,), lambda row: str(row.id)),
+    'parent': ((ItemModel.parent,), lambda row: _optional_str(row.parent)),
+    'parent_path': ((ItemModel.parent_path,), lambda row: _optional_path(row.parent_path)),
+    'restore_path': ((ItemModel.restore_path,), lambda row: _optional_path(row.restore_path)),
+    'status': ((ItemModel.status,), lambda row: str(row.status)),
+    'type': ((ItemModel.type,), attrgetter('type')),
+    'zone': ((ItemModel.zone,), attrgetter('zone')),
+    'name': ((ItemModel.name,), attrgetter('name')),
+    'size': ((ItemModel.size,), attrgetter('size')),
+    'owner': ((ItemModel.owner,), attrgetter('owner')),
+    'container_code': ((ItemModel.container_code,), attrgetter('container_code')),
+    'container_type': ((ItemModel.container_type,), attrgetter('container_type')),
+    'deleted': ((ItemModel.deleted,), attrgetter('deleted')),
+    'deleted_time': ((ItemModel.deleted_at,), lambda row: _optional_str(row.deleted_at)),
+    'created_time': ((ItemModel.created_time,), lambda row: str(row.created_time)),
+    'last_updated_time': ((ItemModel.last_updated_time,), lambda row: str(row.last_updated_time)),
+    'storage': (
+        (
+            StorageModel.id.label('storage_id'),
+            StorageModel.location_uri,
+            StorageModel.version,
+            StorageModel.upload_id,
+        ),
+        _storage_data,
+    ),
+    'extended': ((ExtendedModel.id.label('extended_id'), ExtendedModel.extra), _extended_data),
+}
+ITEM_FIELD_NAMES = frozenset(ITEM_FIELDS) | {'favourite'}
+
+
+def parse_item_fields(fields: str | None) -> list[str] | None:
+    """Turn a comma separated fields parameter into response field names, always starting with id.
+
+    None means the full item.
+    """
+    if not fields:
+        return None
+    names = [name.strip() for name in fields.split(',') if name.strip()]
+    invalid = [name for name in names if name not in ITEM_FIELD_NAMES]
+    if invalid:
+        raise BadRequestException(f'Invalid fields: {", ".join(invalid)}')
+    return ['id'] + [name for name in dict.fromkeys(names) if name != 'id']
 
 
 def combine_item_tables(item_result: tuple, args: dict = None) -> dict:
+    """Build one response row from an (item, storage, extended[, favourite]) result row.
+
+    The storage and extended parts are read straight off the entities instead of going through their to_dict()
+    and dropping item_id again, since this runs once per row of every listing.
+    """
+    storage = item_result[1]
+    extended = item_result[2]
     item_data = item_result[0].to_dict()
-    storage_data = item_result[1].to_dict()
-    storage_data.pop('item_id')
-    extended_data = item_result[2].to_dict()
-    extended_data.pop('item_id')
-    item_data['storage'] = storage_data
-    item_data['extended'] = extended_data
-    item_data['favourite'] = False
-    if args and args.get('fav_user'):
-        if len(item_result) == 4 and item_result[3] and item_result[3].user == args['fav_user']:
-            item_data['favourite'] = True
+    item_data['storage'] = {
+        'id': str(storage.id),
+        'location_uri': storage.location_uri,
+        'version': storage.version,
+        'upload_id': storage.upload_id,
+    }
+    item_data['extended'] = {'id': str(extended.id), 'extra': extended.extra}
+    fav_user = args.get('fav_user') if args else None
+    item_data['favourite'] = bool(
+        fav_user and len(item_result) == 4 and item_result[3] and item_result[3].user == fav_user
+    )
     return item_data
 
 
-def combine_collection_tables(collection_result: tuple, args: dict = None) -> dict:
-    collection_data = collection_result[0].to_dict()
-    collection_data['favourite'] = True if len(collection_result) == 2 and collection_result[1] else False
-    return collection_data
-
+def select_item_rows(fields: list[str] | None = None, favourites: bool = False, keyset: Keyset | None = None) -> Select:
+    """Select the columns of an item response as plain row tuples, without hydrating ORM entities.
 
-def get_path_depth(item: ItemModel) -> int:
-    return len(decode_path_from_ltree(item.parent_path).split('/'))
+    Rows are meant for combine_item_row with the same fields. Only the columns behind the requested fields are read,
+    plus any keyset column the cursor has to be taken from; favourites adds the favouriting user, to be outer joined by
+    the caller.
+    """
+    columns = [column for name in fields or ITEM_FIELDS if name in ITEM_FIELDS for column in ITEM_FIELDS[name][0]]
+    selected = {column.key for column in columns}
+    for column, _ in keyset or []:
+        if column.key not in selected:
+            columns.append(column)
+            selected.add(column.key)
+    if favourites and (not fields or 'favourite' in fields):
+        columns.append(FavouritesModel.user.label('favourite_user'))
+    return select(*columns)
 
 
-def get_relative_path_depth(parent: ItemModel, child: ItemModel) -> int:
-    return get_path_depth(child) - get_path_depth(parent)
+def combine_item_row(row: Row, args: dict = None) -> dict:
+    """Build one response row from a select_item_rows result; without fields it matches combine_item_tables."""
+    fields = args.get('fields') if args else None
+    item_data = {name: ITEM_FIELDS[name][1](row) for name in fields or ITEM_FIELDS if name in ITEM_FIELDS}
+    if not fields or 'favourite' in fields:
+        fav_user = args.get('fav_user') if args else None
+        item_data['favourite'] = bool(fav_user and 'favourite_user' in row._fields and row.favourite_user == fav_user)
+    return item_data
 
 
-def rename_folder_in_path(renamed_folder: ItemModel, item_to_repath: ItemModel, status: ItemStatus = ItemStatus.ACTIVE):
-    decoded_parent_path = (
-        decode_path_from_ltree(item_to_repath.restore_path)
-        if status == ItemStatus.ARCHIVED
-        else decode_path_from_ltree(item_to_repath.parent_path)
-    )
-    root_item_depth = get_path_depth(renamed_folder)
-    labels = decoded_parent_path.split('/')
-    labels[root_item_depth] = renamed_folder.name
-    new_parent_path = '/'.join(labels)
-    if status == ItemStatus.ARCHIVED:
-        item_to_repath.restore_path = Ltree(encode_path_for_ltree(new_parent_path))
-    else:
-        item_to_repath.parent_path = Ltree(encode_path_for_ltree(new_parent_path))
+def combine_collection_tables(collection_result: tuple, args: dict = None) -> dict:
+    collection_data = collection_result[0].to_dict()
+    collection_data['favourite'] = True if len(collection_result) == 2 and collection_result[1] else False
+    return collection_data
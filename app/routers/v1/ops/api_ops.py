@@ -0,0 +1,63 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from fastapi import APIRouter
+from fastapi import Depends
+from fastapi import Query
+from fastapi.responses import JSONResponse
+from fastapi_utils.cbv import cbv
+
+from app.cache import caches
+from app.models.base_models import APIResponse
+from app.models.base_models import EAPIResponseCode
+from app.permissions import invalidate_permissions
+from app.routers.router_exceptions import UnauthorizedException
+from app.routers.router_utils import set_api_response_error
+from app.routers.v1.items.dependencies import jwt_required
+
+router = APIRouter()
+
+
+def check_platform_admin(current_identity: dict) -> None:
+    if current_identity.get('role') != 'admin':
+        raise UnauthorizedException(f'{current_identity.get("username")} is not a platform admin')
+
+
+@cbv(router)
+class APIOps:
+    """Internal endpoints for operating the service, restricted to platform admins.
+
+    The caches live in the memory of each worker process, so these endpoints only report on and clear the process
+    that serves the request. To invalidate across a deployment, call them on every replica or wait for the cache TTL.
+    """
+
+    current_identity: dict = Depends(jwt_required)
+
+    @router.get('/caches', summary='Get hit and miss counters of the in-process caches.')
+    async def get_cache_metrics(self) -> JSONResponse:
+        try:
+            api_response = APIResponse()
+            check_platform_admin(self.current_identity)
+            api_response.result = {name: cache.metrics() for name, cache in caches.items()}
+        except UnauthorizedException as e:
+            set_api_response_error(api_response, str(e), EAPIResponseCode.forbidden)
+        return api_response.json_response()
+
+    @router.delete('/caches/permissions', summary='Drop cached permission decisions after a role change.')
+    async def invalidate_permission_cache(
+        self, username: str | None = Query(None), project_code: str | None = Query(None)
+    ) -> JSONResponse:
+        """Drop the cached decisions of a user, a project or both; without parameters the whole cache is cleared.
+
+        Only the permission cache of the process serving the request is cleared.
+        """
+        try:
+            api_response = APIResponse()
+            check_platform_admin(self.current_identity)
+            invalidate_permissions(username=username, project_code=project_code)
+        except UnauthorizedException as e:
+            set_api_response_error(api_response, str(e), EAPIResponseCode.forbidden)
+        return api_response.json_response()
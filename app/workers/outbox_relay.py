@@ -0,0 +1,218 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+from collections.abc import Callable
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+from kafka.errors import KafkaError
+from sqlalchemy import delete
+from sqlalchemy import insert
+from sqlalchemy import or_
+from sqlalchemy import select
+from sqlalchemy import update
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.clients.kafka_client import KafkaProducerClient
+from app.clients.kafka_client import SerializationError
+from app.config import ConfigClass
+from app.logger import logger
+from app.models.sql_outbox import OutboxDeadLetterModel
+from app.models.sql_outbox import OutboxModel
+
+
+class OutboxRelay:
+    """Background worker draining the items outbox to the metadata.items Kafka topic."""
+
+    def __init__(
+        self,
+        batch_size: int = ConfigClass.OUTBOX_RELAY_BATCH_SIZE,
+        poll_interval: float = ConfigClass.OUTBOX_RELAY_POLL_INTERVAL,
+        claim_timeout: float = ConfigClass.OUTBOX_RELAY_CLAIM_TIMEOUT,
+        retry_delay: float = ConfigClass.OUTBOX_RELAY_RETRY_DELAY,
+        max_attempts: int = ConfigClass.OUTBOX_RELAY_MAX_ATTEMPTS,
+    ) -> None:
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.claim_timeout = claim_timeout
+        self.retry_delay = retry_delay
+        self.max_attempts = max_attempts
+        self.task = None
+
+    async def claim_batch(self, engine: AsyncEngine) -> list[Row]:
+        """
+        Summary:
+            function for claiming the oldest batch of outbox events that are not in flight.
+            Rows are locked with SKIP LOCKED while they are marked, so several relays can drain the outbox concurrently,
+            and the claim is committed straight away so no transaction stays open while kafka is flushed.
+            Claims older than the claim timeout are taken over, which recovers events of a relay that died mid-batch.
+        Return:
+            claimed events in outbox order
+        """
+        claimed_time = datetime.now(timezone.utc)
+        claimable = (
+            select(OutboxModel.id)
+            .where(
+                or_(
+                    OutboxModel.claimed_time.is_(None),
+                    OutboxModel.claimed_time < claimed_time - timedelta(seconds=self.claim_timeout),
+                )
+            )
+            .order_by(OutboxModel.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        claim = (
+            update(OutboxModel)
+            .where(OutboxModel.id.in_(claimable))
+            .values(claimed_time=claimed_time)
+            .returning(
+                OutboxModel.id,
+                OutboxModel.item_id,
+                OutboxModel.payload,
+                OutboxModel.attempts,
+                OutboxModel.created_time,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        async with AsyncSession(bind=engine) as db:
+            events = (await db.execute(claim)).all()
+            await db.commit()
+        return sorted(events, key=lambda event: event.id)
+
+    async def complete_batch(
+        self, engine: AsyncEngine, processed: list[int], retried: list[int], failed: list[tuple[Row, Exception]]
+    ) -> None:
+        """
+        Summary:
+            function for removing the processed events from the outbox, scheduling a retry of the retried ones
+            and moving the failed ones to the dead letter table, all in one transaction.
+            A retried event keeps its claim backdated so that it becomes claimable again after the retry delay,
+            which lets the events queued behind it be relayed in the meantime.
+        """
+        async with AsyncSession(bind=engine) as db:
+            if failed:
+                failed_time = datetime.now(timezone.utc)
+                await db.execute(
+                    insert(OutboxDeadLetterModel).values(
+                        [
+                            {
+                                'id': event.id,
+                                'item_id': event.item_id,
+                                'payload': event.payload,
+                                'attempts': event.attempts + 1,
+                                'error': repr(error),
+                                'created_time': event.created_time,
+                                'failed_time': failed_time,
+                            }
+                            for event, error in failed
+                        ]
+                    )
+                )
+            removed = processed + [event.id for event, _ in failed]
+            if removed:
+                await db.execute(delete(OutboxModel).where(OutboxModel.id.in_(removed)))
+            if retried:
+                retried_time = datetime.now(timezone.utc) - timedelta(seconds=self.claim_timeout - self.retry_delay)
+                await db.execute(
+                    update(OutboxModel)
+                    .where(OutboxModel.id.in_(retried))
+                    .values(claimed_time=retried_time, attempts=OutboxModel.attempts + 1)
+                    .execution_options(synchronize_session=False)
+                )
+            await db.commit()
+
+    def is_terminal(self, event: Row, error: Exception) -> bool:
+        """
+        Summary:
+            function for checking whether a failed event should stop being retried.
+        Return:
+            True for payloads that cannot be serialized, kafka errors that are not retriable
+            and events that used up their attempts
+        """
+        if isinstance(error, SerializationError):
+            return True
+        if isinstance(error, KafkaError) and not error.retriable:
+            return True
+        return event.attempts + 1 >= self.max_attempts
+
+    async def relay_batch(self, engine: AsyncEngine, kafka_client: KafkaProducerClient) -> int:
+        """
+        Summary:
+            function for publishing the oldest batch of outbox events and removing the ones that were delivered.
+            Events failing with a terminal error are moved to the dead letter table, any other failure keeps
+            the event for a retry.
+        Return:
+            number of events removed from the outbox
+        """
+        events = await self.claim_batch(engine)
+        if not events:
+            return 0
+        try:
+            errors = await kafka_client.send_many([event.payload for event in events])
+        except Exception:
+            await self.complete_batch(engine, [], [event.id for event in events], [])
+            raise
+        processed = []
+        retried = []
+        failed = []
+        for event, error in zip(events, errors):
+            if not error:
+                processed.append(event.id)
+            elif self.is_terminal(event, error):
+                logger.error(
+                    f'Moving outbox event {event.id} for item {event.item_id} to the dead letter table: {error}'
+                )
+                failed.append((event, error))
+            else:
+                retried.append(event.id)
+        await self.complete_batch(engine, processed, retried, failed)
+        return len(processed)
+
+    async def run(self, engine: AsyncEngine, get_kafka_client: Callable[[], KafkaProducerClient]) -> None:
+        """
+        Summary:
+            function for draining the outbox until cancelled, waiting for the poll interval once it is empty.
+            The kafka client is resolved on every iteration so the relay recovers once the broker is reachable.
+        """
+        while True:
+            try:
+                relayed = await self.relay_batch(engine, get_kafka_client())
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception('Error relaying outbox events to Kafka')
+                relayed = 0
+            if relayed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    def start(self, engine: AsyncEngine, get_kafka_client: Callable[[], KafkaProducerClient]) -> None:
+        """
+        Summary:
+            function for starting the relay as a background task on the running event loop.
+        """
+        if not self.task:
+            self.task = asyncio.create_task(self.run(engine, get_kafka_client))
+
+    async def stop(self) -> None:
+        """
+        Summary:
+            function for cancelling the background task and waiting for it to finish.
+        """
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+
+outbox_relay = OutboxRelay()
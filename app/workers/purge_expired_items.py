@@ -0,0 +1,133 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+from common import configure_logging
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import ConfigClass
+from app.dependencies.db import get_db_engine
+from app.logger import logger
+from app.models.base_models import APIResponse
+from app.models.sql_items import ItemModel
+from app.routers.v1.items.crud_items import delete_items_by_ids
+
+
+class ExpiredItemsPurger:
+    """Background worker permanently deleting items that stayed in the trash longer than the retention period."""
+
+    def __init__(
+        self,
+        retention_days: int = ConfigClass.DELETED_ITEMS_RETENTION_DAYS,
+        batch_size: int = ConfigClass.PURGE_EXPIRED_ITEMS_BATCH_SIZE,
+        throttle: float = ConfigClass.PURGE_EXPIRED_ITEMS_THROTTLE,
+        interval: float = ConfigClass.PURGE_EXPIRED_ITEMS_INTERVAL,
+    ) -> None:
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self.throttle = throttle
+        self.interval = interval
+        self.task = None
+
+    async def purge_batch(self, engine: AsyncEngine) -> int:
+        """
+        Summary:
+            function for deleting the oldest batch of expired items together with their subtrees, storage, extended
+            and provenance rows, staging a to_delete event for each of them in the same transaction.
+            Rows are locked with SKIP LOCKED so several purgers, or a user emptying the trash, never wait on each other.
+        Return:
+            number of items deleted
+        """
+        expired_at = datetime.now(timezone.utc) - timedelta(days=self.retention_days)
+        query = (
+            select(ItemModel.id)
+            .where(ItemModel.deleted.is_(True), ItemModel.deleted_at < expired_at)
+            .order_by(ItemModel.deleted_at, ItemModel.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        async with AsyncSession(bind=engine, expire_on_commit=False) as db:
+            ids = (await db.execute(query)).scalars().all()
+            if not ids:
+                await db.rollback()
+                return 0
+            return await delete_items_by_ids(db, ids, APIResponse(), with_provenance=True)
+
+    async def purge(self, engine: AsyncEngine) -> int:
+        """
+        Summary:
+            function for purging every expired item, pausing for the throttle delay between batches so that
+            the deletes do not starve foreground queries.
+        Return:
+            number of items deleted
+        """
+        total = 0
+        while True:
+            purged = await self.purge_batch(engine)
+            total += purged
+            if not purged:
+                return total
+            logger.info(f'Purged {purged} expired items')
+            await asyncio.sleep(self.throttle)
+
+    async def run(self, engine: AsyncEngine) -> None:
+        """
+        Summary:
+            function for purging expired items until cancelled, waiting for the interval between runs.
+        """
+        while True:
+            try:
+                await self.purge(engine)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception('Error purging expired items')
+            await asyncio.sleep(self.interval)
+
+    def start(self, engine: AsyncEngine) -> None:
+        """
+        Summary:
+            function for starting the purger as a background task on the running event loop.
+        """
+        if not self.task:
+            self.task = asyncio.create_task(self.run(engine))
+
+    async def stop(self) -> None:
+        """
+        Summary:
+            function for cancelling the background task and waiting for it to finish.
+        """
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+
+expired_items_purger = ExpiredItemsPurger()
+
+
+async def main() -> None:
+    """Purge every expired item once, for running from cron or a scheduled job instead of inside the service."""
+
+    configure_logging(ConfigClass.LOGGING_LEVEL, ConfigClass.LOGGING_FORMAT)
+    try:
+        total = await expired_items_purger.purge(await get_db_engine())
+        logger.info(f'Purged {total} expired items in total')
+    finally:
+        await get_db_engine.dispose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,147 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+"""Compare building an item listing payload through pydantic dict() and stdlib json with the orjson path.
+
+Run with ``python -m benchmarks.item_serialization [rows]``; the default of 1000 rows matches a full result page.
+"""
+
+import random
+import sys
+import timeit
+from collections import namedtuple
+from datetime import datetime
+from datetime import timezone
+from uuid import uuid4
+
+from sqlalchemy.orm import configure_mappers
+
+from app.app_utils import encode_path_for_ltree
+from app.models.models_items import GETItemResponse
+from app.models.sql_extended import ExtendedModel
+from app.models.sql_items import ItemModel
+from app.models.sql_storage import StorageModel
+from app.routers.v1.items.utils import combine_item_row
+from app.routers.v1.items.utils import combine_item_tables
+from app.routers.v1.items.utils import parse_item_fields
+from app.routers.v1.items.utils import select_item_rows
+
+BROWSER_FIELDS = 'name,type,size,last_updated_time'
+
+
+def legacy_combine_item_tables(item_result: tuple, args: dict = None) -> dict:
+    item_data = item_result[0].to_dict()
+    storage_data = item_result[1].to_dict()
+    storage_data.pop('item_id')
+    extended_data = item_result[2].to_dict()
+    extended_data.pop('item_id')
+    item_data['storage'] = storage_data
+    item_data['extended'] = extended_data
+    item_data['favourite'] = False
+    if args and args.get('fav_user'):
+        if len(item_result) == 4 and item_result[3] and item_result[3].user == args['fav_user']:
+            item_data['favourite'] = True
+    return item_data
+
+
+def generate_page(rows: int) -> list[tuple]:
+    """Result rows of one search page: files in a few nested folders with template attributes and tags."""
+    random.seed(0)
+    configure_mappers()
+    now = datetime.now(tz=timezone.utc)
+    page = []
+    for index in range(rows):
+        item_id = uuid4()
+        folders = '/'.join(['admin'] + [f'folder_{random.randint(0, 20)}' for _ in range(random.randint(1, 4))])
+        item = ItemModel(
+            item_id,
+            uuid4(),
+            encode_path_for_ltree(folders),
+            'ACTIVE',
+            'file',
+            random.randint(0, 1),
+            f'file_{index}.txt',
+            random.randint(0, 10**9),
+            'admin',
+            'project',
+            'project',
+        )
+        item.restore_path = None
+        item.deleted = False
+        item.deleted_at = None
+        item.created_time = now
+        item.last_updated_time = now
+        storage = StorageModel(
+            item_id, None, f'minio://http://minio/core-project/{folders}/file_{index}.txt', str(uuid4())
+        )
+        extended = ExtendedModel(
+            item_id,
+            {
+                'tags': [f'tag_{random.randint(0, 50)}' for _ in range(3)],
+                'system_tags': ['copied-to-core'],
+                'attributes': {str(uuid4()): {'attr_1': 'value_1', 'attr_2': 'value_2'}},
+            },
+        )
+        page.append((item, storage, extended))
+    return page
+
+
+def project_page(page: list[tuple], fields: list[str] | None = None) -> list[tuple]:
+    """The same rows as select_item_rows returns them for fields, as column tuples instead of entities."""
+    keys = [column.key for column in select_item_rows(fields).selected_columns]
+    row_type = namedtuple('ItemRow', keys)
+    labels = {'storage_id': (1, 'id'), 'extended_id': (2, 'id')}
+    rows = []
+    for entities in page:
+        values = []
+        for key in keys:
+            position, attribute = labels.get(key, (None, key))
+            entity = entities[position] if position else next(e for e in entities if hasattr(e, key))
+            values.append(getattr(entity, attribute))
+        rows.append(row_type(*values))
+    return rows
+
+
+def build_legacy(page: list[tuple]) -> bytes:
+    api_response = GETItemResponse()
+    api_response.result = [legacy_combine_item_tables(row) for row in page]
+    return api_response.json_response().body
+
+
+def build(page: list[tuple]) -> bytes:
+    api_response = GETItemResponse()
+    api_response.result = [combine_item_tables(row) for row in page]
+    return api_response.orjson_response().body
+
+
+def build_projected(rows: list[tuple], fields: list[str] | None = None) -> bytes:
+    api_response = GETItemResponse()
+    api_response.result = [combine_item_row(row, {'fields': fields}) for row in rows]
+    return api_response.orjson_response().body
+
+
+def main(rows: int = 1000, repeat: int = 20) -> None:
+    page = generate_page(rows)
+    projected = project_page(page)
+    fields = parse_item_fields(BROWSER_FIELDS)
+    sparse = project_page(page, fields)
+    cases = {
+        'rows (legacy)': lambda: [legacy_combine_item_tables(row) for row in page],
+        'rows': lambda: [combine_item_tables(row) for row in page],
+        'rows (projected)': lambda: [combine_item_row(row) for row in projected],
+        'payload (legacy)': lambda: build_legacy(page),
+        'payload': lambda: build(page),
+        'payload (projected)': lambda: build_projected(projected),
+        'payload (fields)': lambda: build_projected(sparse, fields),
+    }
+    sizes = len(build_legacy(page)), len(build_projected(sparse, fields))
+    print(f'payload size: {sizes[0]} bytes, {sizes[1]} bytes with fields={BROWSER_FIELDS}')  # noqa: T201
+    for name, case in cases.items():
+        best = min(timeit.repeat(case, number=1, repeat=repeat))
+        print(f'{name:<20} {rows} rows: {best * 1000:.3f} ms')  # noqa: T201
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
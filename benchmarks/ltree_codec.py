@@ -0,0 +1,71 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+"""Compare the memoized ltree codec with the previous regex/concatenation implementation.
+
+Run with ``python -m benchmarks.ltree_codec [rows]``; the default of 1000 rows matches a full result page.
+"""
+
+import base64
+import math
+import random
+import re
+import sys
+import timeit
+
+from app.app_utils import decode_path_from_ltree
+from app.app_utils import encode_path_for_ltree
+
+
+def legacy_encode_label(raw_string: str) -> str:
+    base32_string = str(base64.b32encode(raw_string.encode('utf-8')), 'utf-8')
+    return re.sub('=', '', base32_string)
+
+
+def legacy_encode_path(raw_path: str) -> str:
+    path = ''
+    for label in raw_path.split('/'):
+        path += f'{legacy_encode_label(label)}.'
+    return path[:-1]
+
+
+def legacy_decode_label(encoded_string: str) -> str:
+    missing_padding = math.ceil(len(encoded_string) / 8) * 8 - len(encoded_string)
+    if missing_padding:
+        encoded_string += '=' * missing_padding
+    return base64.b32decode(encoded_string.encode('utf-8')).decode('utf-8')
+
+
+def legacy_decode_path(encoded_path: str) -> str:
+    path = ''
+    for label in encoded_path.split('.'):
+        path += f'{legacy_decode_label(label)}/'
+    return path[:-1]
+
+
+def generate_page(rows: int) -> list[str]:
+    """Paths of one result page: a few name folders with nested folders, as a folder listing would return."""
+    random.seed(0)
+    users = [f'user_{index}' for index in range(5)]
+    folders = [f'folder_{index}' for index in range(20)]
+    return ['/'.join([random.choice(users)] + random.sample(folders, random.randint(1, 4))) for _ in range(rows)]
+
+
+def main(rows: int = 1000, repeat: int = 20) -> None:
+    raw_paths = generate_page(rows)
+    encoded_paths = [legacy_encode_path(raw_path) for raw_path in raw_paths]
+    cases = {
+        'encode (legacy)': lambda: [legacy_encode_path(raw_path) for raw_path in raw_paths],
+        'encode': lambda: [encode_path_for_ltree(raw_path) for raw_path in raw_paths],
+        'decode (legacy)': lambda: [legacy_decode_path(encoded_path) for encoded_path in encoded_paths],
+        'decode': lambda: [decode_path_from_ltree(encoded_path) for encoded_path in encoded_paths],
+    }
+    for name, case in cases.items():
+        best = min(timeit.repeat(case, number=1, repeat=repeat))
+        print(f'{name:<16} {rows} rows: {best * 1000:.3f} ms')  # noqa: T201
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
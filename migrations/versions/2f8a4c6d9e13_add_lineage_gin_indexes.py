@@ -0,0 +1,28 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+"""Add lineage GIN indexes.
+
+Revision ID: 2f8a4c6d9e13
+Revises: 9c3e5f1a7b24
+Create Date: 2026-10-18 13:05:44.671302
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '2f8a4c6d9e13'
+down_revision = '9c3e5f1a7b24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('lineage_consumes_gin', 'lineage', ['consumes'], postgresql_using='gin', schema='metadata')
+    op.create_index('lineage_produces_gin', 'lineage', ['produces'], postgresql_using='gin', schema='metadata')
+
+
+def downgrade():
+    op.drop_index('lineage_produces_gin', table_name='lineage', schema='metadata')
+    op.drop_index('lineage_consumes_gin', table_name='lineage', schema='metadata')
@@ -0,0 +1,42 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+"""Change extended extra to jsonb.
+
+Revision ID: 3e8c1f5a9d27
+Revises: 7b1d4e9a2c58
+Create Date: 2026-10-18 18:05:37.614290
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import JSONB
+
+# revision identifiers, used by Alembic.
+revision = '3e8c1f5a9d27'
+down_revision = '7b1d4e9a2c58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.alter_column(
+        'extended',
+        'extra',
+        existing_type=sa.JSON(),
+        type_=JSONB(),
+        postgresql_using='extra::jsonb',
+        schema='metadata',
+    )
+
+
+def downgrade():
+    op.alter_column(
+        'extended',
+        'extra',
+        existing_type=JSONB(),
+        type_=sa.JSON(),
+        postgresql_using='extra::json',
+        schema='metadata',
+    )
@@ -0,0 +1,37 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+"""Add items outbox table.
+
+Revision ID: 4d2b8e61c0a7
+Revises: b703f5750172
+Create Date: 2026-10-18 09:12:31.482913
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import UUID
+
+# revision identifiers, used by Alembic.
+revision = '4d2b8e61c0a7'
+down_revision = 'b703f5750172'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'items_outbox',
+        sa.Column('id', sa.BIGINT(), autoincrement=True, nullable=False),
+        sa.Column('item_id', UUID(), nullable=False),
+        sa.Column('payload', JSONB(), nullable=False),
+        sa.Column('created_time', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        schema='metadata',
+    )
+
+
+def downgrade():
+    op.drop_table('items_outbox', schema='metadata')
@@ -0,0 +1,46 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+"""Add items outbox attempts and dead letter table.
+
+Revision ID: 5f0b9d3a7c21
+Revises: 8a6d2c4e1f93
+Create Date: 2026-10-18 23:41:07.615284
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import UUID
+
+# revision identifiers, used by Alembic.
+revision = '5f0b9d3a7c21'
+down_revision = '8a6d2c4e1f93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'items_outbox',
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+        schema='metadata',
+    )
+    op.create_table(
+        'items_outbox_dead_letter',
+        sa.Column('id', sa.BIGINT(), autoincrement=False, nullable=False),
+        sa.Column('item_id', UUID(), nullable=False),
+        sa.Column('payload', JSONB(), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('error', sa.String(), nullable=False),
+        sa.Column('created_time', sa.DateTime(), nullable=False),
+        sa.Column('failed_time', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        schema='metadata',
+    )
+
+
+def downgrade():
+    op.drop_table('items_outbox_dead_letter', schema='metadata')
+    op.drop_column('items_outbox', 'attempts', schema='metadata')
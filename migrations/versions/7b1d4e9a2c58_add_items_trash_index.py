@@ -0,0 +1,33 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+"""Add items trash index.
+
+Revision ID: 7b1d4e9a2c58
+Revises: 2f8a4c6d9e13
+Create Date: 2026-10-18 16:42:19.238815
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '7b1d4e9a2c58'
+down_revision = '2f8a4c6d9e13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'items_trash_idx',
+        'items',
+        ['deleted_by', 'deleted_at'],
+        postgresql_where=sa.text('deleted IS true'),
+        schema='metadata',
+    )
+
+
+def downgrade():
+    op.drop_index('items_trash_idx', table_name='items', schema='metadata')
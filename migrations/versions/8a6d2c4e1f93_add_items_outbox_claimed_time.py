@@ -0,0 +1,27 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+"""Add items outbox claimed time.
+
+Revision ID: 8a6d2c4e1f93
+Revises: 3e8c1f5a9d27
+Create Date: 2026-10-18 20:14:52.307146
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '8a6d2c4e1f93'
+down_revision = '3e8c1f5a9d27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('items_outbox', sa.Column('claimed_time', sa.DateTime(), nullable=True), schema='metadata')
+
+
+def downgrade():
+    op.drop_column('items_outbox', 'claimed_time', schema='metadata')
@@ -0,0 +1,59 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+"""Add item search indexes.
+
+Revision ID: 9c3e5f1a7b24
+Revises: 4d2b8e61c0a7
+Create Date: 2026-10-18 11:40:05.219874
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '9c3e5f1a7b24'
+down_revision = '4d2b8e61c0a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index('items_parent_path_gist', 'items', ['parent_path'], postgresql_using='gist', schema='metadata')
+    op.create_index('items_restore_path_gist', 'items', ['restore_path'], postgresql_using='gist', schema='metadata')
+    op.create_index(
+        'items_search_created_time_idx',
+        'items',
+        ['container_code', 'zone', 'status', 'type', 'created_time', 'id'],
+        postgresql_where=sa.text('deleted IS false'),
+        schema='metadata',
+    )
+    op.create_index(
+        'items_search_name_idx',
+        'items',
+        ['container_code', 'zone', 'status', 'type', 'name', 'id'],
+        postgresql_where=sa.text('deleted IS false'),
+        schema='metadata',
+    )
+    op.create_index(
+        'items_name_trgm_idx',
+        'items',
+        ['name'],
+        postgresql_using='gin',
+        postgresql_ops={'name': 'gin_trgm_ops'},
+        schema='metadata',
+    )
+    op.create_index('favourites_user_idx', 'favourites', ['user'], schema='metadata')
+    op.create_index('provenance_item_id_idx', 'provenance', ['item_id'], schema='metadata')
+
+
+def downgrade():
+    op.drop_index('provenance_item_id_idx', table_name='provenance', schema='metadata')
+    op.drop_index('favourites_user_idx', table_name='favourites', schema='metadata')
+    op.drop_index('items_name_trgm_idx', table_name='items', schema='metadata')
+    op.drop_index('items_search_name_idx', table_name='items', schema='metadata')
+    op.drop_index('items_search_created_time_idx', table_name='items', schema='metadata')
+    op.drop_index('items_restore_path_gist', table_name='items', schema='metadata')
+    op.drop_index('items_parent_path_gist', table_name='items', schema='metadata')
@@ -11,9 +11,14 @@ from datetime import timezone
 import pytest
 from fastavro import schemaless_reader
 from fastavro import validate
+from kafka.errors import KafkaTimeoutError
 
+from app.clients.kafka_client import AttributeTemplateLookupError
+from app.clients.kafka_client import KafkaProducerClient
+from app.clients.kafka_client import SerializationError
 from app.models.models_items import ItemStatus
 from tests.conftest import generate_random_container_code
+from tests.main import FakeKafkaProducer
 from tests.main import KafkaTestClient
 
 template_id = str(uuid.uuid4())
@@ -54,44 +59,131 @@ class TestKafka:
         schema = self.client._load_schema()
         assert schema['type'] == 'record'
 
-    def test_format_item_without_attributes(self, sample_item):
+    @pytest.mark.asyncio
+    async def test_format_item_without_attributes(self, sample_item):
         sample_item['extended']['extra']['attributes'] = {}
-        formatted = self.client._format_item(sample_item)
+        formatted = await self.client._format_item(sample_item)
         assert formatted['id'] == sample_item['id']
         assert formatted['created_time'].tzinfo == timezone.utc
         assert formatted['last_updated_time'].tzinfo == timezone.utc
 
-    def test_format_item_with_attributes(self, sample_item, mocker):
+    @pytest.mark.asyncio
+    async def test_format_item_with_attributes(self, sample_item, mocker):
         mocker.patch(
             'app.clients.kafka_client.KafkaProducerClient._get_attribute_template',
             return_value={'name': template_name, 'id': template_id},
         )
 
-        formatted = self.client._format_item(sample_item)
+        formatted = await self.client._format_item(sample_item)
         assert formatted['id'] == sample_item['id']
         assert formatted['created_time'].tzinfo == timezone.utc
         assert formatted['last_updated_time'].tzinfo == timezone.utc
         assert formatted['extended']['template_id'] == template_id
         assert formatted['extended']['template_name'] == template_name
 
-    def test_validate_serialized_message(self, sample_item, mocker):
+    @pytest.mark.asyncio
+    async def test_validate_serialized_message(self, sample_item, mocker):
         mocker.patch(
             'app.clients.kafka_client.KafkaProducerClient._get_attribute_template',
             return_value={'name': template_name, 'id': template_id},
         )
 
-        message = self.client._serialize_msg(sample_item)
+        message = await self.client._serialize_msg(sample_item)
         schema = self.client._load_schema()
         deserialized = schemaless_reader(io.BytesIO(message), schema)
         is_valid = validate(deserialized, schema, raise_errors=False)
         assert is_valid
 
-    def test_serialize_invalid_message(self, sample_item, mocker):
+    @pytest.mark.asyncio
+    async def test_serialize_invalid_message(self, sample_item, mocker):
         mocker.patch(
             'app.clients.kafka_client.KafkaProducerClient._get_attribute_template',
             return_value={'name': template_name, 'id': template_id},
         )
 
         del sample_item['zone']
-        with pytest.raises(ValueError):
-            self.client._serialize_msg(sample_item)
+        with pytest.raises(SerializationError):
+            await self.client._serialize_msg(sample_item)
+
+    @pytest.mark.asyncio
+    async def test_serialize_malformed_message(self, sample_item):
+        del sample_item['extended']
+        with pytest.raises(SerializationError):
+            await self.client._serialize_msg(sample_item)
+
+    @pytest.mark.asyncio
+    async def test_serialize_message_when_template_lookup_fails(self, sample_item, mocker):
+        mocker.patch(
+            'app.clients.kafka_client.KafkaProducerClient._get_attribute_template',
+            side_effect=ConnectionRefusedError('database unavailable'),
+        )
+
+        with pytest.raises(AttributeTemplateLookupError):
+            await self.client._serialize_msg(sample_item)
+
+    @pytest.mark.asyncio
+    async def test_format_item_with_deleted_template(self, sample_item, mocker):
+        mocker.patch('app.clients.kafka_client.KafkaProducerClient._get_attribute_template', return_value=None)
+
+        formatted = await self.client._format_item(sample_item)
+        assert 'template_name' not in formatted['extended']
+        assert 'template_id' not in formatted['extended']
+
+    @pytest.mark.asyncio
+    async def test_send_many_flushes_once(self, sample_item, mocker):
+        mocker.patch(
+            'app.clients.kafka_client.KafkaProducerClient._get_attribute_template',
+            return_value={'name': template_name, 'id': template_id},
+        )
+        items = [dict(sample_item, id=str(uuid.uuid4())) for _ in range(3)]
+        client = KafkaProducerClient()
+        client.producer = FakeKafkaProducer()
+
+        errors = await client.send_many(items)
+
+        assert errors == [None, None, None]
+        assert len(client.producer.futures) == 3
+        assert client.producer.flush_count == 1
+
+    @pytest.mark.asyncio
+    async def test_send_many_reports_errors_per_item(self, sample_item, mocker):
+        mocker.patch(
+            'app.clients.kafka_client.KafkaProducerClient._get_attribute_template',
+            return_value={'name': template_name, 'id': template_id},
+        )
+        items = [dict(sample_item, id=str(uuid.uuid4())) for _ in range(3)]
+
+        def resolve(futures):
+            futures[0].success(None)
+            futures[1].failure(KafkaTimeoutError('broker unavailable'))
+
+        client = KafkaProducerClient()
+        client.producer = FakeKafkaProducer(resolve)
+
+        errors = await client.send_many(items)
+
+        assert errors[0] is None
+        assert all(isinstance(error, KafkaTimeoutError) for error in errors[1:])
+
+    @pytest.mark.asyncio
+    async def test_send_many_reports_errors_per_message_of_same_item(self, sample_item, mocker):
+        mocker.patch(
+            'app.clients.kafka_client.KafkaProducerClient._get_attribute_template',
+            return_value={'name': template_name, 'id': template_id},
+        )
+        invalid_item = dict(sample_item)
+        del invalid_item['zone']
+        items = [sample_item, invalid_item, dict(sample_item, status=ItemStatus.ARCHIVED)]
+
+        def resolve(futures):
+            futures[0].success(None)
+            futures[1].failure(KafkaTimeoutError('broker unavailable'))
+
+        client = KafkaProducerClient()
+        client.producer = FakeKafkaProducer(resolve)
+
+        errors = await client.send_many(items)
+
+        assert errors[0] is None
+        assert isinstance(errors[1], SerializationError)
+        assert isinstance(errors[2], KafkaTimeoutError)
@@ -12,21 +12,25 @@ from datetime import datetime
 from datetime import timezone
 
 import pytest
+import pytest_asyncio
 from alembic.command import upgrade
 from alembic.config import Config
 from faker import Faker
 from fastapi.testclient import TestClient as Client
-from fastapi_sqlalchemy import DBSessionMiddleware
-from fastapi_sqlalchemy import db as db_session
 from sqlalchemy import create_engine
 from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 from sqlalchemy.schema import CreateSchema
 from sqlalchemy_utils import create_database
 from sqlalchemy_utils import database_exists
 from testcontainers.postgres import PostgresContainer
 
+from app.cache import caches
 from app.clients.kafka_client import get_kafka_client
 from app.config import ConfigClass
+from app.dependencies.db import get_db_engine
 from app.models.models_items import ContainerType
 from app.models.models_items import ItemStatus
 from app.models.models_items import ItemType
@@ -352,7 +356,7 @@ def mock_jwt_handle(mocker, httpx_mock, platform_role: str, project_role: str):
         async def get_current_identity(*args, **kwargs):
             return mock_user
 
-    mocker.patch('app.routers.v1.items.dependencies.JWTHandler', return_value=JWTHandlerMock)
+    mocker.patch('app.routers.v1.items.dependencies.jwt_handler', JWTHandlerMock)
 
 
 @pytest.fixture
@@ -417,17 +421,17 @@ def db():
 
         config = Config('alembic.ini')
         ConfigClass.SQLALCHEMY_DATABASE_URI = postgres_uri
+        ConfigClass.SQLALCHEMY_ASYNC_DATABASE_URI = postgres_uri.replace('+psycopg2', '+asyncpg')
         config.set_main_option('sqlalchemy.url', postgres_uri)
         upgrade(config, 'head')
         yield postgres
 
 
-@pytest.fixture()
-def db_session_for_tests(app, db):
-    db_url = db.get_connection_url()
-    DBSessionMiddleware(app=app, db_url=db_url)
-    with db_session():
-        yield db_url
+@pytest_asyncio.fixture()
+async def db_session_for_tests(app, db):
+    engine = await get_db_engine()
+    async with AsyncSession(bind=engine, expire_on_commit=False) as session:
+        yield session
 
 
 @pytest.fixture
@@ -437,7 +441,8 @@ def app(db):
     def get_kafka_test_client():
         return KafkaTestClient()
 
-    app.add_middleware(DBSessionMiddleware, db_url=ConfigClass.SQLALCHEMY_DATABASE_URI)
+    # The test client runs every request in its own event loop, so connections must not be pooled across requests.
+    get_db_engine.instance = create_async_engine(ConfigClass.SQLALCHEMY_ASYNC_DATABASE_URI, poolclass=NullPool)
     app.dependency_overrides[get_kafka_client] = get_kafka_test_client
     app = Client(app)
     return app
@@ -501,6 +506,12 @@ def test_lineage(app) -> dict:
     yield items_in_lineage
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    for cache in caches.values():
+        cache.clear()
+
+
 @pytest.fixture
 def non_mocked_hosts() -> list[str]:
     return ['testserver']
@@ -5,12 +5,31 @@
 # You may not use this file except in compliance with the License.
 
 from fastapi.testclient import TestClient as Client
+from kafka.future import Future
 
 from app.clients.kafka_client import KafkaProducerClient
 from app.clients.kafka_client import get_kafka_client
 from app.config import ConfigClass
 
 
+class FakeKafkaProducer:
+    """Stand-in for KafkaProducer which resolves the pending send futures on flush."""
+
+    def __init__(self, resolve=None):
+        self.resolve = resolve or (lambda futures: [future.success(None) for future in futures if not future.is_done])
+        self.futures = []
+        self.flush_count = 0
+
+    def send(self, topic, value):
+        future = Future()
+        self.futures.append(future)
+        return future
+
+    def flush(self, timeout=None):
+        self.flush_count += 1
+        self.resolve(self.futures)
+
+
 class KafkaTestClient(KafkaProducerClient):
     def init_connection(self) -> None:
         return None
@@ -18,14 +37,18 @@ class KafkaTestClient(KafkaProducerClient):
     def close_connection(self) -> None:
         return None
 
-    def send(self, item: dict) -> None:
+    async def send(self, item: dict) -> None:
         return None
 
+    async def send_many(self, items: list[dict]) -> list:
+        return [None] * len(items)
+
 
 def TestClient(db):
     from app.main import app
 
     ConfigClass.SQLALCHEMY_DATABASE_URI = db.get_connection_url()
+    ConfigClass.SQLALCHEMY_ASYNC_DATABASE_URI = ConfigClass.SQLALCHEMY_DATABASE_URI.replace('+psycopg2', '+asyncpg')
 
     def get_kafka_test_client():
         return KafkaTestClient()
@@ -4,6 +4,11 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+import uuid
+
+from app.routers.v1.attribute_templates.validators import AttributeTemplateValidator
+from app.routers.v1.attribute_templates.validators import validate_attributes_batch
+
 
 class TestAttributeTemplates:
     def test_get_attribute_template_by_id_200(self, app, test_attribute_template):
@@ -68,3 +73,40 @@ class TestAttributeTemplates:
         params = {'id': test_attribute_template}
         response = app.delete('/v1/template/', params=params)
         assert response.status_code == 200
+
+
+class TestAttributeTemplateValidator:
+    template = {
+        'attributes': [
+            {'name': 'required_choice', 'optional': False, 'type': 'multiple_choice', 'options': ['val1', 'val2']},
+            {'name': 'optional_text', 'optional': True, 'type': 'text', 'options': None},
+        ]
+    }
+
+    def test_valid_attributes_have_no_errors(self):
+        validator = AttributeTemplateValidator(self.template)
+        assert validator.validate({'required_choice': 'val1', 'optional_text': 'anything'}) == []
+
+    def test_invalid_attributes_report_each_error(self):
+        validator = AttributeTemplateValidator(self.template)
+        errors = validator.validate({'optional_text': 1, 'unknown': 'value'})
+        assert errors == [
+            'Missing required attribute required_choice',
+            'Attribute optional_text must be a string',
+            'Unknown attribute unknown',
+        ]
+
+    def test_validate_batch_returns_errors_per_item(self):
+        template_id = uuid.uuid4()
+        validators = {template_id: AttributeTemplateValidator(self.template)}
+        items = [
+            ({'required_choice': 'val2'}, template_id),
+            ({'required_choice': 'invalid'}, template_id),
+            ({}, None),
+            ({'required_choice': 'val1'}, uuid.uuid4()),
+        ]
+        errors = validate_attributes_batch(items, validators)
+        assert errors[0] == []
+        assert errors[1] == ['Attribute required_choice must be one of the template options']
+        assert errors[2] == []
+        assert errors[3][0].endswith('does not exist')
@@ -0,0 +1,182 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import permissions
+from app.cache import TTLCache
+from app.main import app
+from app.models.sql_attribute_templates import AttributeTemplateModel
+from app.routers.v1.attribute_templates.template_cache import AttributeTemplateCache
+from app.routers.v1.items import dependencies
+
+
+class TestTTLCache:
+    def test_get_counts_hits_and_misses(self):
+        cache = TTLCache('test_counts', max_size=10, ttl=60)
+        assert cache.get('key') is None
+        cache.set('key', 'value')
+        assert cache.get('key') == 'value'
+        assert cache.metrics()['hits'] == 1
+        assert cache.metrics()['misses'] == 1
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = TTLCache('test_eviction', max_size=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        assert cache.get('b') is None
+        assert cache.get('a') == 1
+        assert cache.get('c') == 3
+
+    def test_expired_entry_is_dropped(self, mocker):
+        cache = TTLCache('test_expiry', max_size=10, ttl=5)
+        monotonic = mocker.patch('app.cache.time.monotonic', return_value=100)
+        cache.set('key', 'value')
+        monotonic.return_value = 106
+        assert cache.get('key') is None
+        assert len(cache) == 0
+
+    def test_invalidate_removes_matching_keys(self):
+        cache = TTLCache('test_invalidate', max_size=10, ttl=60)
+        cache.set(('user_1', 'project'), True)
+        cache.set(('user_2', 'project'), True)
+        cache.invalidate(lambda key: key[0] == 'user_1')
+        assert cache.get(('user_1', 'project')) is None
+        assert cache.get(('user_2', 'project')) is True
+
+
+class TestPermissionCache:
+    @pytest.mark.asyncio
+    async def test_repeated_checks_reuse_cached_decision(self, mocker):
+        permissions.permission_cache.clear()
+        has_permission = mocker.patch('app.permissions.has_permission', return_value=True)
+        identity = {'username': 'user', 'role': 'member'}
+        for _ in range(3):
+            assert await permissions.cached_has_permission('project', 'file_any', 'core', 'view', identity)
+        assert has_permission.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_name_folder_checked_only_without_file_any(self, mocker):
+        permissions.permission_cache.clear()
+
+        async def has_permission(auth_url, project_code, resource, zone, operation, current_identity):
+            return resource == 'file_any' and zone == 'core'
+
+        mocked = mocker.patch('app.permissions.has_permission', side_effect=has_permission)
+        identity = {'username': 'user', 'role': 'member'}
+        result = await permissions.get_file_view_permissions('project', identity, ['core', 'greenroom'])
+        assert result == {'core': 'file_any', 'greenroom': None}
+        assert mocked.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_invalidate_permissions_for_user(self, mocker):
+        permissions.permission_cache.clear()
+        has_permission = mocker.patch('app.permissions.has_permission', return_value=True)
+        identity = {'username': 'user', 'role': 'member'}
+        await permissions.cached_has_permission('project', 'file_any', 'core', 'view', identity)
+        permissions.invalidate_permissions(username='user')
+        await permissions.cached_has_permission('project', 'file_any', 'core', 'view', identity)
+        assert has_permission.call_count == 2
+
+    def mock_identity(self, mocker, role: str) -> None:
+        dependencies.identity_cache.clear()
+        jwt_handler = mocker.patch('app.routers.v1.items.dependencies.jwt_handler')
+        jwt_handler.get_token.return_value = 'token'
+        jwt_handler.decode_validate_token.return_value = {'exp': time.time() + 60}
+        jwt_handler.get_current_identity = mocker.AsyncMock(return_value={'username': 'user', 'role': role})
+
+    @pytest.mark.asyncio
+    async def test_invalidate_permissions_endpoint_for_project(self, mocker):
+        self.mock_identity(mocker, 'admin')
+        permissions.permission_cache.clear()
+        has_permission = mocker.patch('app.permissions.has_permission', return_value=True)
+        identity = {'username': 'user', 'role': 'member'}
+        await permissions.cached_has_permission('project', 'file_any', 'core', 'view', identity)
+        await permissions.cached_has_permission('other_project', 'file_any', 'core', 'view', identity)
+        response = TestClient(app).delete('/v1/ops/caches/permissions', params={'project_code': 'project'})
+        assert response.status_code == 200
+        await permissions.cached_has_permission('project', 'file_any', 'core', 'view', identity)
+        await permissions.cached_has_permission('other_project', 'file_any', 'core', 'view', identity)
+        assert has_permission.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_invalidate_permissions_endpoint_requires_platform_admin(self, mocker):
+        self.mock_identity(mocker, 'member')
+        permissions.permission_cache.clear()
+        has_permission = mocker.patch('app.permissions.has_permission', return_value=True)
+        identity = {'username': 'user', 'role': 'member'}
+        await permissions.cached_has_permission('project', 'file_any', 'core', 'view', identity)
+        response = TestClient(app).delete('/v1/ops/caches/permissions', params={'project_code': 'project'})
+        assert response.status_code == 403
+        await permissions.cached_has_permission('project', 'file_any', 'core', 'view', identity)
+        assert has_permission.call_count == 1
+
+    def test_cache_metrics_endpoint_requires_platform_admin(self, mocker):
+        self.mock_identity(mocker, 'member')
+        assert TestClient(app).get('/v1/ops/caches').status_code == 403
+        self.mock_identity(mocker, 'admin')
+        response = TestClient(app).get('/v1/ops/caches')
+        assert response.status_code == 200
+        assert 'permissions' in response.json()['result']
+
+
+class TestIdentityCache:
+    def mock_jwt_handler(self, mocker, expires_in: float):
+        jwt_handler = mocker.patch('app.routers.v1.items.dependencies.jwt_handler')
+        jwt_handler.get_token.return_value = 'token'
+        jwt_handler.decode_validate_token.return_value = {'exp': time.time() + expires_in}
+        jwt_handler.get_current_identity = mocker.AsyncMock(return_value={'username': 'user'})
+        return jwt_handler
+
+    @pytest.mark.asyncio
+    async def test_identity_is_reused_for_same_token(self, mocker):
+        dependencies.identity_cache.clear()
+        jwt_handler = self.mock_jwt_handler(mocker, expires_in=60)
+        for _ in range(3):
+            assert await dependencies.jwt_required(mocker.Mock()) == {'username': 'user'}
+        assert jwt_handler.decode_validate_token.call_count == 1
+        assert jwt_handler.get_current_identity.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_identity_of_expired_token_is_not_cached(self, mocker):
+        dependencies.identity_cache.clear()
+        jwt_handler = self.mock_jwt_handler(mocker, expires_in=-1)
+        await dependencies.jwt_required(mocker.Mock())
+        await dependencies.jwt_required(mocker.Mock())
+        assert jwt_handler.get_current_identity.call_count == 2
+
+
+class TestAttributeTemplateCache:
+    def mock_db(self, mocker, template: AttributeTemplateModel):
+        db = mocker.Mock()
+        db.execute = mocker.AsyncMock(return_value=mocker.Mock())
+        db.execute.return_value.scalars.return_value = [template]
+        return db
+
+    @pytest.mark.asyncio
+    async def test_template_is_loaded_once(self, mocker):
+        template = AttributeTemplateModel('template', 'project', [])
+        db = self.mock_db(mocker, template)
+        cache = AttributeTemplateCache(max_size=10, ttl=60)
+        for _ in range(3):
+            assert (await cache.get(db, template.id))['name'] == 'template'
+        assert db.execute.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidate_reloads_template(self, mocker):
+        template = AttributeTemplateModel('template', 'project', [])
+        db = self.mock_db(mocker, template)
+        cache = AttributeTemplateCache(max_size=10, ttl=60)
+        await cache.get(db, template.id)
+        cache.invalidate(template.id)
+        template.name = 'renamed'
+        assert (await cache.get(db, str(template.id)))['name'] == 'renamed'
+        assert db.execute.call_count == 2
@@ -6,7 +6,11 @@
 
 import uuid
 
+import pytest
+from sqlalchemy import select
+
 from app.models.models_items import ItemStatus
+from app.models.sql_favourites import FavouritesModel
 from tests.conftest import generate_random_container_code
 from tests.conftest import generate_random_username
 
@@ -88,6 +92,22 @@ class TestFavourites:
         response = app.post('/v1/favourite/', json=payload)
         assert response.status_code == 400
 
+    @pytest.mark.asyncio
+    async def test_archive_item_deletes_favourites_200(self, db_session_for_tests, app, test_favourites):
+        params = {'id': test_favourites['entity_ids'][0], 'status': ItemStatus.ARCHIVED}
+        response = app.patch('/v1/item/', params=params)
+        assert response.status_code == 200
+        favourites = (
+            (
+                await db_session_for_tests.execute(
+                    select(FavouritesModel).where(FavouritesModel.user == test_favourites['user'])
+                )
+            )
+            .scalars()
+            .all()
+        )
+        assert [str(favourite.collection_id) for favourite in favourites] == [test_favourites['entity_ids'][1]]
+
     def test_create_favourite_item_name_folder_400(self, app, test_items):
         payload = {
             'id': test_items['ids']['name_folder'],
@@ -0,0 +1,90 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import json
+import uuid
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy import text
+from sqlalchemy.sql import expression
+from sqlalchemy_utils.types.ltree import LQUERY
+
+from app.app_utils import encode_path_for_ltree
+from app.models.models_items import ItemStatus
+from app.models.sql_favourites import FavouritesModel
+from app.models.sql_items import ItemModel
+from app.models.sql_lineage import LineageModel
+from app.models.sql_provenance import ProvenanceModel
+from app.routers.router_utils import Explain
+from app.routers.v1.items.crud_lineage_provenance import touches_items
+
+
+async def get_query_plan(db_session, query) -> str:
+    # The test tables are tiny, so sequential scans have to be ruled out for the planner to consider the indexes.
+    await db_session.execute(text('SET LOCAL enable_seqscan = off'))
+    plan = await db_session.scalar(Explain(query))
+    await db_session.rollback()
+    return plan if isinstance(plan, str) else json.dumps(plan)
+
+
+class TestIndexes:
+    @pytest.mark.asyncio
+    async def test_parent_path_lquery_uses_gist_index(self, db_session_for_tests):
+        search_path = encode_path_for_ltree('user') + '.*'
+        query = select(ItemModel.id).where(ItemModel.parent_path.lquery(expression.cast(search_path, LQUERY)))
+        assert 'items_parent_path_gist' in await get_query_plan(db_session_for_tests, query)
+
+    @pytest.mark.asyncio
+    async def test_restore_path_lquery_uses_gist_index(self, db_session_for_tests):
+        search_path = encode_path_for_ltree('user') + '.*'
+        query = select(ItemModel.id).where(ItemModel.restore_path.lquery(expression.cast(search_path, LQUERY)))
+        assert 'items_restore_path_gist' in await get_query_plan(db_session_for_tests, query)
+
+    @pytest.mark.asyncio
+    async def test_search_filters_use_composite_index(self, db_session_for_tests):
+        query = (
+            select(ItemModel.id)
+            .where(
+                ItemModel.container_code == 'test_project',
+                ItemModel.zone == 0,
+                ItemModel.status == ItemStatus.ACTIVE,
+                ItemModel.deleted.is_(False),
+            )
+            .order_by(ItemModel.type, ItemModel.created_time, ItemModel.id)
+        )
+        assert 'items_search_created_time_idx' in await get_query_plan(db_session_for_tests, query)
+
+    @pytest.mark.asyncio
+    async def test_name_ilike_uses_trigram_index(self, db_session_for_tests):
+        query = select(ItemModel.id).where(ItemModel.name.ilike('%test_file%'))
+        assert 'items_name_trgm_idx' in await get_query_plan(db_session_for_tests, query)
+
+    @pytest.mark.asyncio
+    async def test_favourites_user_uses_index(self, db_session_for_tests):
+        query = select(FavouritesModel.id).where(FavouritesModel.user == 'user')
+        assert 'favourites_user_idx' in await get_query_plan(db_session_for_tests, query)
+
+    @pytest.mark.asyncio
+    async def test_provenance_item_id_uses_index(self, db_session_for_tests):
+        query = select(ProvenanceModel.id).where(ProvenanceModel.item_id == uuid.uuid4())
+        assert 'provenance_item_id_idx' in await get_query_plan(db_session_for_tests, query)
+
+    @pytest.mark.asyncio
+    async def test_lineage_containment_uses_gin_indexes(self, db_session_for_tests):
+        query = select(LineageModel.id).where(touches_items([uuid.uuid4()]))
+        plan = await get_query_plan(db_session_for_tests, query)
+        assert 'lineage_consumes_gin' in plan
+        assert 'lineage_produces_gin' in plan
+
+    @pytest.mark.asyncio
+    async def test_trash_listing_uses_partial_index(self, db_session_for_tests):
+        query = (
+            select(ItemModel.id)
+            .where(ItemModel.deleted_by == 'user', ItemModel.deleted.is_(True))
+            .order_by(ItemModel.deleted_at.desc())
+        )
+        assert 'items_trash_idx' in await get_query_plan(db_session_for_tests, query)
@@ -4,6 +4,7 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+import json
 import uuid
 from datetime import datetime
 from datetime import timezone
@@ -12,6 +13,7 @@ import pytest
 
 from app.models.models_items import ContainerType
 from app.models.models_items import ItemStatus
+from app.models.models_lineage_provenance import TransformationType
 from tests.conftest import generate_random_username
 
 
@@ -78,6 +80,82 @@ class TestItems:
         assert response.status_code == 200
         assert response.json()['total'] == 1
 
+    def test_get_items_by_location_with_cursor_200(self, app, test_items, jwt_token_admin, has_admin_file_permission):
+        params = {
+            'parent_path': 'user',
+            'status': ItemStatus.ACTIVE,
+            'zone': 0,
+            'container_code': test_items['container_code'],
+            'recursive': True,
+        }
+        total = app.get('/v1/items/search/', params=params).json()['total']
+        params.update({'page_size': 1, 'cursor': '', 'count': 'none'})
+        item_ids = []
+        while params['cursor'] is not None:
+            response = app.get('/v1/items/search/', params=params)
+            assert response.status_code == 200
+            assert response.json()['total'] is None
+            item_ids.extend(item['id'] for item in response.json()['result'])
+            params['cursor'] = response.json()['next_cursor']
+        assert len(item_ids) == len(set(item_ids)) == total
+
+    def test_get_items_by_location_with_cursor_sorted_by_parent_path_200(
+        self, app, test_items, jwt_token_admin, has_admin_file_permission
+    ):
+        params = {
+            'parent_path': 'user',
+            'status': ItemStatus.ACTIVE,
+            'zone': 0,
+            'container_code': test_items['container_code'],
+            'recursive': True,
+            'sorting': 'parent_path',
+        }
+        total = app.get('/v1/items/search/', params=params).json()['total']
+        params.update({'page_size': 1, 'cursor': ''})
+        item_ids = []
+        while params['cursor'] is not None:
+            response = app.get('/v1/items/search/', params=params)
+            assert response.status_code == 200
+            item_ids.extend(item['id'] for item in response.json()['result'])
+            params['cursor'] = response.json()['next_cursor']
+        assert len(item_ids) == len(set(item_ids)) == total
+
+    def test_get_items_by_location_invalid_cursor_400(
+        self, app, test_items, jwt_token_admin, has_admin_file_permission
+    ):
+        params = {
+            'parent_path': 'user',
+            'status': ItemStatus.ACTIVE,
+            'container_code': test_items['container_code'],
+            'cursor': 'invalid',
+        }
+        response = app.get('/v1/items/search/', params=params)
+        assert response.status_code == 400
+
+    def test_get_items_by_location_with_fields_200(self, app, test_items, jwt_token_admin, has_admin_file_permission):
+        params = {
+            'parent_path': 'user',
+            'status': ItemStatus.ACTIVE,
+            'container_code': test_items['container_code'],
+            'recursive': True,
+            'fields': 'name,type,size,last_updated_time',
+            'cursor': '',
+            'page_size': 1,
+        }
+        response = app.get('/v1/items/search/', params=params)
+        assert response.status_code == 200
+        assert response.json()['next_cursor']
+        for item in response.json()['result']:
+            assert list(item) == ['id', 'name', 'type', 'size', 'last_updated_time']
+
+    def test_get_items_by_location_invalid_fields_400(
+        self, app, test_items, jwt_token_admin, has_admin_file_permission
+    ):
+        params = {'container_code': test_items['container_code'], 'fields': 'name,unknown'}
+        response = app.get('/v1/items/search/', params=params)
+        assert response.status_code == 400
+        assert response.json()['error_msg'] == 'Invalid fields: unknown'
+
     @pytest.mark.parametrize('item_name', [('user'), ('User')])
     def test_get_item_by_location_filter_by_name_case_insensitive(
         self, app, item_name, test_items, jwt_token_admin, has_admin_file_permission
@@ -354,11 +432,49 @@ class TestItems:
         assert response.status_code == 200
         assert response.json()['total'] == 1
 
+    @pytest.mark.parametrize('count,total', [(None, 2), ('none', None)])
+    def test_get_items_by_id_batch_count_modes_200(self, app, test_items, count, total):
+        params = {'ids': [test_items['ids']['folder'], test_items['ids']['file_1']]}
+        if count:
+            params['count'] = count
+        response = app.get('/v1/items/batch/', params=params)
+        assert response.status_code == 200
+        assert response.json()['total'] == total
+        assert len(response.json()['result']) == 2
+
     def test_get_items_by_id_batch_200(self, app, test_items):
         params = {'ids': [test_items['ids']['name_folder'], test_items['ids']['folder'], test_items['ids']['file_1']]}
         response = app.get('/v1/items/batch/', params=params)
         assert response.status_code == 200
 
+    def test_get_items_by_id_batch_with_fields_200(self, app, test_items):
+        params = {'ids': [test_items['ids']['folder'], test_items['ids']['file_1']], 'fields': 'name,storage'}
+        response = app.get('/v1/items/batch/', params=params)
+        assert response.status_code == 200
+        assert len(response.json()['result']) == 2
+        for item in response.json()['result']:
+            assert list(item) == ['id', 'name', 'storage']
+            assert 'location_uri' in item['storage']
+
+    @pytest.mark.parametrize('compress', [False, True])
+    def test_export_items_streams_ndjson_200(
+        self, app, test_items, jwt_token_admin, has_admin_file_permission, compress
+    ):
+        search_params = {'container_code': test_items['container_code'], 'recursive': True, 'page_size': 1000}
+        search_response = app.get('/v1/items/search/', params=search_params)
+        params = {'container_code': test_items['container_code'], 'fields': 'name,type', 'compress': compress}
+        response = app.get('/v1/items/export/', params=params)
+        assert response.status_code == 200
+        assert response.headers['content-type'] == 'application/x-ndjson'
+        items = [json.loads(line) for line in response.text.splitlines()]
+        assert {item['id'] for item in items} == {item['id'] for item in search_response.json()['result']}
+        assert all(list(item) == ['id', 'name', 'type'] for item in items)
+
+    def test_export_items_invalid_fields_400(self, app, test_items, jwt_token_admin, has_admin_file_permission):
+        params = {'container_code': test_items['container_code'], 'fields': 'unknown'}
+        response = app.get('/v1/items/export/', params=params)
+        assert response.status_code == 400
+
     def test_create_item_200(self, app):
         item_id = str(uuid.uuid4())
         payload = {
@@ -382,6 +498,31 @@ class TestItems:
         response = app.post('/v1/item/', json=payload)
         assert response.status_code == 200
 
+    def test_create_item_with_missing_transformation_source_400(self, app):
+        item_id = str(uuid.uuid4())
+        payload = {
+            'id': item_id,
+            'parent': '3fa85f64-5717-4562-b3fc-2c963f66afa6',
+            'parent_path': 'user/test_folder',
+            'type': 'file',
+            'status': ItemStatus.REGISTERED,
+            'zone': 1,
+            'name': 'test_file.txt',
+            'size': 0,
+            'owner': 'admin',
+            'container_code': 'create_item_400',
+            'container_type': 'project',
+            'location_uri': '',
+            'version': '',
+            'tags': [],
+            'system_tags': [],
+            'tfrm_type': TransformationType.COPY_TO_ZONE,
+            'tfrm_source': str(uuid.uuid4()),
+        }
+        response = app.post('/v1/item/', json=payload)
+        assert response.status_code == 400
+        assert app.get(f'/v1/item/{item_id}/').status_code == 404
+
     def test_create_item_200_with_storage_info(self, app):
         item_id = str(uuid.uuid4())
         payload = {
@@ -453,6 +594,85 @@ class TestItems:
         response = app.post('/v1/items/batch/', json=payload)
         assert response.status_code == 200
 
+    def test_create_items_batch_skip_duplicates_200(self, app, test_items):
+        item_id = str(uuid.uuid4())
+        payload = {
+            'items': [
+                {
+                    'id': test_items['ids']['file_1'],
+                    'parent': test_items['ids']['folder'],
+                    'parent_path': 'user/test_folder',
+                    'type': 'file',
+                    'zone': test_items['zone'],
+                    'name': 'test_file_1.txt',
+                    'size': 100,
+                    'owner': 'user',
+                    'container_code': test_items['container_code'],
+                    'container_type': 'project',
+                    'location_uri': '',
+                    'version': '',
+                },
+                {
+                    'id': item_id,
+                    'parent': test_items['ids']['folder'],
+                    'parent_path': 'user/test_folder',
+                    'type': 'file',
+                    'zone': test_items['zone'],
+                    'name': 'skip_duplicates.txt',
+                    'size': 100,
+                    'owner': 'user',
+                    'container_code': test_items['container_code'],
+                    'container_type': 'project',
+                    'location_uri': '',
+                    'version': '',
+                },
+            ],
+            'skip_duplicates': True,
+        }
+        response = app.post('/v1/items/batch/', json=payload)
+        assert response.status_code == 200
+        assert response.json()['total'] == 1
+        assert response.json()['result'][0]['id'] == item_id
+
+    def test_create_items_batch_duplicate_409(self, app, test_items):
+        item_id = str(uuid.uuid4())
+        payload = {
+            'items': [
+                {
+                    'id': item_id,
+                    'parent': test_items['ids']['folder'],
+                    'parent_path': 'user/test_folder',
+                    'type': 'file',
+                    'zone': test_items['zone'],
+                    'name': 'not_created.txt',
+                    'size': 100,
+                    'owner': 'user',
+                    'container_code': test_items['container_code'],
+                    'container_type': 'project',
+                    'location_uri': '',
+                    'version': '',
+                },
+                {
+                    'id': test_items['ids']['file_1'],
+                    'parent': test_items['ids']['folder'],
+                    'parent_path': 'user/test_folder',
+                    'type': 'file',
+                    'zone': test_items['zone'],
+                    'name': 'test_file_1.txt',
+                    'size': 100,
+                    'owner': 'user',
+                    'container_code': test_items['container_code'],
+                    'container_type': 'project',
+                    'location_uri': '',
+                    'version': '',
+                },
+            ]
+        }
+        response = app.post('/v1/items/batch/', json=payload)
+        assert response.status_code == 409
+        response = app.get(f'/v1/item/{item_id}/')
+        assert response.status_code == 404
+
     def test_create_file_item_as_active_failed(self, app, test_items):
         item_id = str(uuid.uuid4())
         payload = {
@@ -686,6 +906,23 @@ class TestItems:
         assert response.status_code == 200
         assert response.json()['result']['name'] == 'test_file_updated.txt'
 
+    def test_rename_folder_updates_children_paths_200(self, app, test_items):
+        params = {'id': test_items['ids']['folder']}
+        payload = {'name': 'test_folder_renamed'}
+        response = app.put('/v1/item/', json=payload, params=params)
+        assert response.status_code == 200
+        response = app.get(f'/v1/item/{test_items["ids"]["file_1"]}/')
+        assert response.json()['result']['parent_path'] == 'user/test_folder_renamed'
+
+    def test_move_folder_updates_children_paths_200(self, app, test_items):
+        params = {'id': test_items['ids']['folder']}
+        payload = {'parent_path': 'user/new_parent'}
+        response = app.put('/v1/item/', json=payload, params=params)
+        assert response.status_code == 200
+        assert response.json()['result']['parent_path'] == 'user/new_parent'
+        response = app.get(f'/v1/item/{test_items["ids"]["file_1"]}/')
+        assert response.json()['result']['parent_path'] == 'user/new_parent/test_folder'
+
     def test_update_items_batch_200(self, app, test_items):
         params = {'ids': [test_items['ids']['name_folder'], test_items['ids']['folder'], test_items['ids']['file_1']]}
         payload = {'items': [{'owner': 'user_2'}, {'tags': ['update_items_batch']}, {'size': 500}]}
@@ -695,6 +932,24 @@ class TestItems:
         assert response.json()['result'][1]['extended']['extra']['tags'] == ['update_items_batch']
         assert response.json()['result'][2]['size'] == 500
 
+    def test_update_items_batch_renames_folder_with_child_in_batch_200(self, app, test_items):
+        params = {'ids': [test_items['ids']['folder'], test_items['ids']['file_1']]}
+        payload = {'items': [{'name': 'test_folder_renamed'}, {'size': 500}]}
+        response = app.put('/v1/items/batch/', params=params, json=payload)
+        assert response.status_code == 200
+        assert [item['id'] for item in response.json()['result']] == params['ids']
+        response = app.get(f'/v1/item/{test_items["ids"]["file_1"]}/')
+        assert response.json()['result']['parent_path'] == 'user/test_folder_renamed'
+        assert response.json()['result']['size'] == 500
+
+    def test_update_items_batch_missing_item_404(self, app, test_items):
+        params = {'ids': [test_items['ids']['file_1'], str(uuid.uuid4())]}
+        payload = {'items': [{'size': 500}, {'size': 500}]}
+        response = app.put('/v1/items/batch/', params=params, json=payload)
+        assert response.status_code == 404
+        response = app.get(f'/v1/item/{test_items["ids"]["file_1"]}/')
+        assert response.json()['result']['size'] != 500
+
     def test_update_REGISTERED_items_fail(self, app, test_items):
         params = {'ids': [test_items['ids']['file_4']]}
         payload = {'items': [{'owner': 'user_2', 'tags': ['update_items_batch'], 'size': 500}]}
@@ -742,6 +997,21 @@ class TestItems:
         for i in range(4):
             assert response.json()['result'][i]['status'] == ItemStatus.ARCHIVED
 
+    def test_trash_folder_moves_children_to_trash_paths_200(self, app, test_items):
+        params = {
+            'id': test_items['ids']['folder'],
+            'status': ItemStatus.ARCHIVED,
+        }
+        response = app.patch('/v1/item/', params=params)
+        assert response.status_code == 200
+        root, *children = response.json()['result']
+        assert root['id'] == test_items['ids']['folder']
+        assert root['parent_path'] is None
+        assert root['restore_path'] == 'user'
+        for child in children:
+            assert child['parent_path'] == root['name']
+            assert child['restore_path'] == f'user/{root["name"]}'
+
     def test_restore_folder_with_children_200(self, app, test_items):
         params = {
             'id': test_items['ids']['folder'],
@@ -806,6 +1076,51 @@ class TestItems:
         response = app.delete('/v1/items/batch/', params=params)
         assert response.status_code == 200
 
+    def test_delete_items_by_id_batch_deletes_folder_subtree_200(self, app, test_items):
+        params = {'ids': [test_items['ids']['folder'], test_items['ids']['file_1']]}
+        response = app.delete('/v1/items/batch/', params=params)
+        assert response.status_code == 200
+        for item_id in ('folder', 'file_1'):
+            response = app.get(f'/v1/item/{test_items["ids"][item_id]}/')
+            assert response.status_code == 404
+        response = app.get(f'/v1/item/{test_items["ids"]["name_folder"]}/')
+        assert response.status_code == 200
+
+    def test_delete_items_by_id_batch_missing_item_404(self, app, test_items):
+        params = {'ids': [test_items['ids']['file_2'], str(uuid.uuid4())]}
+        response = app.delete('/v1/items/batch/', params=params)
+        assert response.status_code == 404
+        response = app.get(f'/v1/item/{test_items["ids"]["file_2"]}/')
+        assert response.status_code == 200
+
+    def test_mark_items_deleted_list_and_restore_200(self, app, test_items, jwt_token_admin):
+        ids = [test_items['ids']['file_2'], test_items['ids']['file_3']]
+        response = app.delete('/v1/items/mark/', params={'ids': ids})
+        assert response.status_code == 200
+        response = app.get('/v1/items/mark/', params={'page_size': 1, 'cursor': ''})
+        assert response.status_code == 200
+        assert len(response.json()['result']) == 1
+        assert response.json()['total'] == 2
+        next_page = app.get('/v1/items/mark/', params={'page_size': 1, 'cursor': response.json()['next_cursor']})
+        assert {response.json()['result'][0]['id'], next_page.json()['result'][0]['id']} == set(ids)
+        response = app.put('/v1/items/mark/', params={'ids': ids})
+        assert response.status_code == 200
+        assert app.get('/v1/items/mark/').json()['result'] == []
+
+    def test_mark_items_deleted_missing_item_404(self, app, test_items, jwt_token_admin):
+        response = app.delete('/v1/items/mark/', params={'ids': [test_items['ids']['file_2'], str(uuid.uuid4())]})
+        assert response.status_code == 404
+        assert app.get('/v1/items/mark/').json()['result'] == []
+
+    def test_empty_trash_deletes_marked_items_200(self, app, test_items, jwt_token_admin):
+        app.delete('/v1/items/mark/', params={'ids': [test_items['ids']['folder'], test_items['ids']['file_1']]})
+        response = app.delete('/v1/items/mark/empty/')
+        assert response.status_code == 200
+        assert response.json()['total'] >= 2
+        for item_id in ('folder', 'file_1'):
+            assert app.get(f'/v1/item/{test_items["ids"][item_id]}/').status_code == 404
+        assert app.get('/v1/items/mark/').json()['result'] == []
+
     def test_bequeath_to_children_200(self, app, test_items, test_attribute_template):
         params = {'id': test_items['ids']['folder']}
         payload = {
@@ -822,6 +1137,22 @@ class TestItems:
         )
         assert response.json()['result'][0]['extended']['extra']['system_tags'] == payload['system_tags']
 
+    def test_bequeath_system_tags_keeps_other_properties_200(self, app, test_items):
+        params = {'id': test_items['ids']['folder']}
+        response = app.put('/v1/items/batch/bequeath/', params=params, json={'system_tags': ['copied-to-core']})
+        assert response.status_code == 200
+        assert response.json()['total'] == 3
+        for child in response.json()['result']:
+            assert child['extended']['extra']['system_tags'] == ['copied-to-core']
+            assert child['extended']['extra']['tags'] == []
+        response = app.get(f'/v1/item/{test_items["ids"]["folder"]}/')
+        assert response.json()['result']['extended']['extra']['system_tags'] == []
+
+    def test_bequeath_from_file_400(self, app, test_items):
+        params = {'id': test_items['ids']['file_1']}
+        response = app.put('/v1/items/batch/bequeath/', params=params, json={'system_tags': ['copied-to-core']})
+        assert response.status_code == 400
+
     def test_get_one_file_by_location_200(self, app, test_items):
         params = {
             'name': 'test_file_1.txt',
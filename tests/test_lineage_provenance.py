@@ -6,6 +6,8 @@
 
 import uuid
 
+import pytest
+
 from app.models.models_items import ContainerType
 from app.models.models_items import ItemStatus
 from app.models.models_items import ItemType
@@ -17,7 +19,8 @@ from tests.conftest import generate_random_username
 
 
 class TestLineageProvenance:
-    def test_no_transformation_create_item_provenance_exists(self, db_session_for_tests, app):
+    @pytest.mark.asyncio
+    async def test_no_transformation_create_item_provenance_exists(self, db_session_for_tests, app):
         produced_item_id = uuid.uuid4()
         payload = {
             'id': str(produced_item_id),
@@ -38,17 +41,18 @@ class TestLineageProvenance:
             'system_tags': [],
         }
         app.post('/v1/item/', json=payload)
-        provenance_snapshots = get_provenance_snapshots_by_item_id(produced_item_id)
+        provenance_snapshots = await get_provenance_snapshots_by_item_id(db_session_for_tests, produced_item_id)
         assert len(provenance_snapshots) == 1
         provenance_snapshot = provenance_snapshots[0]
         assert not provenance_snapshot.lineage_id
 
-    def test_no_transformation_update_item_provenance_exists(self, db_session_for_tests, app, test_items):
+    @pytest.mark.asyncio
+    async def test_no_transformation_update_item_provenance_exists(self, db_session_for_tests, app, test_items):
         produced_item_id = test_items['ids']['file_1']
         params = {'id': produced_item_id}
         payload = {'name': 'test_file_updated.txt'}
         app.put('/v1/item/', json=payload, params=params)
-        provenance_snapshots = get_provenance_snapshots_by_item_id(produced_item_id)
+        provenance_snapshots = await get_provenance_snapshots_by_item_id(db_session_for_tests, produced_item_id)
         assert len(provenance_snapshots) > 0
         provenance_snapshot = provenance_snapshots[-1]
         assert not provenance_snapshot.lineage_id
@@ -70,3 +74,40 @@ class TestLineageProvenance:
         snapshot_ids = list(provenance.keys())
         assert snapshot_ids[0] == str(test_lineage[0])
         assert snapshot_ids[1] == str(test_lineage[1])
+
+    def test_batch_lineage_provenance_returns_each_item(self, app, test_lineage):
+        unknown_item_id = str(uuid.uuid4())
+        params = {'item_ids': [str(test_lineage[0]), str(test_lineage[1]), unknown_item_id]}
+        response = app.get('/v1/lineage/batch/', params=params)
+        assert response.status_code == 200
+        result = response.json()['result']
+        assert unknown_item_id not in result
+        assert len(result[str(test_lineage[0])]['lineage']) == 1
+        assert len(result[str(test_lineage[1])]['lineage']) == 2
+
+    def test_lineage_graph_follows_downstream_transformations(self, app, test_lineage):
+        params = {'depth': 2, 'direction': 'downstream'}
+        response = app.get(f'/v1/lineage/{test_lineage[0]}/graph/', params=params)
+        assert response.status_code == 200
+        edges = response.json()['result']['edges']
+        assert [(edge['tfrm_type'], edge['depth']) for edge in edges] == [
+            (str(TransformationType.COPY_TO_ZONE), 1),
+            (str(TransformationType.ARCHIVE), 2),
+        ]
+        nodes = {node['id']: node for node in response.json()['result']['nodes']}
+        assert set(nodes) == {str(test_lineage[0]), str(test_lineage[1])}
+        assert nodes[str(test_lineage[1])]['provenance']
+
+    def test_lineage_graph_depth_limits_traversal(self, app, test_lineage):
+        params = {'depth': 1, 'direction': 'downstream'}
+        response = app.get(f'/v1/lineage/{test_lineage[0]}/graph/', params=params)
+        assert response.status_code == 200
+        edges = response.json()['result']['edges']
+        assert [edge['tfrm_type'] for edge in edges] == [str(TransformationType.COPY_TO_ZONE)]
+
+    def test_lineage_graph_both_directions(self, app, test_lineage):
+        response = app.get(f'/v1/lineage/{test_lineage[1]}/graph/')
+        assert response.status_code == 200
+        edges = {edge['direction']: edge for edge in response.json()['result']['edges']}
+        assert edges['upstream']['tfrm_type'] == str(TransformationType.COPY_TO_ZONE)
+        assert edges['downstream']['tfrm_type'] == str(TransformationType.ARCHIVE)
@@ -0,0 +1,206 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import copy
+import uuid
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+import pytest
+from kafka.errors import KafkaTimeoutError
+from kafka.errors import MessageSizeTooLargeError
+from sqlalchemy import select
+from sqlalchemy import update
+
+from app.clients.kafka_client import KafkaProducerClient
+from app.dependencies.db import get_db_engine
+from app.models.models_items import ContainerType
+from app.models.models_items import ItemStatus
+from app.models.models_items import ItemType
+from app.models.sql_outbox import OutboxDeadLetterModel
+from app.models.sql_outbox import OutboxModel
+from app.workers.outbox_relay import OutboxRelay
+from tests.conftest import generate_random_container_code
+from tests.conftest import generate_random_file_name
+from tests.conftest import generate_random_username
+from tests.main import FakeKafkaProducer
+
+
+def create_item(app) -> str:
+    item_id = str(uuid.uuid4())
+    payload = {
+        'id': item_id,
+        'parent': str(uuid.uuid4()),
+        'parent_path': 'user/test_folder',
+        'type': ItemType.FILE,
+        'status': ItemStatus.REGISTERED,
+        'zone': 0,
+        'name': generate_random_file_name(),
+        'size': 0,
+        'owner': generate_random_username(),
+        'container_code': generate_random_container_code(),
+        'container_type': ContainerType.PROJECT,
+        'location_uri': '',
+        'version': '',
+        'tags': [],
+        'system_tags': [],
+    }
+    app.post('/v1/item/', json=payload)
+    return item_id
+
+
+async def drain_outbox(relay: OutboxRelay, kafka_client: KafkaProducerClient) -> None:
+    engine = await get_db_engine()
+    while await relay.relay_batch(engine, kafka_client):
+        pass
+
+
+class TestOutbox:
+    @pytest.mark.asyncio
+    async def test_create_item_adds_outbox_event(self, db_session_for_tests, app):
+        item_id = create_item(app)
+        events = (
+            (await db_session_for_tests.execute(select(OutboxModel).where(OutboxModel.item_id == item_id)))
+            .scalars()
+            .all()
+        )
+        assert len(events) == 1
+        assert events[0].payload['id'] == item_id
+
+    @pytest.mark.asyncio
+    async def test_relay_removes_delivered_events(self, db_session_for_tests, app):
+        create_item(app)
+        kafka_client = KafkaProducerClient()
+        kafka_client.producer = FakeKafkaProducer()
+        await drain_outbox(OutboxRelay(batch_size=100), kafka_client)
+        events = (await db_session_for_tests.execute(select(OutboxModel))).scalars().all()
+        assert events == []
+        assert len(kafka_client.producer.futures) > 0
+
+    @pytest.mark.asyncio
+    async def test_relay_keeps_undelivered_events(self, db_session_for_tests, app):
+        kafka_client = KafkaProducerClient()
+        kafka_client.producer = FakeKafkaProducer()
+        await drain_outbox(OutboxRelay(batch_size=100), kafka_client)
+        item_id = create_item(app)
+
+        def fail_all(futures):
+            for future in futures:
+                future.failure(KafkaTimeoutError('broker unavailable'))
+
+        kafka_client.producer = FakeKafkaProducer(fail_all)
+        relayed = await OutboxRelay(batch_size=100).relay_batch(await get_db_engine(), kafka_client)
+        events = (await db_session_for_tests.execute(select(OutboxModel))).scalars().all()
+        assert relayed == 0
+        assert [str(event.item_id) for event in events] == [item_id]
+
+    @pytest.mark.asyncio
+    async def test_relay_keeps_events_when_template_lookup_fails(self, db_session_for_tests, app, mocker):
+        kafka_client = KafkaProducerClient()
+        kafka_client.producer = FakeKafkaProducer()
+        await drain_outbox(OutboxRelay(batch_size=100), kafka_client)
+        item_id = create_item(app)
+        event = (
+            await db_session_for_tests.execute(select(OutboxModel).where(OutboxModel.item_id == item_id))
+        ).scalar_one()
+        payload = copy.deepcopy(event.payload)
+        payload['extended']['extra']['attributes'] = {str(uuid.uuid4()): {'attr_1': 'value_1'}}
+        await db_session_for_tests.execute(
+            update(OutboxModel).where(OutboxModel.id == event.id).values(payload=payload)
+        )
+        await db_session_for_tests.commit()
+        mocker.patch(
+            'app.clients.kafka_client.KafkaProducerClient._get_attribute_template',
+            side_effect=ConnectionRefusedError('database unavailable'),
+        )
+
+        relayed = await OutboxRelay(batch_size=100).relay_batch(await get_db_engine(), kafka_client)
+        events = (await db_session_for_tests.execute(select(OutboxModel))).scalars().all()
+        assert relayed == 0
+        assert [str(event.item_id) for event in events] == [item_id]
+        assert kafka_client.producer.futures == []
+
+    @pytest.mark.asyncio
+    async def test_relay_skips_claimed_events_until_claim_expires(self, db_session_for_tests, app):
+        kafka_client = KafkaProducerClient()
+        kafka_client.producer = FakeKafkaProducer()
+        await drain_outbox(OutboxRelay(batch_size=100), kafka_client)
+        create_item(app)
+        claimed_time = datetime.now(timezone.utc) - timedelta(seconds=60)
+        await db_session_for_tests.execute(update(OutboxModel).values(claimed_time=claimed_time))
+        await db_session_for_tests.commit()
+
+        assert (
+            await OutboxRelay(batch_size=100, claim_timeout=300).relay_batch(await get_db_engine(), kafka_client) == 0
+        )
+        relayed = await OutboxRelay(batch_size=100, claim_timeout=30).relay_batch(await get_db_engine(), kafka_client)
+        events = (await db_session_for_tests.execute(select(OutboxModel))).scalars().all()
+        assert relayed == 1
+        assert events == []
+
+    @pytest.mark.asyncio
+    async def test_relay_delivers_events_queued_behind_a_failing_event(self, db_session_for_tests, app):
+        kafka_client = KafkaProducerClient()
+        kafka_client.producer = FakeKafkaProducer()
+        await drain_outbox(OutboxRelay(batch_size=100), kafka_client)
+        failing_id = create_item(app)
+        create_item(app)
+
+        def fail_first(futures):
+            for position, future in enumerate(futures):
+                if future.is_done:
+                    continue
+                if position == 0:
+                    future.failure(KafkaTimeoutError('broker unavailable'))
+                else:
+                    future.success(None)
+
+        kafka_client.producer = FakeKafkaProducer(fail_first)
+        relay = OutboxRelay(batch_size=1, retry_delay=30)
+        assert await relay.relay_batch(await get_db_engine(), kafka_client) == 0
+        assert await relay.relay_batch(await get_db_engine(), kafka_client) == 1
+        events = (await db_session_for_tests.execute(select(OutboxModel))).scalars().all()
+        assert [str(event.item_id) for event in events] == [failing_id]
+        assert events[0].attempts == 1
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        'error,max_attempts',
+        [
+            (KafkaTimeoutError('broker unavailable'), 1),
+            (MessageSizeTooLargeError('message too large'), 50),
+        ],
+    )
+    async def test_relay_moves_failing_event_to_dead_letter(self, db_session_for_tests, app, error, max_attempts):
+        kafka_client = KafkaProducerClient()
+        kafka_client.producer = FakeKafkaProducer()
+        await drain_outbox(OutboxRelay(batch_size=100), kafka_client)
+        item_id = create_item(app)
+
+        def fail_all(futures):
+            for future in futures:
+                if not future.is_done:
+                    future.failure(error)
+
+        kafka_client.producer = FakeKafkaProducer(fail_all)
+        relay = OutboxRelay(batch_size=100, max_attempts=max_attempts)
+        relayed = await relay.relay_batch(await get_db_engine(), kafka_client)
+        events = (await db_session_for_tests.execute(select(OutboxModel))).scalars().all()
+        dead_letters = (
+            (
+                await db_session_for_tests.execute(
+                    select(OutboxDeadLetterModel).where(OutboxDeadLetterModel.item_id == item_id)
+                )
+            )
+            .scalars()
+            .all()
+        )
+        assert relayed == 0
+        assert events == []
+        assert len(dead_letters) == 1
+        assert dead_letters[0].attempts == 1
+        assert type(error).__name__ in dead_letters[0].error
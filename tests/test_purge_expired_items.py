@@ -0,0 +1,57 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy import update
+
+from app.dependencies.db import get_db_engine
+from app.models.sql_items import ItemModel
+from app.models.sql_outbox import OutboxModel
+from app.models.sql_provenance import ProvenanceModel
+from app.workers.purge_expired_items import ExpiredItemsPurger
+
+
+async def expire_items(db_session, ids: list[str], days: int) -> None:
+    deleted_at = datetime.now(timezone.utc) - timedelta(days=days)
+    await db_session.execute(update(ItemModel).where(ItemModel.id.in_(ids)).values(deleted_at=deleted_at))
+    await db_session.commit()
+
+
+class TestPurgeExpiredItems:
+    @pytest.mark.asyncio
+    async def test_purge_deletes_expired_items(self, db_session_for_tests, app, test_items, jwt_token_admin):
+        expired_id = test_items['ids']['folder']
+        kept_id = test_items['ids']['file_2']
+        app.delete('/v1/items/mark/', params={'ids': [expired_id, kept_id]})
+        await expire_items(db_session_for_tests, [expired_id], days=40)
+        purged = await ExpiredItemsPurger(retention_days=30, batch_size=1, throttle=0).purge(await get_db_engine())
+        assert purged >= 1
+        assert app.get(f'/v1/item/{expired_id}/').status_code == 404
+        assert app.get(f'/v1/item/{kept_id}/').status_code == 200
+        provenance = (
+            (await db_session_for_tests.execute(select(ProvenanceModel).where(ProvenanceModel.item_id == expired_id)))
+            .scalars()
+            .all()
+        )
+        assert provenance == []
+        events = (
+            (await db_session_for_tests.execute(select(OutboxModel).where(OutboxModel.item_id == expired_id)))
+            .scalars()
+            .all()
+        )
+        assert any(event.payload.get('to_delete') for event in events)
+
+    @pytest.mark.asyncio
+    async def test_purge_batch_without_expired_items_returns_0(self, app, test_items, jwt_token_admin):
+        app.delete('/v1/items/mark/', params={'ids': [test_items['ids']['file_2']]})
+        purged = await ExpiredItemsPurger(retention_days=30).purge_batch(await get_db_engine())
+        assert purged == 0
+        assert app.get(f'/v1/item/{test_items["ids"]["file_2"]}/').status_code == 200
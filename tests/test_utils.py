@@ -4,10 +4,33 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+import json
 import random
+from collections import namedtuple
+from datetime import datetime
+from datetime import timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy_utils import Ltree
 
 from app.app_utils import decode_path_from_ltree
 from app.app_utils import encode_path_for_ltree
+from app.models.base_models import EAPIResponseCode
+from app.models.models_items import GETItemResponse
+from app.models.models_items import ItemStatus
+from app.models.sql_extended import ExtendedModel
+from app.models.sql_favourites import FavouritesModel
+from app.models.sql_items import ItemModel
+from app.models.sql_storage import StorageModel
+from app.routers.router_exceptions import BadRequestException
+from app.routers.router_utils import decode_cursor
+from app.routers.router_utils import encode_cursor
+from app.routers.router_utils import set_api_response_error
+from app.routers.v1.items.utils import combine_item_row
+from app.routers.v1.items.utils import combine_item_tables
+from app.routers.v1.items.utils import parse_item_fields
+from app.routers.v1.items.utils import select_item_rows
 
 
 class TestUtils:
@@ -34,3 +57,82 @@ class TestUtils:
             encoded = encode_path_for_ltree(path)
             decoded = decode_path_from_ltree(encoded)
             assert decoded == path
+
+    def test_02_orjson_response_matches_json_response(self):
+        api_response = GETItemResponse()
+        api_response.result = [
+            {'id': str(uuid4()), 'name': 'fïle', 'size': 10, 'extended': {'extra': {'tags': ['a'], 'attributes': {}}}}
+        ]
+        api_response.total = None
+        assert json.loads(api_response.orjson_response().body) == json.loads(api_response.json_response().body)
+        set_api_response_error(api_response, 'Failed to get item', EAPIResponseCode.not_found)
+        response = api_response.orjson_response()
+        assert response.status_code == 404
+        assert json.loads(response.body)['error_msg'] == 'Failed to get item'
+
+    def test_03_item_row_matches_item_tables(self):
+        item = ItemModel(
+            uuid4(),
+            uuid4(),
+            Ltree(encode_path_for_ltree('user/folder')),
+            ItemStatus.ACTIVE,
+            'file',
+            0,
+            'f',
+            10,
+            'user',
+            'c',
+            'project',
+        )
+        item.restore_path = None
+        item.deleted = False
+        item.deleted_at = None
+        item.created_time = item.last_updated_time = datetime.now(tz=timezone.utc)
+        storage = StorageModel(item.id, None, 'minio://location', 'version')
+        extended = ExtendedModel(item.id, {'tags': ['tag'], 'system_tags': [], 'attributes': {}})
+        favourite = FavouritesModel('user', item.id, None, False)
+        sources = {column.key: getattr(item, column.key) for column in ItemModel.__table__.columns}
+        sources.update(
+            storage_id=storage.id,
+            location_uri=storage.location_uri,
+            version=storage.version,
+            upload_id=storage.upload_id,
+            extended_id=extended.id,
+            extra=extended.extra,
+            favourite_user=favourite.user,
+        )
+
+        def project(query):
+            keys = [column.key for column in query.selected_columns]
+            return namedtuple('ItemRow', keys)(*[sources[key] for key in keys])
+
+        row = project(select_item_rows(favourites=True))
+        expected = combine_item_tables((item, storage, extended, favourite), {'fav_user': 'user'})
+        assert combine_item_row(row, {'fav_user': 'user'}) == expected
+        assert combine_item_row(row)['favourite'] is False
+
+        fields = parse_item_fields('name, size,favourite,name')
+        assert fields == ['id', 'name', 'size', 'favourite']
+        row = project(select_item_rows(fields, favourites=True, keyset=[(ItemModel.type, False)]))
+        assert row._fields == ('id', 'name', 'size', 'type', 'favourite_user')
+        assert combine_item_row(row, {'fields': fields, 'fav_user': 'user'}) == {
+            'id': str(item.id),
+            'name': 'f',
+            'size': 10,
+            'favourite': True,
+        }
+
+    def test_04_parse_item_fields_rejects_unknown_fields(self):
+        assert parse_item_fields(None) is None
+        with pytest.raises(BadRequestException, match='Invalid fields: extra'):
+            parse_item_fields('name,extra')
+
+    def test_05_cursor_round_trips_ltree_values(self):
+        keyset = [(ItemModel.type, False), (ItemModel.parent_path, False), (ItemModel.id, False)]
+        parent_path = Ltree(encode_path_for_ltree('user/folder'))
+        item = ItemModel(uuid4(), None, parent_path, None, 'file', 0, 'f', 0, None, 'c', 'project')
+        cursor = encode_cursor(keyset, (item,))
+        assert decode_cursor(keyset, cursor) == ['file', parent_path, item.id]
+        item.parent_path = 'not a path!'
+        with pytest.raises(BadRequestException):
+            decode_cursor(keyset, encode_cursor(keyset, (item,)))